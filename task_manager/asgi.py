@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
+# Под ASGI соединения с базой по умолчанию не сохраняются (database.py)
+os.environ.setdefault('ASGI', 'True')
 
 application = get_asgi_application()
@@ -0,0 +1,88 @@
+"""
+Настройка кеша Django из одной строки URL, по аналогии с
+dj_database_url для DATABASES:
+
+    redis://[:пароль@]хост:6379/0    - Redis и совместимые серверы
+    rediss://...                     - то же через TLS
+    file:///var/tmp/task_manager     - файлы в каталоге
+    locmem://[имя]                   - память процесса
+    dummy://                         - без кеша
+
+Параметры запроса timeout, key_prefix, version, max_entries и
+cull_frequency попадают в настройки Django, остальные для Redis
+остаются в адресе и передаются клиенту redis-py.
+"""
+import os
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+BACKENDS = {
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'rediss': 'django.core.cache.backends.redis.RedisCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+OPTION_PARAMS = {'max_entries', 'cull_frequency'}
+# Бэкенды, которые видят все процессы сервера. locmem у каждого процесса
+# свой, dummy не хранит ничего
+SHARED_BACKENDS = {
+    BACKENDS['redis'],
+    BACKENDS['file'],
+}
+
+
+def _split_params(query):
+    """Параметры Django, OPTIONS бэкенда и все остальные."""
+    settings, options, rest = {}, {}, []
+    for name, value in parse_qsl(query):
+        if name == 'timeout':
+            settings['TIMEOUT'] = None if value == 'none' else int(value)
+        elif name == 'version':
+            settings['VERSION'] = int(value)
+        elif name == 'key_prefix':
+            settings['KEY_PREFIX'] = value
+        elif name in OPTION_PARAMS:
+            options[name.upper()] = int(value)
+        else:
+            rest.append((name, value))
+    return settings, options, rest
+
+
+def parse(url, key_prefix=''):
+    """Словарь настроек одного кеша для CACHES по его URL."""
+    parts = urlsplit(url)
+    if parts.scheme not in BACKENDS:
+        raise ImproperlyConfigured(
+            f'Неизвестная схема кеша {parts.scheme!r} в {url!r}'
+        )
+
+    settings, options, rest = _split_params(parts.query)
+    config = {
+        'BACKEND': BACKENDS[parts.scheme],
+        'KEY_PREFIX': key_prefix,
+        **settings,
+    }
+    if options:
+        config['OPTIONS'] = options
+
+    if parts.scheme in ('redis', 'rediss'):
+        config['LOCATION'] = urlunsplit(parts._replace(query=urlencode(rest)))
+    elif parts.scheme == 'file':
+        if not parts.path:
+            raise ImproperlyConfigured(f'Не указан каталог кеша в {url!r}')
+        config['LOCATION'] = parts.path
+    elif parts.scheme == 'locmem':
+        config['LOCATION'] = parts.netloc or parts.path.strip('/')
+    return config
+
+
+def is_shared(config):
+    """Видят ли этот кеш все процессы сервера."""
+    return config['BACKEND'] in SHARED_BACKENDS
+
+
+def config(env='CACHE_URL', default='locmem://', key_prefix=''):
+    """Настройки кеша из переменной окружения или значения по умолчанию."""
+    return parse(os.getenv(env) or default, key_prefix=key_prefix)
@@ -0,0 +1,71 @@
+# task_manager/conditional.py
+"""
+Условные GET-запросы для страниц со списками: ETag и Last-Modified
+строятся по версиям таблиц из кеша, без запросов к самим данным.
+Если версиям нельзя доверять (versions.enabled()) или страница читается
+с реплики, она отдается без ETag и Last-Modified.
+"""
+import hashlib
+
+from django.middleware.csrf import get_token
+from django.views.decorators.http import condition
+
+from task_manager import routers, versions
+from task_manager.tasks.choices import EXECUTORS as USERS
+from task_manager.tasks.choices import LABELS, STATUSES
+from task_manager.tasks.dashboard import TASKS
+
+# Версии таблиц сбрасывают сигналы и пакетные операции с задачами
+__all__ = ['TASKS', 'STATUSES', 'USERS', 'LABELS', 'ConditionalGetMixin']
+
+
+class ConditionalGetMixin:
+    """
+    Отвечает 304 Not Modified, если страница не могла измениться:
+    версии таблиц из version_names, пользователь, CSRF-токен и адрес
+    совпадают с теми, для которых клиент получил ETag.
+
+    Ставится после LoginRequiredMixin, чтобы проверка входа шла первой.
+    """
+
+    version_names = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        view = condition(
+            etag_func=self.get_etag,
+            last_modified_func=self.get_last_modified,
+        )(super().dispatch)
+        return view(request, *args, **kwargs)
+
+    def is_conditional(self, request):
+        if not versions.enabled():
+            return False
+        # Версии в кеше соответствуют основной базе, а реплика может
+        # отставать: ее данные под новым ETag застряли бы у клиента
+        if routers.is_reading_replica():
+            return False
+        # Сообщение показывается один раз, поэтому страницу с ним
+        # нельзя заменять версией из кеша браузера
+        return request.method in ('GET', 'HEAD') and not len(
+            getattr(request, '_messages', ())
+        )
+
+    def get_etag(self, request, *args, **kwargs):
+        if not self.is_conditional(request):
+            return None
+        # Токен в формах страницы зависит от CSRF-cookie клиента; если
+        # cookie еще нет, создаем ее до расчета ETag
+        get_token(request)
+        current = versions.get_versions(*self.version_names)
+        parts = [
+            *(str(current[name]) for name in self.version_names),
+            str(request.user.pk),
+            request.META['CSRF_COOKIE'],
+            request.get_full_path(),
+        ]
+        return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+    def get_last_modified(self, request, *args, **kwargs):
+        if not self.is_conditional(request):
+            return None
+        return versions.get_last_modified(*self.version_names)
@@ -0,0 +1,56 @@
+"""
+Настройки базы данных из DATABASE_URL и переменных окружения.
+
+Соединение живет CONN_MAX_AGE секунд (по умолчанию 600) и переживает
+запросы, перед повторным использованием Django проверяет, что оно не
+оборвалось. Под ASGI соединения не переиспользуются между запросами:
+каждый запрос открывает свое в новом потоке, и постоянные соединения
+только копились бы до исчерпания max_connections. Поэтому там
+CONN_MAX_AGE по умолчанию 0 (asgi.py ставит ASGI=True), а для
+PostgreSQL есть пул драйвера psycopg 3 (DB_POOL=True, нужны Django 5.1
+и пакет psycopg[pool]): соединения берутся из пула размером от
+DB_POOL_MIN_SIZE до DB_POOL_MAX_SIZE.
+"""
+import os
+
+import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
+
+CONN_MAX_AGE = 600
+POOL_MIN_SIZE = 2
+POOL_MAX_SIZE = 10
+POOL_TIMEOUT = 10
+
+
+def _conn_max_age():
+    default = 0 if os.getenv('ASGI') == 'True' else CONN_MAX_AGE
+    value = os.getenv('CONN_MAX_AGE', str(default))
+    # none - соединение без ограничения времени жизни
+    return None if value == 'none' else int(value)
+
+
+def pool_options():
+    return {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', POOL_MIN_SIZE)),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', POOL_MAX_SIZE)),
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', POOL_TIMEOUT)),
+    }
+
+
+def config(default, env='DATABASE_URL'):
+    """Словарь настроек для DATABASES['default'] или реплики."""
+    use_pool = os.getenv('DB_POOL') == 'True'
+    database = dj_database_url.config(
+        env=env,
+        default=default,
+        # Пул сам держит соединения, Django не должен их сохранять
+        conn_max_age=0 if use_pool else _conn_max_age(),
+        conn_health_checks=True,
+    )
+    if use_pool:
+        if database['ENGINE'] != 'django.db.backends.postgresql':
+            raise ImproperlyConfigured(
+                'DB_POOL поддерживается только для PostgreSQL'
+            )
+        database.setdefault('OPTIONS', {})['pool'] = pool_options()
+    return database
@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'name', 'status', 'attempts', 'run_at', 'duration', 'created_at'
+    )
+    list_filter = ('status', 'name')
+    readonly_fields = ('created_at', 'started_at', 'finished_at', 'duration')
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'task_manager.jobs'
+
+    def ready(self):
+        from django.utils.module_loading import autodiscover_modules
+
+        # Обработчики задач фона объявляются в модулях jobs.py приложений
+        autodiscover_modules('jobs')
@@ -0,0 +1,45 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from task_manager.jobs.worker import MODES, Worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет фоновые задания из очереди в пуле потоков или '
+        'процессов. SIGTERM и Ctrl+C завершают воркер после текущих заданий'
+    )
+
+    def add_arguments(self, parser):
+        config = settings.JOBS
+        parser.add_argument(
+            '--concurrency', type=int, default=config['CONCURRENCY']
+        )
+        parser.add_argument('--mode', choices=MODES, default=config['MODE'])
+        parser.add_argument(
+            '--poll-interval', type=float, default=config['POLL_INTERVAL']
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Выйти, когда в очереди не останется готовых заданий',
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=options['concurrency'],
+            mode=options['mode'],
+            poll_interval=options['poll_interval'],
+            log=self.stdout.write,
+        )
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *args: worker.stop())
+
+        self.stdout.write(
+            f'Воркер {worker.id}: {options["mode"]}, '
+            f'параллельно {worker.concurrency}'
+        )
+        processed = worker.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS(f'Выполнено попыток: {processed}'))
@@ -0,0 +1,71 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True,
+                    primary_key=True,
+                    serialize=False,
+                    verbose_name='ID',
+                )),
+                ('name', models.CharField(
+                    max_length=100, verbose_name='Обработчик'
+                )),
+                ('kwargs', models.JSONField(
+                    default=dict, verbose_name='Аргументы'
+                )),
+                ('status', models.CharField(
+                    choices=[
+                        ('queued', 'В очереди'),
+                        ('running', 'Выполняется'),
+                        ('done', 'Выполнено'),
+                        ('failed', 'Ошибка'),
+                    ],
+                    default='queued',
+                    max_length=16,
+                    verbose_name='Состояние',
+                )),
+                ('attempts', models.PositiveIntegerField(
+                    default=0, verbose_name='Попытки'
+                )),
+                ('max_attempts', models.PositiveIntegerField(
+                    default=3, verbose_name='Максимум попыток'
+                )),
+                ('run_at', models.DateTimeField(
+                    default=django.utils.timezone.now,
+                    verbose_name='Запуск не раньше',
+                )),
+                ('locked_by', models.CharField(
+                    blank=True, max_length=100, verbose_name='Воркер'
+                )),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('duration', models.FloatField(blank=True, null=True)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(
+                    auto_now_add=True, verbose_name='Дата создания'
+                )),
+            ],
+            options={
+                'verbose_name': 'Фоновое задание',
+                'verbose_name_plural': 'Фоновые задания',
+                'indexes': [models.Index(
+                    fields=['status', 'run_at'],
+                    name='job_status_run_at_idx',
+                )],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """Задание для фонового воркера (manage.py run_worker)."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнено'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(max_length=100, verbose_name="Обработчик")
+    kwargs = models.JSONField(default=dict, verbose_name="Аргументы")
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+        verbose_name="Состояние",
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Попытки")
+    max_attempts = models.PositiveIntegerField(
+        default=3, verbose_name="Максимум попыток"
+    )
+    # Не раньше этого времени: так откладываются повторы после ошибки
+    run_at = models.DateTimeField(
+        default=timezone.now, verbose_name="Запуск не раньше"
+    )
+    locked_by = models.CharField(
+        max_length=100, blank=True, verbose_name="Воркер"
+    )
+    locked_at = models.DateTimeField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Длительность последней попытки в секундах
+    duration = models.FloatField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name="Дата создания"
+    )
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
+
+    class Meta:
+        verbose_name = "Фоновое задание"
+        verbose_name_plural = "Фоновые задания"
+        # Воркер выбирает готовые к запуску задания по этому индексу
+        indexes = [
+            models.Index(
+                fields=['status', 'run_at'], name='job_status_run_at_idx'
+            ),
+        ]
@@ -0,0 +1,137 @@
+"""
+Очередь фоновых заданий в таблице jobs_job.
+
+Обработчик объявляется декоратором @handler('имя') в модуле jobs.py
+приложения, задание ставится в очередь вызовом enqueue('имя', ...),
+а выполняет его manage.py run_worker. Воркер забирает задание
+условным UPDATE, поэтому несколько воркеров не возьмут одно и то же
+задание и без блокировок строк. Упавшее задание повторяется с
+экспоненциальной задержкой, пока не кончатся попытки.
+"""
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+HANDLERS = {}
+# Итог попытки для метрик: кроме DONE и FAILED бывает повтор
+RETRY = 'retry'
+
+
+def handler(name):
+    """Регистрирует функцию как обработчик заданий с этим именем."""
+
+    def decorator(func):
+        HANDLERS[name] = func
+        return func
+
+    return decorator
+
+
+def enqueue(name, max_attempts=None, delay=0, **kwargs):
+    """
+    Ставит задание в очередь. Аргументы передаются обработчику и
+    должны сериализоваться в JSON.
+    """
+    if name not in HANDLERS:
+        raise LookupError(f'Неизвестный обработчик заданий: {name}')
+    return Job.objects.create(
+        name=name,
+        kwargs=kwargs,
+        max_attempts=max_attempts or settings.JOBS['MAX_ATTEMPTS'],
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def backoff(attempts):
+    """Задержка перед повтором после attempts неудачных попыток."""
+    config = settings.JOBS
+    return min(config['BACKOFF'] * 2 ** (attempts - 1), config['MAX_BACKOFF'])
+
+
+def _stale_before(now):
+    return now - timedelta(seconds=settings.JOBS['LOCK_TIMEOUT'])
+
+
+def fail_abandoned():
+    """
+    Задания, которые взял и не завершил упавший воркер, исчерпав
+    попытки, отмечаются как неудачные.
+    """
+    now = timezone.now()
+    return Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=_stale_before(now),
+        attempts__gte=F('max_attempts'),
+    ).update(
+        status=Job.FAILED,
+        finished_at=now,
+        last_error='Воркер не завершил задание',
+    )
+
+
+def claim(worker_id, limit):
+    """Забирает до limit готовых к запуску заданий и возвращает их id."""
+    now = timezone.now()
+    ready = Q(status=Job.QUEUED, run_at__lte=now) | Q(
+        status=Job.RUNNING,
+        locked_at__lt=_stale_before(now),
+        attempts__lt=F('max_attempts'),
+    )
+    candidates = Job.objects.filter(ready).order_by(
+        'run_at', 'pk'
+    ).values_list('pk', flat=True)[:limit]
+
+    claimed = []
+    for pk in list(candidates):
+        # Задание достается тому воркеру, чей UPDATE изменил строку
+        updated = Job.objects.filter(ready, pk=pk).update(
+            status=Job.RUNNING,
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if updated:
+            claimed.append(pk)
+    return claimed
+
+
+def run(pk):
+    """
+    Выполняет забранное задание и записывает итог. Возвращает
+    (обработчик, итог попытки, длительность в секундах) для метрик.
+    """
+    job = Job.objects.get(pk=pk)
+    started_at = timezone.now()
+    started = time.perf_counter()
+    changes = {}
+    try:
+        func = HANDLERS.get(job.name)
+        if func is None:
+            raise LookupError(f'Неизвестный обработчик заданий: {job.name}')
+        changes['result'] = func(**job.kwargs)
+        changes['status'] = Job.DONE
+    except Exception:
+        changes['last_error'] = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            changes['status'] = Job.QUEUED
+            changes['run_at'] = timezone.now() + timedelta(
+                seconds=backoff(job.attempts)
+            )
+        else:
+            changes['status'] = Job.FAILED
+    duration = time.perf_counter() - started
+
+    Job.objects.filter(pk=pk).update(
+        started_at=started_at,
+        finished_at=timezone.now(),
+        duration=duration,
+        **changes,
+    )
+    outcome = RETRY if changes['status'] == Job.QUEUED else changes['status']
+    return job.name, outcome, duration
@@ -0,0 +1,124 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from task_manager import metrics
+
+from . import queue
+from .models import Job
+from .worker import Worker
+
+
+@queue.handler('tests.echo')
+def echo(value):
+    return {'value': value}
+
+
+@queue.handler('tests.fail')
+def fail():
+    raise RuntimeError('сбой обработчика')
+
+
+class MetricsMixin:
+    def setUp(self):
+        self.registry = metrics.MetricsRegistry()
+        patcher = mock.patch.object(metrics, 'registry', self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class JobQueueTests(MetricsMixin, TestCase):
+    def _work(self):
+        return Worker(mode='inline').run(burst=True)
+
+    def test_runs_job_and_records_result(self):
+        job = queue.enqueue('tests.echo', value=42)
+        self.assertEqual(self._work(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.result, {'value': 42})
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.duration)
+        self.assertEqual(self.registry.jobs[('tests.echo', 'done')], 1)
+        self.assertIn(
+            'job_duration_seconds_count{job="tests.echo"} 1',
+            metrics.render([self.registry.snapshot()]),
+        )
+
+    def test_unknown_handler(self):
+        with self.assertRaises(LookupError):
+            queue.enqueue('tests.missing')
+
+    def test_failed_job_is_retried_with_backoff(self):
+        job = queue.enqueue('tests.fail', max_attempts=2)
+        self._work()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn('сбой обработчика', job.last_error)
+        self.assertGreater(job.run_at, timezone.now())
+        # Повтор еще не наступил
+        self.assertEqual(self._work(), 0)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self._work()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(self.registry.jobs[('tests.fail', 'retry')], 1)
+        self.assertEqual(self.registry.jobs[('tests.fail', 'failed')], 1)
+
+    def test_backoff_grows_and_is_capped(self):
+        self.assertEqual(
+            [queue.backoff(attempt) for attempt in (1, 2, 3)], [5, 10, 20]
+        )
+        self.assertEqual(queue.backoff(20), 600)
+
+    def test_claim_is_exclusive(self):
+        job = queue.enqueue('tests.echo', value=1)
+        self.assertEqual(queue.claim('worker-1', 5), [job.pk])
+        self.assertEqual(queue.claim('worker-2', 5), [])
+
+    def test_abandoned_job_is_claimed_again(self):
+        job = queue.enqueue('tests.echo', value=1, max_attempts=2)
+        queue.claim('worker-1', 1)
+        long_ago = timezone.now() - timedelta(days=1)
+        Job.objects.filter(pk=job.pk).update(locked_at=long_ago)
+
+        self.assertEqual(queue.claim('worker-2', 1), [job.pk])
+        Job.objects.filter(pk=job.pk).update(locked_at=long_ago)
+        # Попытки кончились: задание больше не выдается
+        self.assertEqual(queue.claim('worker-3', 1), [])
+        self.assertEqual(queue.fail_abandoned(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+
+    def test_recount_in_background(self):
+        out = StringIO()
+        call_command('recount', '--background', stdout=out)
+        job = Job.objects.get()
+        self.assertEqual(job.name, 'tasks.recount')
+
+        self._work()
+        job.refresh_from_db()
+        self.assertEqual(job.result, {'fixed': 0})
+
+
+class ThreadPoolWorkerTests(MetricsMixin, TransactionTestCase):
+    def test_jobs_run_in_pool(self):
+        jobs = [queue.enqueue('tests.echo', value=i) for i in range(5)]
+        processed = Worker(concurrency=2, mode='thread').run(burst=True)
+
+        self.assertEqual(processed, 5)
+        self.assertEqual(
+            sorted(
+                job.result['value']
+                for job in Job.objects.filter(pk__in=[j.pk for j in jobs])
+            ),
+            list(range(5)),
+        )
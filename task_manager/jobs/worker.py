@@ -0,0 +1,126 @@
+"""
+Воркер: забирает задания из очереди и выполняет их в пуле потоков
+или процессов. Метрики заданий пишутся в общий реестр task_manager.
+metrics; с METRICS['DIR'] они видны в /metrics веб-приложения.
+"""
+import multiprocessing
+import os
+import socket
+import threading
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+import django
+from django.db import close_old_connections
+
+from task_manager import metrics
+
+from . import queue
+
+MODES = ('thread', 'process', 'inline')
+
+
+def execute(pk):
+    try:
+        return queue.run(pk)
+    finally:
+        # Потоки пула живут долго: соединение закрывается по
+        # CONN_MAX_AGE, как после обычного запроса
+        close_old_connections()
+
+
+class InlineExecutor:
+    """Выполняет задания в текущем потоке, по одному (для отладки)."""
+
+    def submit(self, func, *args):
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def make_executor(mode, concurrency):
+    if mode == 'thread':
+        return ThreadPoolExecutor(concurrency, thread_name_prefix='job')
+    if mode == 'process':
+        # spawn, а не fork: дочерний процесс не должен унаследовать
+        # открытые соединения с базой
+        return ProcessPoolExecutor(
+            concurrency,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup,
+        )
+    return InlineExecutor()
+
+
+class Worker:
+    def __init__(self, concurrency=1, mode='thread', poll_interval=1.0,
+                 log=None):
+        if mode not in MODES:
+            raise ValueError(f'Неизвестный режим воркера: {mode}')
+        self.concurrency = 1 if mode == 'inline' else concurrency
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.log = log or (lambda message: None)
+        self.id = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+
+    def stop(self):
+        """Не брать новых заданий и выйти, дождавшись текущих."""
+        self.stopping.set()
+
+    def run(self, burst=False):
+        """
+        Основной цикл. С burst=True воркер выходит, когда очередь
+        опустела. Возвращает число выполненных попыток.
+        """
+        executor = make_executor(self.mode, self.concurrency)
+        running = set()
+        processed = 0
+        try:
+            while not self.stopping.is_set():
+                queue.fail_abandoned()
+                free = self.concurrency - len(running)
+                for pk in queue.claim(self.id, free) if free else ():
+                    running.add(executor.submit(execute, pk))
+                if not running:
+                    if burst:
+                        break
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                done, running = wait(
+                    running,
+                    timeout=self.poll_interval,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    self.record(future)
+                    processed += 1
+        finally:
+            executor.shutdown(wait=True)
+            for future in running:
+                self.record(future)
+                processed += 1
+            metrics.registry.flush()
+        return processed
+
+    def record(self, future):
+        try:
+            name, outcome, duration = future.result()
+        except Exception as error:
+            # Сбой самого воркера (например, процесс пула упал), а не
+            # обработчика: задание вернется в очередь по LOCK_TIMEOUT
+            self.log(f'Сбой выполнения задания: {error!r}')
+            return
+        metrics.registry.observe_job(name, outcome, duration)
+        self.log(f'{name}: {outcome} за {duration * 1000:.0f} ms')
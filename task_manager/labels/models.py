@@ -11,6 +11,10 @@ class Label(models.Model):
         auto_now_add=True,
         verbose_name="Дата создания"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Дата изменения"
+    )
 
     def __str__(self):
         return self.name
@@ -6,16 +6,26 @@ from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, DeleteView, ListView, UpdateView
 
+from task_manager.conditional import LABELS, TASKS, ConditionalGetMixin
+from task_manager.tasks import counters
+
 from .forms import LabelForm
 from .models import Label
 
 LABELS_LIST_URL = 'labels:list'
 
 
-class LabelListView(LoginRequiredMixin, ListView):
+class LabelListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = Label
     template_name = 'labels/list.html'
     context_object_name = 'labels'
+    version_names = (LABELS, TASKS)
+    read_replica = True
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        counters.attach(context['labels'], counters.LABEL)
+        return context
 
 
 class LabelCreateView(LoginRequiredMixin, CreateView):
@@ -46,8 +56,9 @@ class LabelDeleteView(LoginRequiredMixin, DeleteView):
     success_url = reverse_lazy(LABELS_LIST_URL)
 
     def form_valid(self, form):
-        # Проверяем, связана ли метка с задачами
-        if self.get_object().task_set.exists():
+        # Проверяем по задачам, а не по счетчикам: счетчик может отстать,
+        # а удаление метки молча отвязало бы ее от задач
+        if self.object.task_set.exists():
             messages.error(
                 self.request,
                 'Невозможно удалить метку, потому что она используется'
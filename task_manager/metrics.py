@@ -0,0 +1,256 @@
+# task_manager/metrics.py
+"""
+Счетчики запросов и гистограммы длительности по представлениям и
+фоновым заданиям в формате Prometheus. Каждый процесс копит значения
+в памяти; если задан METRICS['DIR'], процесс сбрасывает их в свой
+файл не позже чем через FLUSH_INTERVAL после запроса и при выходе, а
+/metrics суммирует файлы всех процессов (воркеров gunicorn и
+run_worker). Файл назван по pid и времени запуска процесса, чтобы
+новый процесс с тем же pid не затер данные завершившегося.
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+# Границы корзин гистограммы в секундах
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+# Фоновые задания идут дольше запросов
+JOB_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 900)
+FILE_PREFIX = 'metrics-'
+
+
+def _new_histogram(buckets=BUCKETS):
+    return {'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+
+
+def _new_job_histogram():
+    return _new_histogram(JOB_BUCKETS)
+
+
+def _observe(histogram, buckets, value):
+    histogram['sum'] += value
+    histogram['count'] += 1
+    # В хранилище корзины не накопительные: значение попадает только в
+    # первую подходящую, а больше последней границы - лишь в count
+    for index, bound in enumerate(buckets):
+        if value <= bound:
+            histogram['buckets'][index] += 1
+            break
+
+
+def _copy_histograms(histograms):
+    return {
+        name: {**histogram, 'buckets': list(histogram['buckets'])}
+        for name, histogram in histograms.items()
+    }
+
+
+def _add_histograms(total, histograms, new_histogram):
+    for name, histogram in histograms.items():
+        target = total.setdefault(name, new_histogram())
+        target['sum'] += histogram['sum']
+        target['count'] += histogram['count']
+        for index, value in enumerate(histogram['buckets']):
+            target['buckets'][index] += value
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.durations = defaultdict(_new_histogram)
+        self.jobs = defaultdict(int)
+        self.job_durations = defaultdict(_new_job_histogram)
+        self.pid = None
+        self.key = None
+        self.timer = None
+
+    def observe(self, view, method, status, duration):
+        with self.lock:
+            self.requests[(view, method, str(status))] += 1
+            _observe(self.durations[view], BUCKETS, duration)
+        self.schedule_flush()
+
+    def observe_job(self, name, outcome, duration):
+        with self.lock:
+            self.jobs[(name, outcome)] += 1
+            _observe(self.job_durations[name], JOB_BUCKETS, duration)
+        self.schedule_flush()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'requests': [
+                    [*key, value] for key, value in self.requests.items()
+                ],
+                'durations': _copy_histograms(self.durations),
+                'jobs': [[*key, value] for key, value in self.jobs.items()],
+                'job_durations': _copy_histograms(self.job_durations),
+            }
+
+    def _check_process(self):
+        # После fork таймер родителя в дочернем процессе не существует,
+        # а файл нужен свой
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.key = f'{self.pid}-{time.time_ns()}'
+            self.timer = None
+
+    def schedule_flush(self):
+        """
+        Сброс в файл через FLUSH_INTERVAL в фоновом потоке: данные
+        простаивающего воркера не ждут следующего запроса.
+        """
+        if not settings.METRICS['DIR']:
+            return
+        with self.lock:
+            self._check_process()
+            if self.timer is not None:
+                return
+            self.timer = threading.Timer(
+                settings.METRICS['FLUSH_INTERVAL'], self.flush
+            )
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self):
+        with self.lock:
+            self._check_process()
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not (self.requests or self.jobs):
+                return
+        if directory := settings.METRICS['DIR']:
+            write_snapshot(directory, self.key, self.snapshot())
+
+    def collect(self):
+        """Снимки всех процессов (или только текущего без DIR)."""
+        directory = settings.METRICS['DIR']
+        if not directory:
+            return [self.snapshot()]
+        self.flush()
+        return read_snapshots(directory)
+
+
+def write_snapshot(directory, key, snapshot):
+    os.makedirs(directory, exist_ok=True)
+    # Пишем во временный файл и переименовываем, чтобы читатель
+    # никогда не увидел файл наполовину
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w') as file:
+        json.dump(snapshot, file)
+    os.replace(tmp_path, os.path.join(directory, f'{FILE_PREFIX}{key}.json'))
+
+
+def read_snapshots(directory):
+    snapshots = []
+    for name in os.listdir(directory):
+        if not (name.startswith(FILE_PREFIX) and name.endswith('.json')):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as file:
+                snapshots.append(json.load(file))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def merge(snapshots):
+    """Сумма снимков всех процессов."""
+    totals = {
+        'requests': defaultdict(int),
+        'durations': {},
+        'jobs': defaultdict(int),
+        'job_durations': {},
+    }
+    for snapshot in snapshots:
+        for view, method, status, value in snapshot['requests']:
+            totals['requests'][(view, method, status)] += value
+        # В снимках старых версий заданий нет
+        for name, outcome, value in snapshot.get('jobs', ()):
+            totals['jobs'][(name, outcome)] += value
+        _add_histograms(
+            totals['durations'], snapshot['durations'], _new_histogram
+        )
+        _add_histograms(
+            totals['job_durations'],
+            snapshot.get('job_durations', {}),
+            _new_job_histogram,
+        )
+    return totals
+
+
+def _labels(**labels):
+    pairs = ','.join(
+        '{}="{}"'.format(
+            key, str(value).replace('\\', '\\\\').replace('"', '\\"')
+        )
+        for key, value in labels.items()
+    )
+    return '{' + pairs + '}'
+
+
+def _histogram_lines(metric, label, histograms, buckets):
+    lines = []
+    for name, histogram in sorted(histograms.items()):
+        # Корзины в Prometheus накопительные, в хранилище - нет
+        cumulative = 0
+        for bound, value in zip(buckets, histogram['buckets']):
+            cumulative += value
+            labels = _labels(**{label: name, 'le': bound})
+            lines.append(f'{metric}_bucket{labels} {cumulative}')
+        labels = _labels(**{label: name, 'le': '+Inf'})
+        lines.append(f'{metric}_bucket{labels} {histogram["count"]}')
+        labels = _labels(**{label: name})
+        lines.append(f'{metric}_sum{labels} {histogram["sum"]}')
+        lines.append(f'{metric}_count{labels} {histogram["count"]}')
+    return lines
+
+
+def render(snapshots):
+    """Текстовый формат экспозиции Prometheus."""
+    totals = merge(snapshots)
+    lines = [
+        '# HELP http_requests_total Число HTTP-запросов.',
+        '# TYPE http_requests_total counter',
+    ]
+    for (view, method, status), value in sorted(totals['requests'].items()):
+        labels = _labels(view=view, method=method, status=status)
+        lines.append(f'http_requests_total{labels} {value}')
+
+    lines += [
+        '# HELP http_request_duration_seconds Длительность запроса.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    lines += _histogram_lines(
+        'http_request_duration_seconds', 'view', totals['durations'], BUCKETS
+    )
+
+    lines += [
+        '# HELP jobs_total Число попыток выполнения фоновых заданий.',
+        '# TYPE jobs_total counter',
+    ]
+    for (name, outcome), value in sorted(totals['jobs'].items()):
+        labels = _labels(job=name, outcome=outcome)
+        lines.append(f'jobs_total{labels} {value}')
+
+    lines += [
+        '# HELP job_duration_seconds Длительность попытки задания.',
+        '# TYPE job_duration_seconds histogram',
+    ]
+    lines += _histogram_lines(
+        'job_duration_seconds', 'job', totals['job_durations'], JOB_BUCKETS
+    )
+    return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+# Завершающийся воркер сохраняет то, что накопил после последнего сброса
+atexit.register(registry.flush)
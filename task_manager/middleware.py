@@ -0,0 +1,319 @@
+# task_manager/middleware.py
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager, nullcontext
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from task_manager import metrics, routers
+
+logger = logging.getLogger('task_manager.profiling')
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Списки параметров IN (%s, %s, ...) разной длины дают один отпечаток
+PLACEHOLDERS_RE = re.compile(r'%s(?:, %s)+')
+
+# Запись запросов текущего HTTP-запроса. Контекстная переменная
+# переходит в потоки sync_to_async, где под ASGI выполняются запросы
+# ORM, поэтому запись не требует переключения потоков в middleware
+_recorder = ContextVar('query_recorder', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def fingerprint(sql):
+    return PLACEHOLDERS_RE.sub('%s, ...', sql)
+
+
+def _dispatch(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_recorder(connection, **kwargs):
+    """Подключает запись к соединению, один раз на объект соединения."""
+    if _dispatch not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_dispatch)
+
+
+# Соединения каждого потока подключаются при открытии
+connection_created.connect(install_recorder)
+
+
+class QueryRecorder:
+    """
+    Обертка execute_wrapper: считает запросы, их суммарное время и
+    повторы одинаковых запросов. Работает без DEBUG.
+    """
+
+    def __init__(self, track_fingerprints=True):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.track_fingerprints = track_fingerprints
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            if self.track_fingerprints:
+                self.fingerprints[fingerprint(sql)] += 1
+
+    @contextmanager
+    def record(self):
+        """
+        Записывает запросы ко всем базам внутри блока, в том числе
+        выполненные в потоках sync_to_async.
+        """
+        # Соединения этого потока могли открыться до импорта модуля
+        for alias in connections:
+            install_recorder(connections[alias])
+        token = _recorder.set(self)
+        try:
+            yield self
+        finally:
+            _recorder.reset(token)
+
+    def duplicates(self):
+        return {
+            sql: count for sql, count in self.fingerprints.items()
+            if count > 1
+        }
+
+
+class AsyncCapableMiddleware:
+    """
+    Основа middleware, которые работают и в синхронной, и в асинхронной
+    цепочке. Под ASGI Django вызывает их без пула потоков, если следующий
+    обработчик асинхронный; тогда запрос обрабатывает __acall__.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+
+class QueryProfilingMiddleware(AsyncCapableMiddleware):
+    """
+    Для выборки запросов пишет в лог число SQL-запросов, их время,
+    повторяющиеся запросы и имя представления. Если задан бюджет для
+    имени URL (QUERY_PROFILING['BUDGETS']), превышение пишется
+    в лог или, при RAISE_ON_BUDGET, вызывает исключение.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        recording = self.start(request)
+        if recording is None:
+            return self.get_response(request)
+        with recording:
+            response = self.get_response(request)
+        self.finish(request)
+        return response
+
+    async def __acall__(self, request):
+        recording = self.start(request)
+        if recording is None:
+            return await self.get_response(request)
+        with recording:
+            response = await self.get_response(request)
+        self.finish(request)
+        return response
+
+    def start(self, request):
+        """Запись запросов для попавшего в выборку запроса или None."""
+        config = settings.QUERY_PROFILING
+        if not config['ENABLED'] or random.random() >= config['SAMPLE_RATE']:
+            return None
+
+        # MetricsMiddleware уже считает запросы: достаточно включить
+        # у него подсчет отпечатков, вторая запись не нужна
+        recorder = getattr(request, 'query_timing', None)
+        if recorder is None:
+            request.query_profile = QueryRecorder()
+            return request.query_profile.record()
+        recorder.track_fingerprints = True
+        request.query_profile = recorder
+        return nullcontext()
+
+    def finish(self, request):
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        self.report(
+            request, view_name, request.query_profile,
+            settings.QUERY_PROFILING,
+        )
+
+    def report(self, request, view_name, recorder, config):
+        duplicates = recorder.duplicates()
+        logger.info(
+            '%s %s view=%s queries=%d sql_time=%.1fms duplicates=%d',
+            request.method,
+            request.path,
+            view_name,
+            recorder.count,
+            recorder.duration * 1000,
+            sum(duplicates.values()),
+        )
+        for sql, count in duplicates.items():
+            logger.debug('%dx %s', count, sql[:300])
+
+        budget = config['BUDGETS'].get(view_name)
+        if budget is None or recorder.count <= budget:
+            return
+        message = (
+            f'{view_name}: {recorder.count} запросов при бюджете {budget}'
+        )
+        if config['RAISE_ON_BUDGET']:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """
+    Добавляет к каждому ответу заголовок Server-Timing (время SQL,
+    рендеринга шаблона и общее) и учитывает запрос в метриках
+    представления для /metrics.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if self.is_async:
+            # Асинхронный хук Django вызывает без перехода в поток
+            self.process_template_response = self.aprocess_template_response
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.METRICS['ENABLED']:
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        with self.start(request).record():
+            response = self.get_response(request)
+        self.finish(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.METRICS['ENABLED']:
+            return await self.get_response(request)
+
+        started = time.perf_counter()
+        with self.start(request).record():
+            response = await self.get_response(request)
+        self.finish(request, response, started)
+        return response
+
+    def start(self, request):
+        request.query_timing = QueryRecorder(track_fingerprints=False)
+        request.template_timing = [0.0, 0.0]
+        return request.query_timing
+
+    def finish(self, request, response, started):
+        total = time.perf_counter() - started
+        recorder = request.query_timing
+        render_started, render_finished = request.template_timing
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={recorder.duration * 1000:.2f}',
+            f'template;dur={(render_finished - render_started) * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+        match = request.resolver_match
+        metrics.registry.observe(
+            match.view_name if match else '<unmatched>',
+            request.method,
+            response.status_code,
+            total,
+        )
+
+    def process_template_response(self, request, response):
+        # Эта middleware внешняя, поэтому ее хук вызывается последним,
+        # непосредственно перед рендерингом
+        timing = getattr(request, 'template_timing', None)
+        if timing is not None:
+            timing[0] = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: timing.__setitem__(1, time.perf_counter())
+            )
+        return response
+
+    async def aprocess_template_response(self, request, response):
+        return MetricsMiddleware.process_template_response(
+            self, request, response
+        )
+
+
+class ReplicaMiddleware(AsyncCapableMiddleware):
+    """
+    Представления с read_replica = True читают с реплики, если клиент
+    недавно ничего не изменял. После изменяющего запроса ставит cookie,
+    которая на время закрепляет клиента за основной базой.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if self.is_async:
+            # Флаг реплики живет в ContextVar: включать и снимать его
+            # нужно в одном контексте, без перехода в поток
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        # Чтение с реплики включается в process_view и действует до
+        # конца рендеринга ответа
+        request.replica_reads = ExitStack()
+        with request.replica_reads:
+            response = self.get_response(request)
+        return self.stick_to_primary(request, response)
+
+    async def __acall__(self, request):
+        request.replica_reads = ExitStack()
+        with request.replica_reads:
+            response = await self.get_response(request)
+        return self.stick_to_primary(request, response)
+
+    def stick_to_primary(self, request, response):
+        config = settings.REPLICA
+        if request.method not in SAFE_METHODS and routers.replica_alias():
+            response.set_cookie(
+                config['COOKIE'],
+                '1',
+                max_age=config['STICKY_SECONDS'],
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if (getattr(view_class, 'read_replica', False)
+                and request.method in SAFE_METHODS
+                and settings.REPLICA['COOKIE'] not in request.COOKIES):
+            request.replica_reads.enter_context(routers.replica())
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        ReplicaMiddleware.process_view(
+            self, request, view_func, view_args, view_kwargs
+        )
@@ -0,0 +1,198 @@
+"""
+Минимальный сервер протокола Redis (RESP2) в памяти процесса для
+тестов. Понимает команды, которыми пользуется RedisCache Django, и
+позволяет проверять общий кеш нескольких воркеров без сети и без
+настоящего Redis:
+
+    with RedisStub() as server:
+        CACHES = {'default': cache_url.parse(server.url)}
+"""
+import socketserver
+import threading
+import time
+
+
+class CommandError(Exception):
+    pass
+
+
+class Store:
+    """Ключи с необязательным временем истечения."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {}
+        self.expires = {}
+
+    def alive(self, key):
+        expires = self.expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def expire(self, key, seconds):
+        self.expires[key] = time.monotonic() + seconds
+
+    def execute(self, name, args):
+        handler = getattr(self, f'cmd_{name.lower()}', None)
+        if handler is None:
+            raise CommandError(f"unknown command '{name}'")
+        with self.lock:
+            return handler(*args)
+
+    def cmd_ping(self, *args):
+        return 'PONG'
+
+    def cmd_client(self, *args):
+        return 'OK'
+
+    def cmd_select(self, db):
+        return 'OK'
+
+    def cmd_get(self, key):
+        return self.data[key] if self.alive(key) else None
+
+    def cmd_mget(self, *keys):
+        return [self.cmd_get(key) for key in keys]
+
+    def cmd_set(self, key, value, *flags):
+        flags = [flag.decode().upper() for flag in flags]
+        exists = self.alive(key)
+        if ('NX' in flags and exists) or ('XX' in flags and not exists):
+            return None
+        self.data[key] = value
+        self.expires.pop(key, None)
+        for unit, scale in (('EX', 1), ('PX', 0.001)):
+            if unit in flags:
+                seconds = int(flags[flags.index(unit) + 1]) * scale
+                self.expire(key, seconds)
+        return 'OK'
+
+    def cmd_mset(self, *pairs):
+        for key, value in zip(pairs[::2], pairs[1::2]):
+            self.cmd_set(key, value)
+        return 'OK'
+
+    def cmd_del(self, *keys):
+        deleted = [key for key in keys if self.alive(key)]
+        for key in deleted:
+            del self.data[key]
+            self.expires.pop(key, None)
+        return len(deleted)
+
+    def cmd_exists(self, *keys):
+        return sum(1 for key in keys if self.alive(key))
+
+    def cmd_expire(self, key, seconds):
+        if not self.alive(key):
+            return 0
+        self.expire(key, int(seconds))
+        return 1
+
+    def cmd_persist(self, key):
+        if not self.alive(key):
+            return 0
+        return 1 if self.expires.pop(key, None) is not None else 0
+
+    def cmd_incrby(self, key, delta):
+        value = int(self.cmd_get(key) or 0) + int(delta)
+        self.data[key] = str(value).encode()
+        return value
+
+    def cmd_flushdb(self, *args):
+        self.data.clear()
+        self.expires.clear()
+        return 'OK'
+
+
+def read_command(rfile):
+    """Читает одну команду-массив строк или None при закрытии соединения."""
+    line = rfile.readline()
+    if not line:
+        return None
+    if not line.startswith(b'*'):
+        return line.split()
+    args = []
+    for _ in range(int(line[1:])):
+        length = int(rfile.readline()[1:])
+        args.append(rfile.read(length + 2)[:-2])
+    return args
+
+
+def encode(value):
+    if value is None:
+        return b'$-1\r\n'
+    if isinstance(value, CommandError):
+        return f'-ERR {value}\r\n'.encode()
+    if isinstance(value, int):
+        return f':{value}\r\n'.encode()
+    if isinstance(value, str):
+        return f'+{value}\r\n'.encode()
+    if isinstance(value, list):
+        return b'*%d\r\n' % len(value) + b''.join(map(encode, value))
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+
+class Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        queued = None
+        while (command := read_command(self.rfile)) is not None:
+            name, args = command[0].decode().upper(), command[1:]
+            if name == 'MULTI':
+                queued, reply = [], 'OK'
+            elif name == 'EXEC':
+                reply = [self.run(*item) for item in queued or []]
+                queued = None
+            elif queued is not None:
+                queued.append((name, args))
+                reply = 'QUEUED'
+            else:
+                reply = self.run(name, args)
+            self.wfile.write(encode(reply))
+
+    def run(self, name, args):
+        try:
+            return self.server.store.execute(name, args)
+        except (CommandError, TypeError, ValueError) as error:
+            return CommandError(error)
+
+
+class Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class RedisStub:
+    """Сервер на свободном порту localhost в фоновом потоке."""
+
+    def __init__(self):
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.server.store = Store()
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+
+    @property
+    def url(self):
+        # Сервер отвечает только по RESP2, без рукопожатия HELLO
+        host, port = self.server.server_address
+        return f'redis://{host}:{port}/0?protocol=2'
+
+    @property
+    def store(self):
+        return self.server.store
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,67 @@
+"""
+Чтение с реплики базы данных.
+
+Реплика подключается переменной REPLICA_DATABASE_URL. Читают с нее
+только представления с атрибутом read_replica = True и только в
+безопасных запросах: ReplicaMiddleware включает чтение с реплики на
+время такого запроса. После изменяющего запроса клиент получает
+cookie, и в течение REPLICA['STICKY_SECONDS'] его запросы снова идут
+в основную базу, чтобы он видел свои изменения, даже если реплика
+отстает.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_reading = ContextVar('read_replica', default=False)
+
+
+def replica_alias():
+    """Псевдоним реплики или None, если она не настроена."""
+    alias = settings.REPLICA['ALIAS']
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def replica():
+    token = _reading.set(True)
+    try:
+        yield
+    finally:
+        _reading.reset(token)
+
+
+@contextmanager
+def primary():
+    """
+    Принудительно читает из основной базы. Нужно там, где прочитанное
+    надолго попадает в кеш под новой версией данных.
+    """
+    token = _reading.set(False)
+    try:
+        yield
+    finally:
+        _reading.reset(token)
+
+
+def is_reading_replica():
+    return _reading.get() and replica_alias() is not None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if is_reading_replica():
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На реплике те же данные, что и в основной базе
+        databases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
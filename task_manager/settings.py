@@ -13,9 +13,11 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 
-import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
+from task_manager import cache_url, database
+
 load_dotenv()
 
 
@@ -58,16 +60,20 @@ INSTALLED_APPS = [
     'task_manager.users.apps.UsersConfig',
     'task_manager.statuses.apps.StatusesConfig',
     'task_manager.tasks.apps.TasksConfig',
-    'task_manager.labels.apps.LabelsConfig'
+    'task_manager.labels.apps.LabelsConfig',
+    'task_manager.jobs.apps.JobsConfig',
 ]
 
 MIDDLEWARE = [
+    'task_manager.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'task_manager.middleware.QueryProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.auth.middleware.RemoteUserMiddleware',
+    'task_manager.middleware.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'rollbar.contrib.django.middleware.RollbarNotifierMiddleware',
@@ -80,19 +86,84 @@ ROLLBAR = {
     'root': BASE_DIR,
 }
 
+# Профилирование SQL-запросов: доля запросов из выборки и бюджеты
+# числа запросов по имени URL
+QUERY_PROFILING = {
+    'ENABLED': os.getenv('QUERY_PROFILING', 'True') == 'True',
+    'SAMPLE_RATE': float(
+        os.getenv('QUERY_PROFILING_SAMPLE_RATE', '1' if DEBUG else '0.05')
+    ),
+    'RAISE_ON_BUDGET': DEBUG,
+    'BUDGETS': {
+        'tasks:list': 9,
+        'tasks:detail': 5,
+        'users:list': 5,
+        'statuses:list': 5,
+        'labels:list': 5,
+    },
+}
+
+# Server-Timing и /metrics. При нескольких воркерах gunicorn задайте
+# METRICS_DIR: каждый воркер пишет туда свой файл, а /metrics их
+# суммирует. /metrics отдается только с заголовком
+# Authorization: Bearer <METRICS_TOKEN>; без токена он закрыт.
+METRICS = {
+    'ENABLED': os.getenv('METRICS', 'True') == 'True',
+    'DIR': os.getenv('METRICS_DIR', ''),
+    'FLUSH_INTERVAL': float(os.getenv('METRICS_FLUSH_INTERVAL', '5')),
+    'TOKEN': os.getenv('METRICS_TOKEN', ''),
+}
+
+# Фоновые задания (manage.py run_worker): пул потоков или процессов,
+# повторы после ошибки через BACKOFF * 2^(попытка - 1) секунд, но не
+# дольше MAX_BACKOFF. Задание, которое воркер держит дольше
+# LOCK_TIMEOUT, считается брошенным и снова попадает в очередь.
+JOBS = {
+    'CONCURRENCY': int(os.getenv('JOBS_CONCURRENCY', '4')),
+    'MODE': os.getenv('JOBS_MODE', 'thread'),
+    'POLL_INTERVAL': float(os.getenv('JOBS_POLL_INTERVAL', '1')),
+    'MAX_ATTEMPTS': 3,
+    'BACKOFF': 5,
+    'MAX_BACKOFF': 60 * 10,
+    'LOCK_TIMEOUT': 60 * 60,
+}
+
+# Живое обновление списка задач (tasks/live.py): интервал комментариев
+# в молчащем потоке, очередь событий на клиента, пауза EventSource
+# перед переподключением в миллисекундах (под WSGI - интервал опроса),
+# интервал опроса журнала событий процессом ASGI и срок хранения
+# журнала в секундах
+LIVE_UPDATES = {
+    'HEARTBEAT': float(os.getenv('LIVE_HEARTBEAT', '15')),
+    'QUEUE_SIZE': 100,
+    'RETRY': 3000,
+    'POLL_INTERVAL': float(os.getenv('LIVE_POLL_INTERVAL', '1')),
+    'RETENTION': 3600,
+}
+
 ROOT_URLCONF = 'task_manager.urls'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not DEBUG:
+    # В продакшене шаблоны компилируются один раз на процесс
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': TEMPLATE_LOADERS,
         },
     },
 ]
@@ -110,11 +181,78 @@ WSGI_APPLICATION = 'task_manager.wsgi.application'
 #     }
 # }
 DATABASES = {
-    'default': dj_database_url.config(
+    'default': database.config(
         default=f'sqlite:///{BASE_DIR / "db.sqlite3"}',
     )
 }
 
+# Реплика для чтения в списках и карточках (task_manager/routers.py).
+# После изменения клиент STICKY_SECONDS читает из основной базы.
+REPLICA = {
+    'ALIAS': 'replica',
+    'STICKY_SECONDS': int(os.getenv('REPLICA_STICKY_SECONDS', '5')),
+    'COOKIE': 'use_primary',
+}
+if os.getenv('REPLICA_DATABASE_URL'):
+    DATABASES[REPLICA['ALIAS']] = database.config(
+        default='', env='REPLICA_DATABASE_URL'
+    )
+DATABASE_ROUTERS = ['task_manager.routers.ReplicaRouter']
+
+# Кеш общий для всех воркеров, если CACHE_URL указывает на Redis:
+# redis://host:6379/0, file:///var/tmp/task_manager или locmem://.
+# Префикс ключей привязан к деплою: новая версия кода не читает
+# фрагменты шаблонов и объекты, закешированные предыдущей.
+CACHES = {
+    'default': cache_url.config(
+        default='locmem://',
+        key_prefix=(
+            os.getenv('CACHE_KEY_PREFIX')
+            or os.getenv('RENDER_GIT_COMMIT', '')[:12]
+        ),
+    )
+}
+
+# Число процессов сервера: gunicorn и uvicorn берут его из той же
+# переменной. Версии в кеше (справочники, строки списка задач, ETag)
+# сбрасываются только в кеше процесса, обработавшего изменение, поэтому
+# при нескольких процессах они работают лишь с общим кешем
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', '1'))
+
+# Хранилище сессий (SESSION_BACKEND): cached_db читает сессию из кеша
+# и пишет в базу, signed_cookies обходится без сервера вовсе, db - без
+# кеша. Сессии в кеше возможны только с кешем, общим для всех
+# процессов: иначе выход и смена пароля не доходят до других воркеров
+CACHE_SHARED = cache_url.is_shared(CACHES['default'])
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_BACKEND = os.getenv(
+    'SESSION_BACKEND', 'cached_db' if CACHE_SHARED else 'db'
+)
+if SESSION_BACKEND in {'cached_db', 'cache'} and not CACHE_SHARED:
+    raise ImproperlyConfigured(
+        f'SESSION_BACKEND={SESSION_BACKEND} требует общего кеша: '
+        'укажите CACHE_URL=redis://... или file://...'
+    )
+SESSION_ENGINE = SESSION_ENGINES[SESSION_BACKEND]
+
+# Сообщения после действий живут в подписанной cookie и не изменяют
+# сессию
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# С общим кешем пользователь сессии берется из кеша. ModelBackend
+# остается для сессий, созданных до этого, и для кеша процесса, где
+# деактивация пользователя не дошла бы до других воркеров
+AUTHENTICATION_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
+if CACHE_SHARED:
+    AUTHENTICATION_BACKENDS.insert(
+        0, 'task_manager.users.backends.CachedModelBackend'
+    )
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -6,6 +6,7 @@ from django.urls import reverse
 class Status(models.Model):
     name = models.CharField("Имя", max_length=100)
     created_at = models.DateTimeField("Дата создания", auto_now_add=True)
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
 
     def __str__(self):
         return self.name
@@ -1,22 +1,35 @@
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
+from django.db.models import ProtectedError
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import CreateView, DeleteView, ListView, UpdateView
 
+from task_manager.conditional import STATUSES, TASKS, ConditionalGetMixin
+from task_manager.tasks import counters
+
 from .forms import StatusForm
 from .models import Status
 
 STATUSES_LIST_URL = reverse_lazy('statuses:list')
 
 
-class StatusListView(LoginRequiredMixin, ListView):
+class StatusListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = Status
     template_name = 'statuses/list.html'
     context_object_name = 'statuses'
     ordering = ['id']
+    # Задачи тоже влияют на страницу: в ней выводятся их счетчики
+    version_names = (STATUSES, TASKS)
+    read_replica = True
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Число задач берется из счетчиков, без COUNT на каждый статус
+        counters.attach(context['statuses'], counters.STATUS)
+        return context
 
 
 class StatusCreateView(LoginRequiredMixin, SuccessMessageMixin, CreateView):
@@ -41,13 +54,21 @@ class StatusDeleteView(LoginRequiredMixin, DeleteView):
     success_url = STATUSES_LIST_URL
 
     def form_valid(self, form):
-        # Проверяем, используется ли статус в задачах
-        if self.get_object().task_set.exists():
-            messages.error(
-                self.request,
-                _('Невозможно удалить статус, потому что он используется')
-            )
-            return redirect(self.success_url)
+        # Проверяем по задачам, а не по счетчикам: счетчик может отстать
+        if self.object.task_set.exists():
+            return self.refuse()
+        try:
+            response = super().form_valid(form)
+        except ProtectedError:
+            # Задачу со статусом создали уже после проверки
+            return self.refuse()
 
         messages.success(self.request, _('Статус успешно удален'))
-        return super().form_valid(form)
\ No newline at end of file
+        return response
+
+    def refuse(self):
+        messages.error(
+            self.request,
+            _('Невозможно удалить статус, потому что он используется')
+        )
+        return redirect(self.success_url)
\ No newline at end of file
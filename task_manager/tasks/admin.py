@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Task
+from .models import Task, TaskEvent
 
 
 @admin.register(Task)
@@ -9,4 +9,15 @@ class TaskAdmin(admin.ModelAdmin):
     list_filter = ('status', 'created_at', 'labels', 'executor')
     search_fields = ('name', 'description')
     readonly_fields = ('created_at',)
-    filter_horizontal = ('labels',)
\ No newline at end of file
+    filter_horizontal = ('labels',)
+
+
+@admin.register(TaskEvent)
+class TaskEventAdmin(admin.ModelAdmin):
+    list_display = ('task', 'user', 'action', 'created_at')
+    list_filter = ('action',)
+    raw_id_fields = ('task', 'user')
+
+    # История только дополняется
+    def has_change_permission(self, request, obj=None):
+        return False
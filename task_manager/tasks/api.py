@@ -0,0 +1,184 @@
+"""
+JSON API задач: список с фильтрами TaskFilter, постраничным выводом
+по курсору и выбором полей (?fields=), а также массовые операции.
+"""
+import json
+
+from django.db.models import Prefetch
+from django.http import JsonResponse
+from django.views.generic import View
+
+from task_manager.labels.models import Label
+
+from . import bulk
+from .filters import TaskFilter
+from .models import Task
+from .pagination import InvalidCursor, paginate_by_cursor
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Поле API -> атрибут модели
+TASK_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'description': 'description',
+    'status': 'status_id',
+    'author': 'author_id',
+    'executor': 'executor_id',
+    'labels': None,
+    'created_at': 'created_at',
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status, errors):
+        super().__init__(errors)
+        self.status = status
+        self.errors = errors
+
+
+def parse_fields(params):
+    """Разбирает ?fields=id,name; без параметра отдаются все поля."""
+    raw = params.get('fields')
+    if not raw:
+        return list(TASK_FIELDS)
+    fields = [field.strip() for field in raw.split(',') if field.strip()]
+    unknown = sorted(set(fields) - set(TASK_FIELDS))
+    if unknown:
+        raise ApiError(400, {'fields': f'Неизвестные поля: {unknown}'})
+    return fields
+
+
+def parse_page_size(params):
+    try:
+        page_size = int(params.get('page_size', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ApiError(400, {'page_size': 'Ожидается целое число'})
+    if page_size < 1:
+        raise ApiError(400, {'page_size': 'Ожидается число больше 0'})
+    return min(page_size, MAX_PAGE_SIZE)
+
+
+def select_fields(queryset, fields):
+    """Загружает из базы только запрошенные колонки и метки."""
+    # id и created_at нужны для курсора
+    columns = {'id', 'created_at'}
+    columns.update(
+        TASK_FIELDS[field] for field in fields if TASK_FIELDS[field]
+    )
+    queryset = queryset.only(*columns)
+    if 'labels' in fields:
+        queryset = queryset.prefetch_related(
+            Prefetch('labels', queryset=Label.objects.only('id'))
+        )
+    return queryset
+
+
+def serialize_task(task, fields):
+    data = {}
+    for field in fields:
+        if field == 'labels':
+            data[field] = [label.pk for label in task.labels.all()]
+        elif field == 'created_at':
+            data[field] = task.created_at.isoformat()
+        else:
+            data[field] = getattr(task, TASK_FIELDS[field])
+    return data
+
+
+def parse_body(request):
+    try:
+        return json.loads(request.body or b'null')
+    except ValueError:
+        raise ApiError(400, {'__all__': 'Некорректный JSON'})
+
+
+class ApiView(View):
+    """Базовый класс: вход обязателен, ошибки возвращаются в JSON."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse(
+                {'errors': {'__all__': 'Требуется вход'}}, status=401
+            )
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({'errors': error.errors}, status=error.status)
+        except bulk.BulkValidationError as error:
+            return JsonResponse({'errors': error.errors}, status=400)
+
+    def http_method_not_allowed(self, request, *args, **kwargs):
+        return JsonResponse(
+            {'errors': {'__all__': 'Метод не поддерживается'}}, status=405
+        )
+
+
+class TaskApiListView(ApiView):
+    def get(self, request):
+        fields = parse_fields(request.GET)
+        page_size = parse_page_size(request.GET)
+
+        task_filter = TaskFilter(
+            request.GET, queryset=Task.objects.all(), request=request
+        )
+        if not task_filter.is_valid():
+            raise ApiError(400, task_filter.errors.get_json_data())
+
+        queryset = select_fields(task_filter.qs, fields)
+        try:
+            page = paginate_by_cursor(
+                queryset, request.GET.get('cursor', ''), page_size
+            )
+        except InvalidCursor:
+            raise ApiError(400, {'cursor': 'Некорректный курсор'})
+
+        return JsonResponse({
+            'results': [serialize_task(task, fields) for task in page],
+            'next_cursor': page.next_cursor,
+        })
+
+
+class TaskApiDetailView(ApiView):
+    def get(self, request, pk):
+        fields = parse_fields(request.GET)
+        task = select_fields(Task.objects.filter(pk=pk), fields).first()
+        if task is None:
+            raise ApiError(404, {'__all__': 'Задача не найдена'})
+        return JsonResponse(serialize_task(task, fields))
+
+
+class TaskApiBulkView(ApiView):
+    """
+    POST - создание, PATCH - частичное обновление, DELETE - удаление.
+    Каждый запрос выполняется одной транзакцией.
+    """
+
+    def post(self, request):
+        cleaned = bulk.clean_items(parse_body(request))
+        tasks = bulk.create_tasks(cleaned, author=request.user)
+        return JsonResponse(
+            {'created': [task.pk for task in tasks]}, status=201
+        )
+
+    def patch(self, request):
+        cleaned = bulk.clean_items(parse_body(request), partial=True)
+        tasks = bulk.update_tasks(cleaned, request.user)
+        return JsonResponse({'updated': [task.pk for task in tasks]})
+
+    def delete(self, request):
+        body = parse_body(request)
+        ids = body.get('ids') if isinstance(body, dict) else None
+        if not isinstance(ids, list) or not all(
+            isinstance(pk, int) for pk in ids
+        ):
+            raise ApiError(400, {'ids': 'Ожидается список id задач'})
+        try:
+            deleted = bulk.delete_tasks(ids, request.user)
+        except PermissionError as error:
+            raise ApiError(403, {
+                'ids': 'Задачу может удалить только ее автор',
+                'forbidden': error.args[0],
+            })
+        return JsonResponse({'deleted': deleted})
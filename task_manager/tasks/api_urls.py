@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import api
+
+app_name = 'api_tasks'
+
+urlpatterns = [
+    path('', api.TaskApiListView.as_view(), name='list'),
+    path('bulk/', api.TaskApiBulkView.as_view(), name='bulk'),
+    path('<int:pk>/', api.TaskApiDetailView.as_view(), name='detail'),
+]
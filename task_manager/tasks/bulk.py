@@ -0,0 +1,326 @@
+"""
+Массовые операции с задачами: проверка входных данных пачкой и запись
+через bulk_create/bulk_update в одной транзакции. Внешние ключи и метки
+проверяются одним запросом на таблицу, а не на каждую задачу. Сигналы
+при этом не отправляются, поэтому счетчики, историю задач и журнал
+живого обновления операции пишут сами.
+"""
+from collections import Counter, defaultdict
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+
+from . import counters, dashboard, history, live
+from .models import Task, TaskEvent
+
+BATCH_SIZE = 500
+NAME_MAX_LENGTH = Task._meta.get_field('name').max_length
+REQUIRED_FIELDS = ('name', 'description', 'status')
+WRITABLE_FIELDS = ('name', 'description', 'status', 'executor', 'labels')
+
+
+class BulkValidationError(Exception):
+    """Ошибки по номерам записей: {индекс: {поле: сообщение}}."""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def _existing_ids(model, ids):
+    if not ids:
+        return set()
+    return set(
+        model.objects.filter(pk__in=ids).values_list('pk', flat=True)
+    )
+
+
+def _as_id(value):
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError
+    return value
+
+
+def _clean_text(item, partial):
+    data, errors = {}, {}
+    for field in item:
+        if field not in WRITABLE_FIELDS and field != 'id':
+            errors[field] = 'Неизвестное поле'
+    if not partial:
+        for field in REQUIRED_FIELDS:
+            if not item.get(field):
+                errors[field] = 'Обязательное поле.'
+
+    for field in ('name', 'description'):
+        if field not in item:
+            continue
+        value = item[field]
+        if not isinstance(value, str) or not value.strip():
+            errors[field] = 'Обязательное поле.'
+        else:
+            data[field] = value
+    if len(data.get('name', '')) > NAME_MAX_LENGTH:
+        errors['name'] = f'Не более {NAME_MAX_LENGTH} символов.'
+    return data, errors
+
+
+def _clean_references(item, partial):
+    """Id задачи и ссылок; бросает ValueError/TypeError для не-чисел."""
+    data = {}
+    if partial:
+        data['id'] = _as_id(item.get('id'))
+    if 'status' in item:
+        data['status'] = _as_id(item['status'])
+    if 'executor' in item:
+        executor = item['executor']
+        data['executor'] = None if executor is None else _as_id(executor)
+    if 'labels' in item:
+        data['labels'] = [_as_id(pk) for pk in item['labels']]
+    return data
+
+
+def _clean_item(item, partial):
+    if not isinstance(item, dict):
+        return {}, {'__all__': 'Ожидается объект'}
+
+    data, errors = _clean_text(item, partial)
+    try:
+        data.update(_clean_references(item, partial))
+    except (TypeError, ValueError):
+        errors['__all__'] = 'Id и ссылки задаются целыми числами'
+    return data, errors
+
+
+def _check_references(cleaned, errors):
+    """Проверяет ссылки одним запросом на каждую связанную таблицу."""
+    known_statuses = _existing_ids(
+        Status, {data['status'] for data in cleaned if 'status' in data}
+    )
+    known_users = _existing_ids(
+        User, {data['executor'] for data in cleaned if data.get('executor')}
+    )
+    known_labels = _existing_ids(
+        Label, {pk for data in cleaned for pk in data.get('labels', ())}
+    )
+    for index, data in enumerate(cleaned):
+        if 'status' in data and data['status'] not in known_statuses:
+            errors.setdefault(index, {})['status'] = 'Статус не найден'
+        executor = data.get('executor')
+        if executor is not None and executor not in known_users:
+            errors.setdefault(index, {})['executor'] = (
+                'Исполнитель не найден'
+            )
+        if set(data.get('labels', ())) - known_labels:
+            errors.setdefault(index, {})['labels'] = 'Метка не найдена'
+
+
+def clean_items(items, partial=False, check_references=True):
+    """
+    Проверяет список словарей с полями задачи. При partial=True
+    обязательные поля можно не передавать (частичное обновление).
+    check_references=False пропускает проверку ссылок в базе, если
+    вызывающий код уже сопоставил их со справочниками.
+    Возвращает список очищенных словарей или бросает BulkValidationError.
+    """
+    if not isinstance(items, list):
+        raise BulkValidationError({'__all__': 'Ожидается список задач'})
+
+    errors = {}
+    cleaned = []
+    for index, item in enumerate(items):
+        data, item_errors = _clean_item(item, partial)
+        if item_errors:
+            errors[index] = item_errors
+        cleaned.append(data)
+
+    if check_references:
+        _check_references(cleaned, errors)
+    if errors:
+        raise BulkValidationError(errors)
+    return cleaned
+
+
+def _task_kwargs(data):
+    kwargs = {}
+    for field in ('name', 'description'):
+        if field in data:
+            kwargs[field] = data[field]
+    if 'status' in data:
+        kwargs['status_id'] = data['status']
+    if 'executor' in data:
+        kwargs['executor_id'] = data['executor']
+    return kwargs
+
+
+def _task_state(task, label_ids=()):
+    """Поля задачи в формате истории, для сравнения с новыми данными."""
+    return {
+        'name': task.name,
+        'description': task.description,
+        'status': task.status_id,
+        'executor': task.executor_id,
+        'labels': sorted(label_ids),
+    }
+
+
+def _changes(state, data):
+    """Изменения задачи в формате истории (см. history.py)."""
+    changes = {}
+    for field in ('name', 'description', 'status', 'executor'):
+        if field in data and data[field] != state.get(field):
+            changes[field] = data[field]
+    if 'labels' in data:
+        old = state.get('labels', ())
+        if diff := history.label_diff(old, data['labels']):
+            changes['labels'] = diff
+    return changes
+
+
+def _add_labels(pairs, batch_size):
+    through = Task.labels.through
+    through.objects.bulk_create(
+        (through(task_id=task_id, label_id=label_id)
+         for task_id, label_id in pairs),
+        batch_size=batch_size,
+    )
+
+
+def create_tasks(cleaned, author, batch_size=BATCH_SIZE):
+    """
+    Создает задачи, их метки и записи истории пачками в одной
+    транзакции.
+    """
+    with transaction.atomic():
+        tasks = Task.objects.bulk_create(
+            [Task(author=author, **_task_kwargs(data)) for data in cleaned],
+            batch_size=batch_size,
+        )
+        pairs = [
+            (task.pk, label_id)
+            for task, data in zip(tasks, cleaned)
+            for label_id in set(data.get('labels', ()))
+        ]
+        _add_labels(pairs, batch_size)
+
+        # bulk_create не отправляет сигналы, счетчики учитываем сами
+        deltas = Counter()
+        for task in tasks:
+            deltas.update(counters.state_deltas(counters.task_state(task), 1))
+        deltas.update(counters.label_deltas(
+            [label_id for _, label_id in pairs], 1
+        ))
+        counters.apply(deltas)
+        history.record_many(
+            ((task, _changes({}, data)) for task, data in zip(tasks, cleaned)),
+            author,
+            action=TaskEvent.CREATED,
+        )
+        live.announce_many(live.CREATED, [task.pk for task in tasks])
+        dashboard.invalidate()
+    return tasks
+
+
+def update_tasks(cleaned, user=None, batch_size=BATCH_SIZE):
+    """
+    Частично обновляет задачи по id. Переданные метки заменяют
+    прежние. Изменения записываются в историю от имени user.
+    Возвращает список обновленных задач.
+    """
+    ids = [data.get('id') for data in cleaned]
+    with transaction.atomic():
+        tasks = Task.objects.select_for_update().in_bulk(ids)
+        missing = {
+            index: {'id': 'Задача не найдена'}
+            for index, pk in enumerate(ids) if pk not in tasks
+        }
+        if missing:
+            raise BulkValidationError(missing)
+
+        relabeled = {
+            data['id']: set(data['labels'])
+            for data in cleaned if 'labels' in data
+        }
+        old_labels = Task.labels.through.objects.filter(
+            task_id__in=relabeled
+        )
+        old_label_ids = defaultdict(list)
+        for task_id, label_id in old_labels.values_list('task_id', 'label_id'):
+            old_label_ids[task_id].append(label_id)
+        # Изменения считаются по заблокированным строкам, до записи
+        states = {
+            pk: _task_state(task, old_label_ids[pk])
+            for pk, task in tasks.items()
+        }
+        events = []
+        for data in cleaned:
+            state = states[data['id']]
+            events.append((tasks[data['id']], _changes(state, data)))
+            state.update(
+                (field, value) for field, value in data.items()
+                if field != 'id'
+            )
+
+        deltas = Counter()
+        for task in tasks.values():
+            deltas.update(counters.state_deltas(counters.task_state(task), -1))
+
+        # bulk_update не заполняет auto_now, время изменения ставим сами
+        fields = {'updated_at'}
+        now = timezone.now()
+        for data in cleaned:
+            kwargs = _task_kwargs(data)
+            for attr, value in kwargs.items():
+                setattr(tasks[data['id']], attr, value)
+            tasks[data['id']].updated_at = now
+            fields.update(kwargs)
+        Task.objects.bulk_update(
+            tasks.values(), sorted(fields), batch_size=batch_size
+        )
+
+        for task in tasks.values():
+            deltas.update(counters.state_deltas(counters.task_state(task), 1))
+
+        if relabeled:
+            deltas.update(counters.label_deltas(
+                [pk for ids in old_label_ids.values() for pk in ids], -1
+            ))
+            old_labels.delete()
+            pairs = [
+                (task_id, label_id)
+                for task_id, label_ids in relabeled.items()
+                for label_id in label_ids
+            ]
+            _add_labels(pairs, batch_size)
+            deltas.update(counters.label_deltas(
+                [label_id for _, label_id in pairs], 1
+            ))
+        counters.apply(deltas)
+        history.record_many(events, user)
+        live.announce_many(live.UPDATED, list(tasks))
+        dashboard.invalidate()
+    return list(tasks.values())
+
+
+def delete_tasks(ids, user):
+    """
+    Удаляет задачи по id. Как и в интерфейсе, удалить задачу может
+    только ее автор. Возвращает число удаленных задач.
+    """
+    with transaction.atomic():
+        tasks = Task.objects.filter(pk__in=ids)
+        foreign = list(
+            tasks.exclude(author=user).values_list('pk', flat=True)
+        )
+        if foreign:
+            raise PermissionError(foreign)
+        # Вклад задач в счетчики считаем группировкой в базе, а не
+        # сигналами по одной задаче
+        counters.apply(counters.queryset_deltas(tasks, -1))
+        with counters.muted():
+            _, deleted = tasks.delete()
+        dashboard.invalidate()
+    return deleted.get(Task._meta.label, 0)
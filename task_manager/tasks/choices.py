@@ -0,0 +1,102 @@
+"""
+Кеш справочников для выпадающих списков задач: статусов, исполнителей
+и меток. Списки хранятся в памяти процесса и в кеше Django под ключом
+с версией, которую сбрасывают сигналы при изменении справочников.
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from task_manager import routers, versions
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+
+CHOICES_KEY = 'choices:{}:{}'
+CHOICES_TIMEOUT = 60 * 60 * 24
+
+STATUSES = 'statuses'
+EXECUTORS = 'users'
+LABELS = 'labels'
+
+CHOICE_QUERIES = {
+    STATUSES: lambda: Status.objects.all(),
+    EXECUTORS: lambda: User.objects.only(
+        'id', 'username', 'first_name', 'last_name'
+    ),
+    LABELS: lambda: Label.objects.all(),
+}
+
+# Локальная копия в памяти процесса: {имя: (версия, список объектов)}
+_local = {}
+
+
+def get_choices(*names):
+    """
+    Возвращает словарь {имя: список объектов}. В установившемся режиме
+    обходится одним обращением к кешу и ни одним запросом к базе.
+    """
+    if not versions.enabled():
+        return {name: list(CHOICE_QUERIES[name]()) for name in names}
+
+    current = versions.get_versions(*names)
+    result = {}
+    missing = {}
+    for name in names:
+        local = _local.get(name)
+        if local and local[0] == current[name]:
+            result[name] = local[1]
+        else:
+            missing[CHOICES_KEY.format(name, current[name])] = name
+
+    cached = cache.get_many(missing) if missing else {}
+    for key, name in missing.items():
+        objects = cached.get(key)
+        if objects is None:
+            # Список ляжет в кеш под новой версией надолго, поэтому
+            # читаем его из основной базы, а не из отстающей реплики
+            with routers.primary():
+                objects = list(CHOICE_QUERIES[name]())
+            cache.set(key, objects, CHOICES_TIMEOUT)
+        _local[name] = (current[name], objects)
+        result[name] = objects
+    return result
+
+
+def get_statuses():
+    return get_choices(STATUSES)[STATUSES]
+
+
+def get_executors():
+    return get_choices(EXECUTORS)[EXECUTORS]
+
+
+def get_labels():
+    return get_choices(LABELS)[LABELS]
+
+
+def invalidate(name):
+    versions.bump_on_commit(name, lambda: _local.pop(name, None))
+
+
+def set_field_choices(field, objects, label=str):
+    """
+    Подставляет готовые варианты в виджет поля выбора модели. Само
+    поле по-прежнему проверяет значение по своему queryset.
+    """
+    choices = [(obj.pk, label(obj)) for obj in objects]
+    if getattr(field, 'empty_label', None) is not None:
+        choices.insert(0, ('', field.empty_label))
+    field.widget.choices = choices
+
+
+def executor_label(user):
+    return user.get_full_name()
+
+
+def apply_task_choices(status_field, executor_field, labels_field):
+    """Заполняет поля статуса, исполнителя и меток из кеша."""
+    cached = get_choices(STATUSES, EXECUTORS, LABELS)
+    set_field_choices(status_field, cached[STATUSES])
+    set_field_choices(
+        executor_field, cached[EXECUTORS], label=executor_label
+    )
+    set_field_choices(labels_field, cached[LABELS])
@@ -0,0 +1,213 @@
+"""
+Счетчики задач по статусам, меткам, авторам и исполнителям.
+
+Счетчики обновляются в той же транзакции, что и задачи: сигналами
+для обычных сохранений и явно в bulk.py для пакетных операций.
+Если значения разошлись с данными, их пересчитывает команда recount.
+"""
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import Task, TaskCounter
+
+STATUS = TaskCounter.STATUS
+LABEL = TaskCounter.LABEL
+AUTHOR = TaskCounter.AUTHOR
+EXECUTOR = TaskCounter.EXECUTOR
+# Поле задачи, по которому считается счетчик каждого вида
+TASK_FIELDS = {
+    STATUS: 'status_id',
+    AUTHOR: 'author_id',
+    EXECUTOR: 'executor_id',
+}
+
+_muted = ContextVar('task_counters_muted', default=False)
+
+
+@contextmanager
+def muted():
+    """
+    Отключает обновление счетчиков сигналами, когда вызывающий код
+    сам учитывает изменения (пакетное удаление) или пересчитывает их.
+    """
+    token = _muted.set(True)
+    try:
+        yield
+    finally:
+        _muted.reset(token)
+
+
+def is_muted():
+    return _muted.get()
+
+
+def task_state(task):
+    """Значения полей задачи, от которых зависят счетчики."""
+    return {kind: getattr(task, field) for kind, field in TASK_FIELDS.items()}
+
+
+def lock_state(task, update_fields=None):
+    """
+    Блокирует строку задачи до конца транзакции и запоминает значения
+    полей счетчиков из базы, а не из загруженного экземпляра: иначе
+    параллельные изменения той же задачи сбивали бы счетчики.
+    """
+    fields = [
+        field for field in TASK_FIELDS.values()
+        if update_fields is None
+        or field in update_fields
+        or field.removesuffix('_id') in update_fields
+    ]
+    row = None
+    if fields:
+        row = (
+            Task.objects.select_for_update()
+            .filter(pk=task.pk)
+            .values(*fields)
+            .first()
+        )
+    task.counted_state = row or {}
+
+
+def previous_state(task):
+    """Значения тех же полей, прочитанные lock_state перед сохранением."""
+    loaded = getattr(task, 'counted_state', {})
+    return {
+        kind: loaded[field]
+        for kind, field in TASK_FIELDS.items() if field in loaded
+    }
+
+
+def state_deltas(state, sign):
+    """Вклад задачи в счетчики: sign=1 при появлении, -1 при удалении."""
+    return Counter({
+        (kind, object_id): sign
+        for kind, object_id in state.items() if object_id is not None
+    })
+
+
+def change_deltas(old_state, new_state):
+    deltas = state_deltas(new_state, 1)
+    deltas.update(state_deltas(old_state, -1))
+    return deltas
+
+
+def label_deltas(label_ids, sign):
+    """Изменения счетчиков меток; метка может повторяться."""
+    deltas = Counter()
+    for label_id in label_ids:
+        deltas[(LABEL, label_id)] += sign
+    return deltas
+
+
+def apply(deltas):
+    """
+    Прибавляет изменения {(вид, id): дельта} к счетчикам: недостающие
+    строки создаются, затем по одному UPDATE на каждое значение дельты.
+    """
+    by_delta = defaultdict(lambda: defaultdict(list))
+    for (kind, object_id), delta in deltas.items():
+        if delta:
+            by_delta[delta][kind].append(object_id)
+    if not by_delta:
+        return
+    # Внутри транзакции задачи обходимся без лишней точки сохранения
+    with transaction.atomic(savepoint=False):
+        TaskCounter.objects.bulk_create(
+            [
+                TaskCounter(kind=kind, object_id=object_id)
+                for (kind, object_id), delta in deltas.items() if delta
+            ],
+            ignore_conflicts=True,
+        )
+        for delta, ids_by_kind in by_delta.items():
+            condition = reduce(or_, (
+                Q(kind=kind, object_id__in=object_ids)
+                for kind, object_ids in ids_by_kind.items()
+            ))
+            TaskCounter.objects.filter(condition).update(
+                value=F('value') + delta
+            )
+
+
+def get_counts(kind, object_ids):
+    """Число задач для каждого объекта; отсутствующие считаются нулем."""
+    counts = dict(
+        TaskCounter.objects.filter(
+            kind=kind, object_id__in=list(object_ids)
+        ).values_list('object_id', 'value')
+    )
+    return {object_id: counts.get(object_id, 0) for object_id in object_ids}
+
+
+def get_all(*kinds):
+    """Все ненулевые счетчики заданных видов: {вид: {id: число}}."""
+    result = {kind: {} for kind in kinds}
+    rows = TaskCounter.objects.filter(kind__in=kinds, value__gt=0)
+    for kind, object_id, value in rows.values_list(
+        'kind', 'object_id', 'value'
+    ):
+        result[kind][object_id] = value
+    return result
+
+
+def attach(objects, kind, attr='task_count'):
+    """Проставляет объектам число задач одним запросом."""
+    objects = list(objects)
+    counts = get_counts(kind, [obj.pk for obj in objects])
+    for obj in objects:
+        setattr(obj, attr, counts[obj.pk])
+    return objects
+
+
+def queryset_deltas(queryset, sign=1):
+    """Вклад всех задач выборки в счетчики, посчитанный в базе."""
+    deltas = Counter()
+    for kind, field in TASK_FIELDS.items():
+        rows = queryset.exclude(**{field: None}).order_by().values(
+            field
+        ).annotate(total=Count('pk')).values_list(field, 'total')
+        for object_id, total in rows:
+            deltas[(kind, object_id)] += sign * total
+    rows = Task.labels.through.objects.filter(
+        task__in=queryset.order_by().values('pk')
+    ).values('label_id').annotate(total=Count('pk')).values_list(
+        'label_id', 'total'
+    )
+    for label_id, total in rows:
+        deltas[(LABEL, label_id)] += sign * total
+    return deltas
+
+
+def recount():
+    """
+    Пересчитывает все счетчики по текущим данным. Возвращает число
+    исправленных счетчиков.
+    """
+    with transaction.atomic():
+        actual = queryset_deltas(Task.objects.all())
+        stored = {
+            (kind, object_id): value
+            for kind, object_id, value in TaskCounter.objects.values_list(
+                'kind', 'object_id', 'value'
+            )
+        }
+        drifted = {
+            key for key in actual.keys() | stored.keys()
+            if actual.get(key, 0) != stored.get(key, 0)
+        }
+        TaskCounter.objects.all().delete()
+        TaskCounter.objects.bulk_create(
+            [
+                TaskCounter(kind=kind, object_id=object_id, value=value)
+                for (kind, object_id), value in actual.items() if value
+            ],
+            batch_size=1000,
+        )
+    return len(drifted)
@@ -0,0 +1,89 @@
+"""
+Сводная статистика задач для дашборда. Каждое измерение считается
+одним запросом с группировкой, результат кешируется на короткое время
+под ключом с версией задач, которую сбрасывают сигналы.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from task_manager import versions
+
+from . import choices
+from .models import Task
+
+TASKS = 'tasks'
+STATS_KEY = 'dashboard:{}'
+STATS_TIMEOUT = 60
+DAYS = 30
+
+
+def _grouped(queryset, field):
+    return list(
+        queryset.order_by().values(field).annotate(
+            total=Count('pk')
+        ).values_list(field, 'total')
+    )
+
+
+def compute_stats(days=DAYS):
+    """Агрегаты по id: {измерение: [(id или дата, число задач)]}."""
+    since = timezone.now() - timedelta(days=days)
+    by_day = Task.objects.filter(created_at__gte=since).annotate(
+        day=TruncDate('created_at')
+    )
+    return {
+        'by_status': _grouped(Task.objects.all(), 'status_id'),
+        'by_executor': _grouped(Task.objects.all(), 'executor_id'),
+        'by_label': _grouped(Task.labels.through.objects.all(), 'label_id'),
+        'by_day': sorted(_grouped(by_day, 'day')),
+    }
+
+
+def get_stats():
+    """Агрегаты из кеша; пересчитываются после изменения задач."""
+    if not versions.enabled():
+        return compute_stats()
+    key = STATS_KEY.format(versions.get_version(TASKS))
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_stats()
+        cache.set(key, stats, STATS_TIMEOUT)
+    return stats
+
+
+def invalidate():
+    versions.bump_on_commit(TASKS)
+
+
+def _named(rows, objects, label=str, empty=None):
+    """Подставляет названия из кеша справочников вместо id."""
+    names = {obj.pk: label(obj) for obj in objects}
+    named = [
+        (names.get(object_id, empty) if object_id else empty, total)
+        for object_id, total in rows
+    ]
+    return sorted(named, key=lambda row: row[1], reverse=True)
+
+
+def get_dashboard():
+    stats = get_stats()
+    cached = choices.get_choices(
+        choices.STATUSES, choices.EXECUTORS, choices.LABELS
+    )
+    by_status = _named(stats['by_status'], cached[choices.STATUSES])
+    return {
+        'total': sum(total for _, total in by_status),
+        'by_status': by_status,
+        'by_executor': _named(
+            stats['by_executor'],
+            cached[choices.EXECUTORS],
+            label=lambda user: user.get_full_name() or user.username,
+            empty='Не назначен',
+        ),
+        'by_label': _named(stats['by_label'], cached[choices.LABELS]),
+        'by_day': stats['by_day'],
+    }
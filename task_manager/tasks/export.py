@@ -0,0 +1,98 @@
+"""
+Потоковая выгрузка задач в CSV и NDJSON. Строки читаются из базы
+порциями через iterator(), метки подтягиваются одним запросом на
+порцию, поэтому память не зависит от числа задач.
+
+Под ASGI синхронный генератор выгрузки StreamingHttpResponse собрал бы
+в список целиком, поэтому там он оборачивается в aiter_chunks().
+"""
+import csv
+import json
+from collections import defaultdict
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+from .models import Task
+
+CHUNK_SIZE = 2000
+LABELS_SEPARATOR = '|'
+EXPORT_COLUMNS = (
+    'id', 'name', 'description', 'status', 'author', 'executor',
+    'labels', 'created_at',
+)
+# Колонка выгрузки -> поле для values_list (метки собираются отдельно)
+VALUE_COLUMNS = {
+    'id': 'id',
+    'name': 'name',
+    'description': 'description',
+    'status': 'status__name',
+    'author': 'author__username',
+    'executor': 'executor__username',
+    'created_at': 'created_at',
+}
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def iter_task_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Отдает словари задач с метками, читая базу порциями."""
+    rows = queryset.order_by('-created_at', '-id').values_list(
+        *VALUE_COLUMNS.values()
+    ).iterator(chunk_size=chunk_size)
+    for chunk in chunked(rows, chunk_size):
+        labels = defaultdict(list)
+        task_labels = Task.labels.through.objects.filter(
+            task_id__in=[row[0] for row in chunk]
+        ).order_by('label__name').values_list('task_id', 'label__name')
+        for task_id, label_name in task_labels:
+            labels[task_id].append(label_name)
+
+        for row in chunk:
+            task = dict(zip(VALUE_COLUMNS, row))
+            task['labels'] = labels[task['id']]
+            task['created_at'] = task['created_at'].isoformat()
+            yield task
+
+
+async def aiter_chunks(lines, size=CHUNK_SIZE):
+    """
+    Асинхронный итератор по синхронному: очередные size строк читаются
+    через sync_to_async, и в памяти не бывает больше одной порции.
+    """
+    lines = iter(lines)
+    next_chunk = sync_to_async(lambda: list(islice(lines, size)))
+    while chunk := await next_chunk():
+        yield ''.join(chunk)
+
+
+class Echo:
+    """Псевдобуфер для csv.writer: write() просто возвращает строку."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        row['labels'] = LABELS_SEPARATOR.join(row['labels'])
+        if row['executor'] is None:
+            row['executor'] = ''
+        yield writer.writerow([row[column] for column in EXPORT_COLUMNS])
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', stream_csv),
+    'ndjson': ('application/x-ndjson; charset=utf-8', stream_ndjson),
+}
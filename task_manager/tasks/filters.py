@@ -6,8 +6,14 @@ from django.utils.translation import gettext_lazy as _
 from task_manager.labels.models import Label
 from task_manager.statuses.models import Status
 
+from . import choices
 from .models import Task
 
+LABEL_MATCH_CHOICES = (
+    ('any', _('Любая из меток')),
+    ('all', _('Все метки')),
+)
+
 
 class TaskFilter(django_filters.FilterSet):
     status = django_filters.ModelChoiceFilter(
@@ -20,13 +26,25 @@ class TaskFilter(django_filters.FilterSet):
         widget=forms.Select(attrs={'class': 'form-select'})
     )
 
-    labels = django_filters.ModelChoiceFilter(
+    labels = django_filters.ModelMultipleChoiceFilter(
         queryset=Label.objects.all(),
         label="Метка",
-        widget=forms.Select(attrs={'class': 'form-select'}),
+        widget=forms.SelectMultiple(attrs={'class': 'form-select'}),
         method='labels_filter'
     )
 
+    label_match = django_filters.ChoiceFilter(
+        choices=LABEL_MATCH_CHOICES,
+        label=_('Совпадение меток'),
+        empty_label=None,
+        method='label_match_filter'
+    )
+
+    q = django_filters.CharFilter(
+        label=_('Поиск'),
+        method='search_filter'
+    )
+
     self_tasks = django_filters.BooleanFilter(
         label=_('Только свои задачи'),
         method='own_tasks_filter',
@@ -47,28 +65,42 @@ class TaskFilter(django_filters.FilterSet):
 
     def labels_filter(self, queryset, name, value):
         """
-        Фильтрует задачи по выбранной метке.
+        Фильтрует задачи по выбранным меткам без JOIN и distinct().
         """
         if value:
-            return queryset.filter(labels__id=value.id)
-        
+            match_all = self.form.cleaned_data.get('label_match') == 'all'
+            return queryset.with_labels(
+                [label.id for label in value], match_all=match_all
+            )
+
+        return queryset
+
+    def search_filter(self, queryset, name, value):
+        """Полнотекстовый поиск по имени и описанию задачи."""
+        return queryset.search(value)
+
+    def label_match_filter(self, queryset, name, value):
+        """Режим совпадения учитывается в labels_filter."""
         return queryset
-    
-    @property
-    def qs(self):
-        """
-        Возвращает отфильтрованный queryset с distinct() для
-        предотвращения дублирования при фильтрации по ManyToMany полям (метки).
-        """
-        return super().qs.distinct()
 
     class Meta:
         model = Task
-        fields = ['status', 'executor', 'labels', 'self_tasks']
+        fields = [
+            'status', 'executor', 'labels', 'label_match', 'self_tasks', 'q'
+        ]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.filters['executor'].field.label_from_instance = (
-            lambda obj: obj.get_full_name()
+            choices.executor_label
         )
 
+    @property
+    def form(self):
+        """Форма фильтра с вариантами из кеша справочников."""
+        if not hasattr(self, '_form'):
+            fields = super().form.fields
+            choices.apply_task_choices(
+                fields['status'], fields['executor'], fields['labels']
+            )
+        return self._form
@@ -5,6 +5,7 @@ from django.contrib.auth.models import User
 from task_manager.labels.models import Label
 from task_manager.statuses.models import Status
 
+from . import choices
 from .models import Task
 
 
@@ -20,6 +21,11 @@ class TaskForm(forms.ModelForm):
         self.fields['status'].queryset = Status.objects.all()
         self.fields['labels'].queryset = Label.objects.all()
         # label для select по исполнителю
-        self.fields['executor'].label_from_instance = (
-            lambda obj: obj.get_full_name()
-        )
\ No newline at end of file
+        self.fields['executor'].label_from_instance = choices.executor_label
+        # Варианты для отрисовки берутся из кеша справочников,
+        # querysets остаются для проверки выбранных значений
+        choices.apply_task_choices(
+            self.fields['status'],
+            self.fields['executor'],
+            self.fields['labels'],
+        )
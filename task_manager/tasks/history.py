@@ -0,0 +1,185 @@
+"""
+История изменений задач. Событие хранит только поля, которые
+изменились, и их новые значения:
+
+    {'status': 3, 'executor': None, 'labels': {'+': [2], '-': [5]}}
+
+Прежнее значение поля - это новое значение из предыдущего события,
+поэтому история всей задачи восстанавливается одним запросом по
+индексу (task, created_at). Имена статусов, исполнителей и меток
+берутся из кеша справочников, а не из базы.
+"""
+from django.db import models
+
+from . import choices
+from .models import TaskEvent
+
+FIELDS = ('name', 'description', 'status', 'executor', 'labels')
+FIELD_LABELS = {
+    'name': "Имя",
+    'description': "Описание",
+    'status': "Статус",
+    'executor': "Исполнитель",
+    'labels': "Метки",
+}
+ADDED = '+'
+REMOVED = '-'
+# Прежнее значение неизвестно: задача изменена впервые с начала истории
+UNKNOWN = object()
+
+
+def _value(value):
+    """Значение поля в виде для JSON: объекты заменяются их id."""
+    if isinstance(value, models.Model):
+        return value.pk
+    if value is None or isinstance(value, (str, int)):
+        return value
+    return sorted(
+        item.pk if isinstance(item, models.Model) else int(item)
+        for item in value
+    )
+
+
+def label_diff(old_ids, new_ids):
+    diff = {}
+    if added := sorted(set(new_ids) - set(old_ids)):
+        diff[ADDED] = added
+    if removed := sorted(set(old_ids) - set(new_ids)):
+        diff[REMOVED] = removed
+    return diff
+
+
+def form_changes(form):
+    """Изменения задачи по сохраненной форме в формате события."""
+    changes = {}
+    for field in form.changed_data:
+        if field not in FIELDS:
+            continue
+        old = _value(form.initial.get(field))
+        new = _value(form.cleaned_data[field])
+        if field == 'labels':
+            if diff := label_diff(old or [], new):
+                changes[field] = diff
+        elif old != new:
+            changes[field] = new
+    return changes
+
+
+def record(task, user, changes, action=TaskEvent.UPDATED):
+    """
+    Добавляет событие в историю задачи. Вызывается в транзакции
+    сохранения задачи, чтобы изменение и его запись не разошлись.
+    """
+    if not changes and action == TaskEvent.UPDATED:
+        return None
+    return TaskEvent.objects.create(
+        task=task,
+        user=user if user and user.is_authenticated else None,
+        action=action,
+        changes=changes,
+    )
+
+
+def record_many(changes_by_task, user, action=TaskEvent.UPDATED):
+    """
+    То же, что record(), для пачки задач одним запросом. Принимает пары
+    (задача, изменения).
+    """
+    user = user if user and user.is_authenticated else None
+    return TaskEvent.objects.bulk_create(
+        TaskEvent(task=task, user=user, action=action, changes=changes)
+        for task, changes in changes_by_task
+        if changes or action != TaskEvent.UPDATED
+    )
+
+
+def merge(changes, newer):
+    """
+    Объединяет изменения двух последовательных событий. Метка,
+    добавленная и затем снятая (или наоборот), в итог не попадает.
+    """
+    merged = {**changes, **newer}
+    if 'labels' in changes and 'labels' in newer:
+        old, new = changes['labels'], newer['labels']
+        old_added = set(old.get(ADDED, []))
+        old_removed = set(old.get(REMOVED, []))
+        new_added = set(new.get(ADDED, []))
+        new_removed = set(new.get(REMOVED, []))
+        added = (old_added - new_removed) | (new_added - old_removed)
+        removed = (old_removed - new_added) | (new_removed - old_added)
+        merged['labels'] = {
+            key: sorted(ids)
+            for key, ids in ((ADDED, added), (REMOVED, removed)) if ids
+        }
+        if not merged['labels']:
+            del merged['labels']
+    return merged
+
+
+def _names():
+    cached = choices.get_choices(
+        choices.STATUSES, choices.EXECUTORS, choices.LABELS
+    )
+    return {
+        'status': {obj.pk: obj.name for obj in cached[choices.STATUSES]},
+        'executor': {
+            obj.pk: choices.executor_label(obj)
+            for obj in cached[choices.EXECUTORS]
+        },
+        'labels': {obj.pk: obj.name for obj in cached[choices.LABELS]},
+    }
+
+
+def _display(field, value, names):
+    if value is None or value == '':
+        return "—"
+    if field in names:
+        return names[field].get(value, f'#{value}')
+    return value
+
+
+def _describe(field, old, new, names):
+    """Строка истории для одного поля."""
+    label = FIELD_LABELS[field]
+    if field == 'description':
+        return f'{label}: изменено'
+    if field == 'labels':
+        parts = [
+            sign + ', '.join(_display(field, pk, names) for pk in new[sign])
+            for sign in (ADDED, REMOVED) if new.get(sign)
+        ]
+        return f'{label}: {"; ".join(parts)}'
+    new_text = _display(field, new, names)
+    if old is UNKNOWN:
+        return f'{label}: {new_text}'
+    return f'{label}: {_display(field, old, names)} → {new_text}'
+
+
+def timeline(task):
+    """
+    История задачи от новых событий к старым: список словарей с
+    событием и строками изменений. Один запрос к базе.
+    """
+    events = list(
+        TaskEvent.objects.filter(task=task)
+        .select_related('user')
+        .order_by('created_at', 'id')
+    )
+    if not events:
+        return []
+    names = _names()
+    state = {}
+    entries = []
+    for event in events:
+        changes = event.changes
+        lines = [
+            _describe(field, state.get(field, UNKNOWN), changes[field], names)
+            for field in FIELDS if field in changes
+        ]
+        if event.action == TaskEvent.CREATED:
+            # Поля, не указанные при создании, были пустыми
+            state = dict.fromkeys(FIELDS)
+        state.update(changes)
+        entries.append({'event': event, 'lines': lines})
+    entries.reverse()
+    return entries
@@ -0,0 +1,27 @@
+"""Фоновые задания для задач (см. task_manager/jobs/queue.py)."""
+from io import StringIO
+
+from django.core.management import call_command
+
+from task_manager.jobs.queue import handler
+
+from . import counters
+
+RECOUNT = 'tasks.recount'
+IMPORT = 'tasks.import'
+
+
+@handler(RECOUNT)
+def recount():
+    return {'fixed': counters.recount()}
+
+
+@handler(IMPORT)
+def import_file(path, author, format='csv'):
+    """Загрузка файла командой import_tasks; отчет попадает в результат."""
+    out, err = StringIO(), StringIO()
+    call_command(
+        'import_tasks', path, author=author, format=format,
+        stdout=out, stderr=err,
+    )
+    return {'output': out.getvalue(), 'errors': err.getvalue()}
@@ -0,0 +1,294 @@
+"""
+Живое обновление списка задач через Server-Sent Events.
+
+Сигналы задач пишут события created, updated и deleted в журнал
+LiveEvent в той же транзакции, что и само изменение: откаченные
+изменения к клиентам не попадают. Массовые операции, которые сигналы
+не отправляют, пишут журнал сами через announce_many(). Пока к
+процессу подключены клиенты, журнал опрашивает одна задача asyncio на
+процесс (Feed), поэтому клиент видит изменения, сделанные в любом
+процессе. Новые события хаб процесса раздает очередям asyncio
+подключенных клиентов: простаивающее соединение - это одна корутина,
+ждущая свою очередь, без потока и без обращений к базе. Данные строк
+читаются из базы один раз на опрос, а не на каждого клиента.
+
+Номер события - id строки журнала, общий для всех процессов.
+Переподключаясь, EventSource присылает последний номер в Last-Event-ID
+и получает пропущенные события. Под WSGI соединение не держится
+открытым: ответ содержит события после Last-Event-ID, и EventSource
+спрашивает снова через LIVE_UPDATES['RETRY'].
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Max, Q
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import LiveEvent, Task
+
+CREATED = 'created'
+UPDATED = 'updated'
+DELETED = 'deleted'
+
+# Очередь переполнилась: клиент слишком медленный, поток закрывается,
+# и EventSource переподключается сам
+DROPPED = None
+
+# Пропуск в номерах может быть транзакцией, которая еще не
+# зафиксирована: такие номера перезапрашиваются столько секунд
+GAP_TIMEOUT = 30
+# Больше пропусков за раз не отслеживаем
+MAX_GAPS = 100
+# Старые записи журнала удаляются на каждой PRUNE_EVERY-й записи
+PRUNE_EVERY = 1000
+
+
+def serialize_row(task):
+    """Данные строки списка задач для подгрузки в JSON."""
+    return {
+        'id': task.pk,
+        'name': task.name,
+        'url': reverse('tasks:detail', kwargs={'pk': task.pk}),
+        'status': task.status.name,
+        'author': task.author.get_full_name(),
+        'executor': task.executor.get_full_name() if task.executor else None,
+        'created_at': task.created_at.isoformat(),
+    }
+
+
+class Hub:
+    """Раздача событий очередям подписчиков в их циклах asyncio."""
+
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size
+        self.lock = threading.Lock()
+        self.subscribers = {}
+
+    def subscribe(self):
+        size = self.queue_size or settings.LIVE_UPDATES['QUEUE_SIZE']
+        queue = asyncio.Queue(size)
+        with self.lock:
+            self.subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue):
+        with self.lock:
+            self.subscribers.pop(queue, None)
+
+    def has_subscribers(self):
+        return bool(self.subscribers)
+
+    def publish(self, event):
+        """Можно вызывать из любого потока."""
+        by_loop = defaultdict(list)
+        with self.lock:
+            for queue, loop in self.subscribers.items():
+                by_loop[loop].append(queue)
+        # Один вызов на цикл событий, а не на каждого подписчика
+        for loop, queues in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(self.deliver, queues, event)
+            except RuntimeError:
+                # Цикл уже закрыт вместе с его клиентами
+                for queue in queues:
+                    self.unsubscribe(queue)
+
+    def deliver(self, queues, event):
+        for queue in queues:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.unsubscribe(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(DROPPED)
+
+
+hub = Hub()
+
+
+def announce(kind, pk):
+    """
+    Записывает событие в журнал. Вызывается в транзакции изменения
+    задачи, поэтому событие становится видно вместе с ним.
+    """
+    event = LiveEvent.objects.create(kind=kind, task_id=pk)
+    if event.pk % PRUNE_EVERY == 0:
+        prune()
+
+
+def announce_many(kind, pks):
+    """То же, что announce(), для пачки задач одним запросом."""
+    events = LiveEvent.objects.bulk_create(
+        LiveEvent(kind=kind, task_id=pk) for pk in pks
+    )
+    if any(event.pk % PRUNE_EVERY == 0 for event in events):
+        prune()
+
+
+def prune():
+    retention = timedelta(seconds=settings.LIVE_UPDATES['RETENTION'])
+    LiveEvent.objects.filter(
+        created_at__lt=timezone.now() - retention
+    ).delete()
+
+
+def latest_id():
+    return LiveEvent.objects.aggregate(last=Max('pk'))['last'] or 0
+
+
+def load_events(rows):
+    """
+    События (номер, вид, данные) по строкам журнала. Задачи читаются
+    одним запросом на все строки.
+    """
+    task_ids = {task_id for _, kind, task_id in rows if kind != DELETED}
+    tasks = Task.objects.select_related(
+        'status', 'author', 'executor'
+    ).in_bulk(task_ids) if task_ids else {}
+    events = []
+    for event_id, kind, task_id in rows:
+        if kind == DELETED:
+            events.append((event_id, kind, {'id': task_id}))
+        elif task_id in tasks:
+            # Задачу уже удалили: клиент получит событие deleted
+            events.append((event_id, kind, serialize_row(tasks[task_id])))
+    return events
+
+
+def _rows(condition):
+    return list(
+        LiveEvent.objects.filter(condition)
+        .order_by('pk')
+        .values_list('pk', 'kind', 'task_id')
+    )
+
+
+def read_since(last_id):
+    """События журнала после номера last_id."""
+    return load_events(_rows(Q(pk__gt=last_id)))
+
+
+def parse_event_id(value):
+    """Номер из заголовка Last-Event-ID или None."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Feed:
+    """Опрос журнала одной задачей asyncio на процесс, пока есть клиенты."""
+
+    def __init__(self):
+        self.task = None
+        self.last_id = 0
+        # Пропущенные номера и время, когда пропуск замечен
+        self.gaps = {}
+
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    async def start(self):
+        """
+        Запускает опрос с текущего конца журнала. Возвращается, когда
+        номер начала уже известен: события после него клиент получит.
+        """
+        if self.running():
+            return
+        last_id = await sync_to_async(latest_id)()
+        if not self.running():
+            self.last_id = last_id
+            self.gaps = {}
+            self.task = asyncio.ensure_future(self.run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self):
+        while hub.has_subscribers():
+            for event in await sync_to_async(self.poll)():
+                hub.publish(event)
+            await asyncio.sleep(settings.LIVE_UPDATES['POLL_INTERVAL'])
+
+    def poll(self):
+        """Новые события журнала, включая дописанные в пропуски."""
+        rows = _rows(Q(pk__gt=self.last_id) | Q(pk__in=list(self.gaps)))
+        now = time.monotonic()
+        for event_id, _, _ in rows:
+            self.gaps.pop(event_id, None)
+            if event_id > self.last_id:
+                first = max(self.last_id + 1, event_id - MAX_GAPS)
+                self.gaps.update(dict.fromkeys(range(first, event_id), now))
+                self.last_id = event_id
+        # Номера откаченных транзакций не появятся никогда
+        self.gaps = {
+            event_id: seen for event_id, seen in self.gaps.items()
+            if now - seen < GAP_TIMEOUT
+        }
+        return load_events(rows)
+
+
+feed = Feed()
+
+
+def format_event(event):
+    event_id, kind, data = event
+    payload = json.dumps(data, ensure_ascii=False)
+    return f'id: {event_id}\nevent: {kind}\ndata: {payload}\n\n'
+
+
+def retry_line():
+    return f'retry: {settings.LIVE_UPDATES["RETRY"]}\n\n'
+
+
+def replay(last_event_id):
+    """
+    Тело ответа под WSGI: события после last_event_id без ожидания
+    новых. При первом подключении - только номер, с которого продолжать.
+    """
+    if last_event_id is None:
+        return f'{retry_line()}id: {latest_id()}\n\n'
+    events = read_since(last_event_id)
+    return retry_line() + ''.join(format_event(event) for event in events)
+
+
+async def stream(last_event_id=None):
+    """
+    Тело ответа text/event-stream. Подписка начинается с первой
+    итерации и снимается, когда клиент отключается.
+    """
+    heartbeat = settings.LIVE_UPDATES['HEARTBEAT']
+    queue = hub.subscribe()
+    try:
+        await feed.start()
+        yield retry_line()
+        replayed = set()
+        if last_event_id is not None:
+            for event in await sync_to_async(read_since)(last_event_id):
+                replayed.add(event[0])
+                yield format_event(event)
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), heartbeat)
+            except TimeoutError:
+                # Комментарий не дает прокси закрыть молчащее соединение
+                yield ': ping\n\n'
+                continue
+            if event is DROPPED:
+                return
+            if event[0] not in replayed:
+                yield format_event(event)
+    finally:
+        hub.unsubscribe(queue)
+        if not hub.has_subscribers():
+            feed.stop()
@@ -0,0 +1,52 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время страницы с новым соединением к базе на каждый '
+        'запрос (CONN_MAX_AGE=0) и с постоянным соединением'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default=reverse('tasks:list'))
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        results = {}
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            client = Client()
+            for name, max_age in (('новое', 0), ('постоянное', 600)):
+                results[name] = self._measure(
+                    client, options['url'], options['repeat'], max_age
+                )
+                self.stdout.write(
+                    f'{name:<12} соединение {results[name]:8.2f} ms'
+                )
+        saved = results['новое'] - results['постоянное']
+        host = connection.settings_dict['HOST'] or 'локально'
+        self.stdout.write(
+            f'Экономия: {saved:.2f} ms на запрос ({connection.vendor}, {host})'
+        )
+
+    @staticmethod
+    def _measure(client, url, repeat, max_age):
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        timings = []
+        for _ in range(repeat + 1):
+            started = time.perf_counter()
+            response = client.get(url)
+            # Тестовый клиент не закрывает соединения после запроса,
+            # повторяем то, что делает обработчик WSGI по request_finished
+            close_old_connections()
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f'{url} ответил {response.status_code}')
+        # Первый запрос прогревает кеши и загрузчик шаблонов
+        return statistics.median(timings[1:])
@@ -0,0 +1,63 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает запущенный сервер запросами к одному адресу и '
+        'печатает req/s и задержки. Например, для сравнения WSGI и ASGI: '
+        'make render-start / make asgi-start, затем '
+        'bench_http --url http://127.0.0.1:8000/tasks/ и '
+        'bench_http --url http://127.0.0.1:8000/tasks/async/'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', required=True)
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument(
+            '--cookie',
+            action='append',
+            default=[],
+            help='name=value, например sessionid=... для страниц с входом',
+        )
+
+    def handle(self, *args, **options):
+        cookies = dict(
+            cookie.split('=', 1) for cookie in options['cookie']
+        )
+        local = threading.local()
+
+        def fetch(_):
+            # Отдельная сессия (и keep-alive соединение) на каждый поток
+            if not hasattr(local, 'session'):
+                local.session = requests.Session()
+            session = local.session
+            started = time.perf_counter()
+            response = session.get(options['url'], cookies=cookies)
+            return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            results = list(pool.map(fetch, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        latencies = [latency * 1000 for latency, _ in results]
+        errors = sum(1 for _, code in results if code >= 400)
+        self.stdout.write(f'url:      {options["url"]}')
+        self.stdout.write(f'requests: {len(results)} (errors: {errors})')
+        self.stdout.write(f'req/s:    {len(results) / elapsed:.1f}')
+        self.stdout.write(f'p50:      {statistics.median(latencies):.1f} ms')
+        self.stdout.write(f'p99:      {percentile(latencies, 0.99):.1f} ms')
+
@@ -0,0 +1,92 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from task_manager.tasks import seeding
+from task_manager.tasks.models import Task
+
+PAGE_SIZE = 10
+
+
+def legacy_filter(label_ids, match_all):
+    """Прежний путь: JOIN по меткам и distinct() по всей выборке."""
+    queryset = Task.objects.all()
+    if match_all:
+        for label_id in label_ids:
+            queryset = queryset.filter(labels__id=label_id)
+    else:
+        queryset = queryset.filter(labels__id__in=label_ids)
+    return queryset.distinct()
+
+
+def semijoin_filter(label_ids, match_all):
+    return Task.objects.with_labels(label_ids, match_all=match_all)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает фильтрацию задач по меткам через JOIN + DISTINCT '
+        'и через полусоединение (IN-подзапрос) на временно созданном '
+        'наборе данных'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=20000)
+        parser.add_argument('--labels', type=int, default=50)
+        parser.add_argument('--labels-per-task', type=int, default=3)
+        parser.add_argument('--filter-labels', type=int, default=3)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        # Данные создаются в транзакции и откатываются после замеров
+        with transaction.atomic():
+            seeded = seeding.seed(
+                users=1,
+                statuses=1,
+                labels=options['labels'],
+                tasks=options['tasks'],
+                labels_per_task=options['labels_per_task'],
+                seed=options['seed'],
+                prefix='bench-label-filter',
+            )
+            label_ids = rng.sample(
+                seeded.label_ids, options['filter_labels']
+            )
+            for match_all in (False, True):
+                self._compare(label_ids, match_all, options['repeat'])
+            transaction.set_rollback(True)
+
+    def _compare(self, label_ids, match_all, repeat):
+        mode = 'all' if match_all else 'any'
+        legacy = legacy_filter(label_ids, match_all)
+        semijoin = semijoin_filter(label_ids, match_all)
+        if set(legacy.values_list('pk', flat=True)) != set(
+            semijoin.values_list('pk', flat=True)
+        ):
+            self.stderr.write(f'[{mode}] результаты фильтров различаются')
+
+        variants = (('join+distinct', legacy), ('semi-join', semijoin))
+        for name, queryset in variants:
+            page_ms = self._measure(
+                lambda: list(queryset.order_by('-created_at')[:PAGE_SIZE]),
+                repeat,
+            )
+            count_ms = self._measure(queryset.count, repeat)
+            self.stdout.write(
+                f'[{mode}] {name:<14} '
+                f'page: {page_ms:8.2f} ms  count: {count_ms:8.2f} ms'
+            )
+
+    @staticmethod
+    def _measure(func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
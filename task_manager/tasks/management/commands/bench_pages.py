@@ -0,0 +1,136 @@
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import UTC, datetime
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+
+
+def build_scenarios(task, user):
+    """Основные страницы приложения: (имя, метод, url, параметры)."""
+    task_list = reverse('tasks:list')
+    label_id = task.labels.values_list('pk', flat=True).first()
+    filters = {
+        'status': {'status': task.status_id},
+        'executor': {'executor': task.executor_id or user.pk},
+        'label': {'label': label_id},
+        'self_tasks': {'self_tasks': 'on'},
+        'status+executor+label': {
+            'status': task.status_id,
+            'executor': task.executor_id or user.pk,
+            'label': label_id,
+        },
+    }
+    scenarios = [('tasks:list', 'get', task_list, {})]
+    scenarios += [
+        (f'tasks:list?{name}', 'get', task_list, params)
+        for name, params in filters.items()
+    ]
+    scenarios += [
+        ('tasks:list?cursor', 'get', task_list, {'cursor': ''}),
+        ('tasks:detail', 'get',
+         reverse('tasks:detail', kwargs={'pk': task.pk}), {}),
+        ('users:list', 'get', reverse('users:list'), {}),
+        ('statuses:list', 'get', reverse('statuses:list'), {}),
+        ('labels:list', 'get', reverse('labels:list'), {}),
+        # Проверки перед удалением: объекты используются, удаления нет
+        ('statuses:delete', 'post',
+         reverse('statuses:delete', kwargs={'pk': task.status_id}), {}),
+        ('labels:delete', 'post',
+         reverse('labels:delete', kwargs={'pk': label_id}), {}),
+        ('users:delete', 'post',
+         reverse('users:delete', kwargs={'pk': user.pk}), {}),
+    ]
+    if label_id is None:
+        scenarios = [s for s in scenarios if 'label' not in s[0]]
+    return scenarios
+
+
+def measure(client, method, url, params, repeat):
+    send = getattr(client, method)
+    send(url, params)  # прогрев
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = send(url, params)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    with CaptureQueriesContext(connection) as queries:
+        tracemalloc.start()
+        send(url, params)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'status_code': response.status_code,
+        'queries': len(queries),
+        'median_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(timings[int(0.95 * (len(timings) - 1))], 2),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет основные страницы на текущей базе (например, после '
+        'seed_perf) и записывает число запросов, время и пиковую память '
+        'в JSON для сравнения прогонов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument(
+            '--output', help='Файл для результатов, по умолчанию stdout'
+        )
+
+    def handle(self, *args, **options):
+        task = Task.objects.exclude(executor=None).order_by('pk').first()
+        if task is None:
+            raise CommandError('Нет задач: сначала запустите seed_perf')
+        user = task.author
+
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(user)
+        results = []
+        for name, method, url, params in build_scenarios(task, user):
+            result = measure(client, method, url, params, options['repeat'])
+            results.append({'name': name, 'url': url, **result})
+            self.stderr.write(
+                f'{name:<32} {result["queries"]:>4} запросов '
+                f'{result["median_ms"]:>9.2f} ms'
+            )
+            # Проверка удаления пользователя разлогинивает только при
+            # успехе, но на всякий случай входим заново
+            client.force_login(user)
+
+        report = {
+            'created_at': datetime.now(UTC).isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'repeat': options['repeat'],
+            'dataset': {
+                'users': User.objects.count(),
+                'statuses': Status.objects.count(),
+                'labels': Label.objects.count(),
+                'tasks': Task.objects.count(),
+            },
+            'results': results,
+        }
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
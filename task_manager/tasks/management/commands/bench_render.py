@@ -0,0 +1,85 @@
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.test import RequestFactory, override_settings
+
+from task_manager.tasks import seeding
+from task_manager.tasks.models import Task
+from task_manager.tasks.views import get_filter_context, get_row_cache_context
+
+# Замеры очищают кеш: свой кеш в памяти процесса, чтобы не стереть
+# общий кеш (на Redis cache.clear() - это FLUSHDB). Процесс один, так
+# что кеш строк включен и с locmem
+BENCH_SETTINGS = {
+    'CACHES': {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'bench-render',
+        },
+    },
+    'WEB_CONCURRENCY': 1,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время рендеринга списка задач с кешем строк и без '
+        'него на временно созданном наборе данных'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        # Данные создаются в транзакции и откатываются после замеров
+        with override_settings(**BENCH_SETTINGS), transaction.atomic():
+            seeding.seed(
+                users=20,
+                statuses=5,
+                labels=10,
+                tasks=options['rows'],
+                prefix='bench-render',
+            )
+            tasks = list(
+                Task.objects.with_related().filter(
+                    name__startswith='bench-render-'
+                )
+            )
+            request = RequestFactory().get('/tasks/')
+            request.user = tasks[0].author
+            context = {
+                'tasks': tasks,
+                **get_filter_context(request.GET),
+                **get_row_cache_context(),
+            }
+            cache.clear()
+            results = {}
+            for name, cache_rows in (('без кеша', False), ('с кешем', True)):
+                results[name] = self._measure(
+                    request, {**context, 'cache_rows': cache_rows},
+                    options['repeat'],
+                )
+                self.stdout.write(
+                    f'{name:<10} {results[name]:8.2f} ms '
+                    f'на {len(tasks)} строк'
+                )
+            transaction.set_rollback(True)
+
+        saved = 1 - results['с кешем'] / results['без кеша']
+        self.stdout.write(f'Экономия: {saved:.0%}')
+
+    @staticmethod
+    def _measure(request, context, repeat):
+        # Первый рендеринг прогревает загрузчик шаблонов и кеш строк
+        render_to_string('tasks/list.html', context, request)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            render_to_string('tasks/list.html', context, request)
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
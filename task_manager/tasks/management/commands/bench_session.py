@@ -0,0 +1,89 @@
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+# Замеры очищают кеш: свой кеш в памяти процесса, чтобы не стереть
+# общий кеш (на Redis cache.clear() - это FLUSHDB)
+BENCH_SETTINGS = {
+    'CACHES': {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'bench-session',
+        },
+    },
+    'WEB_CONCURRENCY': 1,
+}
+MODEL_BACKEND = 'django.contrib.auth.backends.ModelBackend'
+CACHED_BACKEND = 'task_manager.users.backends.CachedModelBackend'
+# (название, хранилище сессий, бэкенд аутентификации)
+STRATEGIES = (
+    ('db', 'django.contrib.sessions.backends.db', MODEL_BACKEND),
+    (
+        'cached_db',
+        'django.contrib.sessions.backends.cached_db',
+        CACHED_BACKEND,
+    ),
+    (
+        'signed_cookies',
+        'django.contrib.sessions.backends.signed_cookies',
+        CACHED_BACKEND,
+    ),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает число запросов и время страницы для вошедшего '
+        'пользователя при разных хранилищах сессий'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default=reverse('statuses:list'))
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        # Пользователь создается в транзакции и откатывается после замеров
+        with override_settings(**BENCH_SETTINGS), transaction.atomic():
+            user = User.objects.create_user(username='bench-session')
+            for name, engine, backend in STRATEGIES:
+                with override_settings(
+                    ALLOWED_HOSTS=['testserver'],
+                    SESSION_ENGINE=engine,
+                    AUTHENTICATION_BACKENDS=[backend],
+                ):
+                    queries, timing = self._measure(
+                        user, options['url'], options['repeat']
+                    )
+                self.stdout.write(
+                    f'{name:<15} {queries:3d} запросов {timing:8.2f} ms'
+                )
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def _measure(user, url, repeat):
+        cache.clear()
+        # Новый клиент заново строит цепочку middleware с настройками
+        client = Client()
+        client.force_login(user)
+        response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f'{url} ответил {response.status_code}')
+        # Журнал запросов очищается в начале каждого запроса, поэтому
+        # отсчет тоже начинается с пустого журнала
+        reset_queries()
+        with CaptureQueriesContext(connection) as captured:
+            client.get(url)
+        queries = len(captured)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+        return queries, statistics.median(timings)
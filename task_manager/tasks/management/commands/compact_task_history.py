@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from task_manager.tasks import dashboard, history
+from task_manager.tasks.models import TaskEvent
+
+DEFAULT_KEEP_DAYS = 90
+
+
+def compact_task(task_id, cutoff):
+    """
+    Сворачивает события задачи старше cutoff в одно событие с итоговыми
+    изменениями. Возвращает число удаленных записей.
+    """
+    with transaction.atomic():
+        events = list(
+            TaskEvent.objects.select_for_update()
+            .filter(task_id=task_id, created_at__lt=cutoff)
+            .order_by('created_at', 'id')
+        )
+        if len(events) < 2:
+            return 0
+
+        changes = {}
+        for event in events:
+            changes = history.merge(changes, event.changes)
+        first, last = events[0], events[-1]
+        created = first.action == TaskEvent.CREATED
+        if created and 'labels' in changes:
+            # До создания меток не было, удалять было нечего
+            changes['labels'].pop(history.REMOVED, None)
+        users = {event.user_id for event in events}
+
+        TaskEvent.objects.filter(pk__in=[event.pk for event in events]).delete()
+        TaskEvent.objects.create(
+            task_id=task_id,
+            user_id=users.pop() if len(users) == 1 else None,
+            action=TaskEvent.CREATED if created else TaskEvent.COMPACTED,
+            changes=changes,
+            created_at=last.created_at,
+        )
+    return len(events) - 1
+
+
+class Command(BaseCommand):
+    help = (
+        'Сворачивает старые события истории задач в одно событие на '
+        'задачу, чтобы история не росла бесконечно'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=DEFAULT_KEEP_DAYS,
+            help='Сколько дней хранить историю подробно',
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='Удалить старые события вместо сворачивания',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['keep_days'])
+        old_events = TaskEvent.objects.filter(created_at__lt=cutoff)
+
+        if options['drop']:
+            removed, _ = old_events.delete()
+        else:
+            task_ids = (
+                old_events.order_by()
+                .values('task_id')
+                .annotate(events=Count('id'))
+                .filter(events__gt=1)
+                .values_list('task_id', flat=True)
+            )
+            removed = sum(
+                compact_task(task_id, cutoff) for task_id in list(task_ids)
+            )
+        if removed:
+            # История видна на карточке задачи: сбрасываем ее ETag
+            dashboard.invalidate()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено событий истории: {removed}'
+        ))
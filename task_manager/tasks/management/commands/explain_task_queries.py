@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from task_manager.tasks.models import Task
+
+PAGE_SIZE = 10
+
+# Признаки полного просмотра таблицы задач в планах SQLite и Postgres
+FULL_SCAN_MARKERS = (
+    'SCAN tasks_task\n',
+    'Seq Scan on tasks_task ',
+)
+
+
+def canonical_queries(status_id, user_id, label_id):
+    """Запросы, которые выполняет список задач с разными фильтрами."""
+    tasks = Task.objects.order_by('-created_at', '-id')
+    return {
+        'list': tasks,
+        'status': tasks.filter(status_id=status_id),
+        'executor': tasks.filter(executor_id=user_id),
+        'author': tasks.filter(author_id=user_id),
+        'label': tasks.with_labels([label_id]),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет EXPLAIN для типовых запросов списка задач и '
+        'показывает, используются ли индексы'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--status', type=int, default=1)
+        parser.add_argument('--user', type=int, default=1)
+        parser.add_argument('--label', type=int, default=1)
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='EXPLAIN ANALYZE (только Postgres)',
+        )
+
+    def handle(self, *args, **options):
+        explain_options = {}
+        if options['analyze'] and connection.vendor == 'postgresql':
+            explain_options['analyze'] = True
+
+        queries = canonical_queries(
+            options['status'], options['user'], options['label']
+        )
+        for name, queryset in queries.items():
+            plan = queryset[:PAGE_SIZE].explain(**explain_options)
+            full_scan = any(
+                marker in plan + '\n' for marker in FULL_SCAN_MARKERS
+            )
+            verdict = 'full scan' if full_scan else 'index'
+            self.stdout.write(f'== {name}: {verdict}')
+            self.stdout.write(plan)
@@ -0,0 +1,211 @@
+import csv
+import json
+import os
+import sys
+import time
+from contextlib import nullcontext
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.jobs.queue import enqueue
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks import bulk, jobs
+from task_manager.tasks.export import LABELS_SEPARATOR, chunked
+
+
+def read_csv(stream):
+    for row in csv.DictReader(stream):
+        labels = row.get('labels') or ''
+        row['labels'] = [
+            name.strip() for name in labels.split(LABELS_SEPARATOR)
+            if name.strip()
+        ]
+        yield row
+
+
+def read_ndjson(stream):
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+READERS = {'csv': read_csv, 'ndjson': read_ndjson}
+
+
+class NameResolver:
+    """
+    Справочники статусов, пользователей и меток, загруженные в память
+    одним запросом на таблицу. Если имя статуса повторяется, берется
+    статус с меньшим id.
+    """
+
+    def __init__(self):
+        self.statuses = {}
+        for pk, name in Status.objects.order_by('-pk').values_list(
+            'pk', 'name'
+        ):
+            self.statuses[name] = pk
+        self.users = dict(User.objects.values_list('username', 'pk'))
+        self.labels = dict(Label.objects.values_list('name', 'pk'))
+
+    def resolve(self, row):
+        """Переводит строку выгрузки в данные для bulk.clean_items."""
+        # В NDJSON строкой может оказаться любое значение JSON
+        if not isinstance(row, dict):
+            return None, {'__all__': 'Ожидался объект JSON'}
+        errors = {}
+        item = {
+            'name': row.get('name'),
+            'description': row.get('description'),
+        }
+
+        status = row.get('status')
+        item['status'] = self.statuses.get(status)
+        if item['status'] is None:
+            errors['status'] = f'Статус не найден: {status}'
+
+        executor = row.get('executor') or None
+        item['executor'] = self.users.get(executor)
+        if executor and item['executor'] is None:
+            errors['executor'] = f'Пользователь не найден: {executor}'
+
+        labels = row.get('labels') or []
+        if not isinstance(labels, list):
+            errors['labels'] = 'Ожидался список меток'
+            labels = []
+        missing = [
+            name for name in labels
+            if not isinstance(name, str) or name not in self.labels
+        ]
+        if missing:
+            errors['labels'] = f'Метки не найдены: {missing}'
+        item['labels'] = [
+            self.labels[name] for name in labels
+            if isinstance(name, str) and name in self.labels
+        ]
+        return item, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает задачи из CSV или NDJSON (формат выгрузки задач) '
+        'пачками через bulk_create'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Путь к файлу или "-" для чтения из stdin'
+        )
+        parser.add_argument(
+            '--format', choices=sorted(READERS), default='csv'
+        )
+        parser.add_argument(
+            '--author',
+            required=True,
+            help='Имя пользователя, который станет автором задач',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=bulk.BATCH_SIZE
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только проверить данные, ничего не записывая',
+        )
+        parser.add_argument(
+            '--background',
+            action='store_true',
+            help='Загрузить файл фоновым заданием (run_worker)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['author'])
+        except User.DoesNotExist:
+            raise CommandError(f'Пользователь {options["author"]} не найден')
+
+        if options['background']:
+            self._enqueue(options)
+            return
+
+        if options['path'] == '-':
+            stream = nullcontext(sys.stdin)
+        else:
+            try:
+                stream = open(options['path'], encoding='utf-8', newline='')
+            except OSError as error:
+                raise CommandError(
+                    f'Не удалось открыть {options["path"]}: {error.strerror}'
+                )
+
+        started = time.perf_counter()
+        with stream as source:
+            try:
+                imported, failed = self._import(
+                    READERS[options['format']](source), author, options
+                )
+            except json.JSONDecodeError as error:
+                raise CommandError(f'Некорректная строка NDJSON: {error}')
+        elapsed = time.perf_counter() - started
+
+        rate = imported / elapsed if elapsed else 0
+        action = 'Проверено' if options['dry_run'] else 'Загружено'
+        self.stdout.write(
+            f'{action}: {imported}, с ошибками: {failed}, '
+            f'{elapsed:.2f} с, {rate:.0f} строк/с'
+        )
+
+    def _enqueue(self, options):
+        # Воркер читает файл сам, поэтому нужен путь, а не stdin
+        if options['path'] == '-' or options['dry_run']:
+            raise CommandError(
+                '--background работает только с файлом и без --dry-run'
+            )
+        job = enqueue(
+            jobs.IMPORT,
+            path=os.path.abspath(options['path']),
+            author=options['author'],
+            format=options['format'],
+        )
+        self.stdout.write(f'Задание {job.pk} поставлено в очередь')
+
+    def _import(self, rows, author, options):
+        resolver = NameResolver()
+        imported = failed = 0
+        batches = chunked(enumerate(rows, start=1), options['batch_size'])
+        for batch in batches:
+            cleaned = self._clean_batch(batch, resolver)
+            failed += len(batch) - len(cleaned)
+            if cleaned and not options['dry_run']:
+                bulk.create_tasks(
+                    cleaned, author, batch_size=options['batch_size']
+                )
+            imported += len(cleaned)
+        return imported, failed
+
+    def _clean_batch(self, batch, resolver):
+        """Возвращает проверенные строки пачки, ошибки пишет в stderr."""
+        items, lines = [], []
+        for line, row in batch:
+            item, errors = resolver.resolve(row)
+            if errors:
+                self._report(line, errors)
+            else:
+                items.append(item)
+                lines.append(line)
+
+        try:
+            return bulk.clean_items(items, check_references=False)
+        except bulk.BulkValidationError as error:
+            for index, errors in error.errors.items():
+                self._report(lines[index], errors)
+            valid = [
+                item for index, item in enumerate(items)
+                if index not in error.errors
+            ]
+            return bulk.clean_items(valid, check_references=False)
+
+    def _report(self, line, errors):
+        self.stderr.write(f'Запись {line}: {errors}')
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from task_manager.jobs.queue import enqueue
+from task_manager.tasks import counters, jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счетчики задач по статусам, меткам, авторам '
+        'и исполнителям, если они разошлись с данными'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--background',
+            action='store_true',
+            help='Поставить пересчет в очередь фоновых заданий',
+        )
+
+    def handle(self, *args, **options):
+        if options['background']:
+            job = enqueue(jobs.RECOUNT)
+            self.stdout.write(f'Задание {job.pk} поставлено в очередь')
+            return
+
+        fixed = counters.recount()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счетчиков: {fixed}'
+        ))
@@ -0,0 +1,90 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks import counters, dashboard, seeding
+from task_manager.tasks.models import Task, TaskEvent
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу детерминированным синтетическим набором данных '
+        'для замеров производительности'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--statuses', type=int, default=10)
+        parser.add_argument('--labels', type=int, default=100)
+        parser.add_argument('--tasks', type=int, default=100000)
+        parser.add_argument('--labels-per-task', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='perf')
+        parser.add_argument(
+            '--batch-size', type=int, default=seeding.BATCH_SIZE
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Удалить ранее созданные данные с этим префиксом',
+        )
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        users = User.objects.filter(username__startswith=f'{prefix}-user-')
+        if options['clear']:
+            self._clear(prefix, users)
+        elif users.exists():
+            raise CommandError(
+                f'Данные с префиксом "{prefix}" уже есть, '
+                'используйте --clear или другой --prefix'
+            )
+        if options['users'] < 1 or options['statuses'] < 1:
+            raise CommandError('Нужен хотя бы один пользователь и статус')
+
+        started = time.perf_counter()
+        result = seeding.seed(
+            users=options['users'],
+            statuses=options['statuses'],
+            labels=options['labels'],
+            tasks=options['tasks'],
+            labels_per_task=options['labels_per_task'],
+            seed=options['seed'],
+            prefix=prefix,
+            batch_size=options['batch_size'],
+            progress=lambda done: self.stdout.write(
+                f'задач: {done}/{options["tasks"]}'
+            ),
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано пользователей: {len(result.user_ids)}, '
+            f'статусов: {len(result.status_ids)}, '
+            f'меток: {len(result.label_ids)}, задач: {result.tasks} '
+            f'за {elapsed:.1f} с'
+        ))
+
+    def _clear(self, prefix, users):
+        """
+        Удаляет задачи набора запросами DELETE без загрузки строк в
+        память: у Task есть сигналы удаления и каскад на историю, и
+        обычный delete() перебрал бы каждую задачу. Счетчики после
+        этого пересчитываются один раз.
+        """
+        tasks = Task.objects.filter(author__in=users)
+        with transaction.atomic(), counters.muted():
+            for related in (
+                Task.labels.through.objects.filter(task__in=tasks),
+                TaskEvent.objects.filter(task__in=tasks),
+                tasks,
+            ):
+                related._raw_delete(related.db)
+            users.delete()
+            Status.objects.filter(name__startswith=f'{prefix}-status-').delete()
+            Label.objects.filter(name__startswith=f'{prefix}-label-').delete()
+            counters.recount()
+        dashboard.invalidate()
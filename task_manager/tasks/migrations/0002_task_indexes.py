@@ -0,0 +1,44 @@
+# Generated by Django 5.1.15 on 2026-10-18 17:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labels', '0001_initial'),
+        ('statuses', '0001_initial'),
+        ('tasks', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='name',
+            field=models.CharField(max_length=200, verbose_name='Имя'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='task_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['executor', '-created_at', '-id'], name='task_executor_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['author', '-created_at', '-id'], name='task_author_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['-created_at', '-id'], name='task_created_id_idx'),
+        ),
+        # Обратный индекс связующей таблицы для поиска задач по метке
+        migrations.RunSQL(
+            sql='CREATE INDEX tasks_task_labels_label_task_idx '
+                'ON tasks_task_labels (label_id, task_id);',
+            reverse_sql='DROP INDEX tasks_task_labels_label_task_idx;',
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from task_manager.tasks import search
+
+
+def install_search(apps, schema_editor):
+    search.install(schema_editor)
+
+
+def uninstall_search(apps, schema_editor):
+    search.uninstall(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task_indexes'),
+    ]
+
+    operations = [
+        # Поисковый индекс зависит от СУБД, поэтому создается вручную
+        migrations.RunPython(install_search, uninstall_search),
+    ]
@@ -0,0 +1,69 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_counters(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskCounter = apps.get_model('tasks', 'TaskCounter')
+    counters = []
+    for kind, field in (
+        ('status', 'status_id'),
+        ('author', 'author_id'),
+        ('executor', 'executor_id'),
+    ):
+        rows = Task.objects.exclude(**{field: None}).order_by().values(
+            field
+        ).annotate(total=Count('pk')).values_list(field, 'total')
+        counters += [
+            TaskCounter(kind=kind, object_id=object_id, value=total)
+            for object_id, total in rows
+        ]
+    rows = Task.labels.through.objects.values('label_id').annotate(
+        total=Count('pk')
+    ).values_list('label_id', 'total')
+    counters += [
+        TaskCounter(kind='label', object_id=object_id, value=total)
+        for object_id, total in rows
+    ]
+    TaskCounter.objects.bulk_create(counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCounter',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True,
+                    primary_key=True,
+                    serialize=False,
+                    verbose_name='ID',
+                )),
+                ('kind', models.CharField(
+                    choices=[
+                        ('status', 'Статус'),
+                        ('label', 'Метка'),
+                        ('author', 'Автор'),
+                        ('executor', 'Исполнитель'),
+                    ],
+                    max_length=16,
+                )),
+                ('object_id', models.BigIntegerField()),
+                ('value', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Счетчик задач',
+                'verbose_name_plural': 'Счетчики задач',
+                'constraints': [models.UniqueConstraint(
+                    fields=('kind', 'object_id'),
+                    name='task_counter_kind_object_uniq',
+                )],
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskEvent',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True,
+                    primary_key=True,
+                    serialize=False,
+                    verbose_name='ID',
+                )),
+                ('action', models.CharField(
+                    choices=[
+                        ('created', 'Создание'),
+                        ('updated', 'Изменение'),
+                        ('compacted', 'Сводка изменений'),
+                    ],
+                    max_length=16,
+                )),
+                ('changes', models.JSONField(
+                    default=dict, verbose_name='Изменения'
+                )),
+                ('created_at', models.DateTimeField(
+                    default=django.utils.timezone.now,
+                    verbose_name='Дата изменения',
+                )),
+                ('task', models.ForeignKey(
+                    db_index=False,
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='events',
+                    to='tasks.task',
+                    verbose_name='Задача',
+                )),
+                ('user', models.ForeignKey(
+                    blank=True,
+                    db_index=False,
+                    null=True,
+                    on_delete=django.db.models.deletion.SET_NULL,
+                    related_name='task_events',
+                    to=settings.AUTH_USER_MODEL,
+                    verbose_name='Пользователь',
+                )),
+            ],
+            options={
+                'verbose_name': 'Событие задачи',
+                'verbose_name_plural': 'История задач',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [
+                    models.Index(
+                        fields=['task', '-created_at', '-id'],
+                        name='task_event_task_idx',
+                    ),
+                    models.Index(
+                        fields=['user', '-created_at', '-id'],
+                        name='task_event_user_idx',
+                    ),
+                ],
+            },
+        ),
+    ]
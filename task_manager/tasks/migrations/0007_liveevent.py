@@ -0,0 +1,32 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_taskevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LiveEvent',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True,
+                    primary_key=True,
+                    serialize=False,
+                    verbose_name='ID',
+                )),
+                ('kind', models.CharField(max_length=16)),
+                ('task_id', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(
+                    db_index=True, default=django.utils.timezone.now
+                )),
+            ],
+            options={
+                'verbose_name': 'Событие списка задач',
+                'verbose_name_plural': 'События списка задач',
+            },
+        ),
+    ]
@@ -1,6 +1,48 @@
 # tasks/models.py
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from . import search as full_text
+
+
+class TaskQuerySet(models.QuerySet):
+    def with_related(self):
+        """
+        Подгружает статус, автора, исполнителя и метки пачкой,
+        чтобы шаблоны не делали отдельный запрос на каждую задачу.
+        """
+        return self.select_related(
+            'status', 'author', 'executor'
+        ).prefetch_related('labels')
+
+    def with_labels(self, label_ids, match_all=False):
+        """
+        Фильтрует задачи по меткам полусоединением (IN-подзапрос к
+        связующей таблице): строки задач не дублируются, и distinct()
+        не нужен. По умолчанию подходит любая из меток, при match_all -
+        только задачи со всеми метками сразу.
+        """
+        label_ids = set(label_ids)
+        if not label_ids:
+            return self
+
+        task_ids = self.model.labels.through.objects.filter(
+            label_id__in=label_ids
+        ).values('task_id')
+        if match_all:
+            task_ids = task_ids.annotate(
+                matched=Count('label_id')
+            ).filter(matched=len(label_ids)).values('task_id')
+        return self.filter(pk__in=task_ids)
+
+    def search(self, query):
+        """
+        Полнотекстовый поиск по имени и описанию с сортировкой
+        по релевантности (аннотация search_rank).
+        """
+        return full_text.search(self, query)
 
 
 class Task(models.Model):
@@ -34,11 +76,161 @@ class Task(models.Model):
         auto_now_add=True,
         verbose_name="Дата создания"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Дата изменения"
+    )
+
+    objects = TaskQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Счетчики задач считаются от прежней строки, которую pre_save
+        # блокирует до конца этой транзакции
+        using = kwargs.get('using') or router.db_for_write(Task, instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = "Задача"
         verbose_name_plural = "Задачи"
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        # Под фильтры списка задач с сортировкой по дате создания
+        indexes = [
+            models.Index(
+                fields=['status', '-created_at', '-id'],
+                name='task_status_created_idx',
+            ),
+            models.Index(
+                fields=['executor', '-created_at', '-id'],
+                name='task_executor_created_idx',
+            ),
+            models.Index(
+                fields=['author', '-created_at', '-id'],
+                name='task_author_created_idx',
+            ),
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='task_created_id_idx',
+            ),
+        ]
+
+
+class TaskCounter(models.Model):
+    """Число задач, ссылающихся на статус, метку или пользователя."""
+
+    STATUS = 'status'
+    LABEL = 'label'
+    AUTHOR = 'author'
+    EXECUTOR = 'executor'
+    KIND_CHOICES = (
+        (STATUS, 'Статус'),
+        (LABEL, 'Метка'),
+        (AUTHOR, 'Автор'),
+        (EXECUTOR, 'Исполнитель'),
+    )
+
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    value = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.kind}:{self.object_id}={self.value}'
+
+    class Meta:
+        verbose_name = "Счетчик задач"
+        verbose_name_plural = "Счетчики задач"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'object_id'],
+                name='task_counter_kind_object_uniq',
+            ),
+        ]
+
+
+class TaskEvent(models.Model):
+    """
+    Запись истории задачи. Хранит только измененные поля с их новыми
+    значениями (см. tasks/history.py) и не изменяется после создания.
+    """
+
+    CREATED = 'created'
+    UPDATED = 'updated'
+    # Несколько старых событий, свернутых командой compact_task_history
+    COMPACTED = 'compacted'
+    ACTION_CHOICES = (
+        (CREATED, 'Создание'),
+        (UPDATED, 'Изменение'),
+        (COMPACTED, 'Сводка изменений'),
+    )
+
+    # Отдельные индексы по внешним ключам не нужны: их покрывают
+    # составные индексы ниже
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='events',
+        db_index=False,
+        verbose_name="Задача"
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name='task_events',
+        null=True,
+        blank=True,
+        db_index=False,
+        verbose_name="Пользователь"
+    )
+    action = models.CharField(max_length=16, choices=ACTION_CHOICES)
+    changes = models.JSONField(default=dict, verbose_name="Изменения")
+    # Не auto_now_add: при сворачивании время берется из старых событий
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Дата изменения"
+    )
+
+    def __str__(self):
+        return f'{self.task_id}:{self.action}:{self.created_at:%Y-%m-%d}'
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("История задачи не изменяется")
+        super().save(*args, **kwargs)
+
+    class Meta:
+        verbose_name = "Событие задачи"
+        verbose_name_plural = "История задач"
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(
+                fields=['task', '-created_at', '-id'],
+                name='task_event_task_idx',
+            ),
+            models.Index(
+                fields=['user', '-created_at', '-id'],
+                name='task_event_user_idx',
+            ),
+        ]
+
+
+class LiveEvent(models.Model):
+    """
+    Журнал изменений задач для живого обновления списка (tasks/live.py).
+    Его опрашивает каждый процесс сервера, поэтому клиент видит
+    изменения, сделанные в любом процессе. Строки хранятся недолго.
+    """
+
+    kind = models.CharField(max_length=16)
+    # Не внешний ключ: событие удаления переживает задачу
+    task_id = models.BigIntegerField()
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f'{self.pk}:{self.kind}:{self.task_id}'
+
+    class Meta:
+        verbose_name = "Событие списка задач"
+        verbose_name_plural = "События списка задач"
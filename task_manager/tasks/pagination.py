@@ -0,0 +1,75 @@
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db.models import Q
+
+CURSOR_ORDERING = ('-created_at', '-id')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class CursorPage:
+    object_list: list
+    next_cursor: str | None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def encode_cursor(task):
+    """Упаковывает (created_at, id) задачи в непрозрачную строку."""
+    raw = f'{task.created_at.isoformat()}|{task.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    padded = value + '=' * (-len(value) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at, pk = raw.split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise InvalidCursor(value) from error
+
+
+def after_cursor(queryset, cursor, page_size):
+    """
+    Запрос страницы задач после курсора без OFFSET и COUNT. Пустой
+    курсор означает первую страницу. Берет на одну запись больше,
+    чтобы cursor_page() узнал, есть ли следующая страница.
+    """
+    queryset = queryset.order_by(*CURSOR_ORDERING)
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+        )
+    return queryset[:page_size + 1]
+
+
+def paginate_by_cursor(queryset, cursor, page_size):
+    """Страница задач после курсора (см. after_cursor())."""
+    return cursor_page(
+        list(after_cursor(queryset, cursor, page_size)), page_size
+    )
+
+
+def cursor_page(rows, page_size):
+    """Страница из строк, прочитанных по запросу after_cursor()."""
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1])
+    return CursorPage(rows, next_cursor)
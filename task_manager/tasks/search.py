@@ -0,0 +1,159 @@
+"""
+Полнотекстовый поиск задач по имени и описанию.
+
+PostgreSQL: генерируемая колонка tasks_task.search_vector (tsvector)
+с GIN-индексом. SQLite: внешняя FTS5-таблица tasks_task_fts, которую
+синхронизируют триггеры. На остальных базах поиск идет через icontains.
+"""
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+# Ограничиваем число слов, чтобы запрос к индексу оставался дешевым
+MAX_TERMS = 8
+WORD_RE = re.compile(r'\w+')
+# Совпадение в имени весит больше, чем в описании
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+POSTGRES_CONFIG = 'russian'
+
+FTS_TABLE = 'tasks_task_fts'
+SQLITE_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_insert
+    AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_delete
+    AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_update
+    AFTER UPDATE OF name, description ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE} (rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+)
+POSTGRES_VECTOR = f"""
+    setweight(to_tsvector('{POSTGRES_CONFIG}', coalesce(name, '')), 'A') ||
+    setweight(
+        to_tsvector('{POSTGRES_CONFIG}', coalesce(description, '')), 'B'
+    )
+"""
+
+
+def parse_terms(query):
+    """Слова поискового запроса без операторов и спецсимволов."""
+    return WORD_RE.findall(query or '')[:MAX_TERMS]
+
+
+def install(schema_editor):
+    """Создает поисковый индекс и заполняет его текущими задачами."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'ALTER TABLE tasks_task ADD COLUMN search_vector tsvector '
+            f'GENERATED ALWAYS AS ({POSTGRES_VECTOR}) STORED'
+        )
+        schema_editor.execute(
+            'CREATE INDEX tasks_task_search_idx '
+            'ON tasks_task USING GIN (search_vector)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+            "name, description, content='tasks_task', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        install_sqlite_triggers(schema_editor.connection)
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def uninstall(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'ALTER TABLE tasks_task DROP COLUMN search_vector'
+        )
+    elif vendor == 'sqlite':
+        for name in ('insert', 'delete', 'update'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{name}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def install_sqlite_triggers(connection):
+    """
+    При изменении схемы tasks_task SQLite пересоздает таблицу, и
+    триггеры пропадают, поэтому их можно безопасно создавать повторно.
+    """
+    with connection.cursor() as cursor:
+        for sql in SQLITE_TRIGGERS:
+            cursor.execute(sql)
+
+
+def search(queryset, query):
+    """
+    Оставляет задачи, содержащие все слова запроса (слово может быть
+    началом слова в тексте), и сортирует их по релевантности.
+    """
+    terms = parse_terms(query)
+    if not terms:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        return _search_postgres(queryset, terms)
+    if vendor == 'sqlite':
+        return _search_sqlite(queryset, terms)
+    for term in terms:
+        queryset = queryset.filter(
+            Q(name__icontains=term) | Q(description__icontains=term)
+        )
+    return queryset
+
+
+def _search_postgres(queryset, terms):
+    tsquery = ' & '.join(f'{term}:*' for term in terms)
+    params = (POSTGRES_CONFIG, tsquery)
+    return queryset.filter(RawSQL(
+        '"tasks_task"."search_vector" @@ to_tsquery(%s::regconfig, %s)',
+        params,
+        output_field=BooleanField(),
+    )).annotate(search_rank=RawSQL(
+        'ts_rank_cd("tasks_task"."search_vector", '
+        'to_tsquery(%s::regconfig, %s))',
+        params,
+        output_field=FloatField(),
+    )).order_by('-search_rank', '-created_at', '-id')
+
+
+def _search_sqlite(queryset, terms):
+    # Каждое слово в кавычках - без операторов FTS5, "*" - поиск по началу
+    match = ' '.join(f'"{term}"*' for term in terms)
+    # Соединение с FTS-таблицей читает индекс один раз; коррелированный
+    # подзапрос для ранга повторял бы MATCH на каждую найденную строку
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[
+            f'{FTS_TABLE}.rowid = "tasks_task"."id"',
+            f'{FTS_TABLE} MATCH %s',
+        ],
+        params=[match],
+        # bm25 тем меньше, чем документ релевантнее
+        select={'search_rank': (
+            f'-bm25({FTS_TABLE}, {NAME_WEIGHT}, {DESCRIPTION_WEIGHT})'
+        )},
+    ).order_by('-search_rank', '-created_at', '-id')
@@ -0,0 +1,123 @@
+"""
+Генератор синтетических данных для замеров производительности.
+Одинаковые параметры и seed дают одинаковый набор данных.
+"""
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+
+from . import choices, counters, dashboard
+from .models import Task
+
+BATCH_SIZE = 5000
+START_DATE = datetime(2025, 1, 1, tzinfo=UTC)
+# Пароль с "!" в начале Django считает непригодным для входа
+UNUSABLE_PASSWORD = '!seeded'
+FIRST_NAMES = ('Иван', 'Мария', 'Петр', 'Анна', 'Олег', 'Елена')
+LAST_NAMES = ('Иванов', 'Смирнова', 'Кузнецов', 'Попова', 'Соколов')
+
+
+@dataclass
+class SeedResult:
+    user_ids: list = field(default_factory=list)
+    status_ids: list = field(default_factory=list)
+    label_ids: list = field(default_factory=list)
+    tasks: int = 0
+
+
+@contextmanager
+def explicit_created_at():
+    """
+    Позволяет задать created_at при bulk_create: auto_now_add иначе
+    перезапишет его текущим временем.
+    """
+    created_at = Task._meta.get_field('created_at')
+    created_at.auto_now_add = False
+    try:
+        yield
+    finally:
+        created_at.auto_now_add = True
+
+
+def seed(users, statuses, labels, tasks, labels_per_task=3, seed=42,
+         prefix='perf', batch_size=BATCH_SIZE, progress=None):
+    """
+    Создает пользователей, статусы, метки и задачи пачками.
+    progress(число_задач) вызывается после каждой пачки задач.
+    """
+    rng = random.Random(seed)
+    result = SeedResult()
+    with transaction.atomic():
+        result.user_ids = [
+            user.pk for user in User.objects.bulk_create(
+                (
+                    User(
+                        username=f'{prefix}-user-{i}',
+                        first_name=rng.choice(FIRST_NAMES),
+                        last_name=rng.choice(LAST_NAMES),
+                        password=UNUSABLE_PASSWORD,
+                    )
+                    for i in range(users)
+                ),
+                batch_size=batch_size,
+            )
+        ]
+        result.status_ids = [
+            status.pk for status in Status.objects.bulk_create(
+                Status(name=f'{prefix}-status-{i}') for i in range(statuses)
+            )
+        ]
+        result.label_ids = [
+            label.pk for label in Label.objects.bulk_create(
+                (Label(name=f'{prefix}-label-{i}') for i in range(labels)),
+                batch_size=batch_size,
+            )
+        ]
+
+    per_task = min(labels_per_task, len(result.label_ids))
+    for start in range(0, tasks, batch_size):
+        # Каждая пачка в своей транзакции, чтобы не держать их долго
+        with transaction.atomic(), explicit_created_at():
+            batch = Task.objects.bulk_create(
+                _make_task(rng, result, prefix, number)
+                for number in range(start, min(start + batch_size, tasks))
+            )
+            Task.labels.through.objects.bulk_create(
+                Task.labels.through(task_id=task.pk, label_id=label_id)
+                for task in batch
+                for label_id in rng.sample(result.label_ids, per_task)
+            )
+        result.tasks += len(batch)
+        if progress:
+            progress(result.tasks)
+    # bulk_create не отправляет сигналы - пересчитываем счетчики целиком
+    # и сами сбрасываем кеши списков
+    counters.recount()
+    for name in (choices.STATUSES, choices.EXECUTORS, choices.LABELS):
+        choices.invalidate(name)
+    dashboard.invalidate()
+    return result
+
+
+def _make_task(rng, result, prefix, number):
+    # Примерно каждая десятая задача без исполнителя
+    executor_id = (
+        rng.choice(result.user_ids) if rng.random() > 0.1 else None
+    )
+    return Task(
+        name=f'{prefix}-task-{number}',
+        description=f'Описание задачи {number}',
+        author_id=rng.choice(result.user_ids),
+        executor_id=executor_id,
+        status_id=rng.choice(result.status_ids),
+        created_at=START_DATE + timedelta(
+            minutes=number, seconds=rng.randrange(60)
+        ),
+    )
@@ -0,0 +1,150 @@
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+
+from . import choices, counters, dashboard, live, search
+from .models import Task, TaskCounter
+
+
+@receiver([post_save, post_delete], sender=Status)
+def status_changed(sender, **kwargs):
+    choices.invalidate(choices.STATUSES)
+
+
+@receiver([post_save, post_delete], sender=Label)
+def label_changed(sender, **kwargs):
+    choices.invalidate(choices.LABELS)
+
+
+@receiver(post_delete, sender=Status)
+@receiver(post_delete, sender=Label)
+@receiver(post_delete, sender=User)
+def drop_counters(sender, instance, **kwargs):
+    kinds = {
+        Status: [counters.STATUS],
+        Label: [counters.LABEL],
+        User: [counters.AUTHOR, counters.EXECUTOR],
+    }[sender]
+    TaskCounter.objects.filter(kind__in=kinds, object_id=instance.pk).delete()
+
+
+@receiver([post_save, post_delete], sender=Task)
+@receiver(m2m_changed, sender=Task.labels.through)
+def task_changed(sender, **kwargs):
+    # Пакетные операции сбрасывают версию сами, один раз на пачку
+    if not counters.is_muted():
+        dashboard.invalidate()
+
+
+@receiver(pre_save, sender=Task)
+def lock_saved_task(sender, instance, raw=False, update_fields=None,
+                    **kwargs):
+    if raw or counters.is_muted() or instance._state.adding:
+        return
+    counters.lock_state(instance, update_fields)
+
+
+@receiver(post_save, sender=Task)
+def count_saved_task(sender, instance, created, raw=False, **kwargs):
+    if raw or counters.is_muted():
+        return
+    if created:
+        counters.apply(counters.state_deltas(counters.task_state(instance), 1))
+    else:
+        old = counters.previous_state(instance)
+        new = {
+            kind: value
+            for kind, value in counters.task_state(instance).items()
+            if kind in old
+        }
+        counters.apply(counters.change_deltas(old, new))
+
+
+@receiver(pre_delete, sender=Task)
+def remember_task_labels(sender, instance, **kwargs):
+    # Строки связующей таблицы удаляются каскадом без сигналов m2m
+    if not counters.is_muted():
+        instance.counted_labels = list(
+            Task.labels.through.objects.filter(
+                task_id=instance.pk
+            ).values_list('label_id', flat=True)
+        )
+
+
+@receiver(post_delete, sender=Task)
+def count_deleted_task(sender, instance, **kwargs):
+    if counters.is_muted():
+        return
+    deltas = counters.state_deltas(counters.task_state(instance), -1)
+    deltas.update(
+        counters.label_deltas(getattr(instance, 'counted_labels', ()), -1)
+    )
+    counters.apply(deltas)
+
+
+@receiver(m2m_changed, sender=Task.labels.through)
+def count_task_labels(sender, instance, action, reverse, pk_set, **kwargs):
+    if counters.is_muted():
+        return
+    related = instance.task_set if reverse else instance.labels
+    if action == 'pre_clear':
+        # После очистки связей уже не узнать, какие метки были
+        instance.cleared_pks = list(related.values_list('pk', flat=True))
+        return
+    if action == 'pre_remove':
+        # В pk_set запрошенные id, в том числе несвязанные: считаем
+        # только связи, которые действительно будут удалены
+        instance.removed_pks = list(
+            related.filter(pk__in=pk_set).values_list('pk', flat=True)
+        )
+        return
+    if action == 'post_clear':
+        pk_set = instance.cleared_pks
+    elif action == 'post_remove':
+        pk_set = instance.removed_pks
+    elif action != 'post_add':
+        return
+
+    sign = 1 if action == 'post_add' else -1
+    if reverse:
+        deltas = {(counters.LABEL, instance.pk): sign * len(pk_set)}
+    else:
+        deltas = counters.label_deltas(pk_set, sign)
+    counters.apply(deltas)
+
+
+@receiver(post_save, sender=Task)
+def announce_saved_task(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        live.announce(live.CREATED if created else live.UPDATED, instance.pk)
+
+
+@receiver(post_delete, sender=Task)
+def announce_deleted_task(sender, instance, **kwargs):
+    live.announce(live.DELETED, instance.pk)
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, update_fields=None, **kwargs):
+    # Вход в систему обновляет только last_login - списки не меняются
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    choices.invalidate(choices.EXECUTORS)
+
+
+def restore_search_triggers(sender, using, **kwargs):
+    """Возвращает триггеры FTS5, если миграция пересоздала tasks_task."""
+    connection = connections[using]
+    if (connection.vendor == 'sqlite'
+            and search.FTS_TABLE in connection.introspection.table_names()):
+        search.install_sqlite_triggers(connection)
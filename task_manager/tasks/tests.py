@@ -1,14 +1,35 @@
 # tasks/tests.py
+import asyncio
+import csv
+import json
+import os
+from datetime import timedelta
+from io import StringIO
+from tempfile import NamedTemporaryFile
+from unittest import mock
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db import IntegrityError
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models import QuerySet
+from django.db.models.signals import pre_delete
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
 from task_manager.labels.models import Label
 from task_manager.statuses.models import Status
 
-from .models import Task
+from . import bulk, choices, history, live
+from .export import iter_task_rows, stream_csv
+from .filters import TaskFilter
+from .forms import TaskForm
+from .models import LiveEvent, Task, TaskCounter, TaskEvent
+from .views import TaskListView
 
 
 class TaskTests(TestCase):
@@ -135,6 +156,58 @@ class TaskTests(TestCase):
         self.assertCountEqual(self._get_task_ids_from_response(response),
                               [self.task1.pk, self.task2.pk, self.task3.pk])
 
+    def test_filter_by_any_of_labels(self):
+        """Тест фильтрации по нескольким меткам (любая из них)."""
+        self.client.login(username='user1', password='password123')
+        response = self.client.get(
+            reverse('tasks:list'), {'label': [self.label1.pk, self.label2.pk]}
+        )
+
+        # task3 содержит обе метки, но выводится один раз
+        self.assertEqual(
+            sorted(self._get_task_ids_from_response(response)),
+            sorted([self.task1.pk, self.task2.pk, self.task3.pk])
+        )
+
+    def test_filter_by_all_of_labels(self):
+        """Тест фильтрации по нескольким меткам (все сразу)."""
+        self.client.login(username='user1', password='password123')
+        response = self.client.get(reverse('tasks:list'), {
+            'label': [self.label1.pk, self.label2.pk],
+            'label_match': 'all',
+        })
+
+        self.assertCountEqual(
+            self._get_task_ids_from_response(response), [self.task3.pk]
+        )
+
+    def test_forms_render_choices_without_queries(self):
+        """Формы задачи и фильтра берут варианты из кеша справочников."""
+        cache.clear()
+        TaskForm().as_p()
+        with self.assertNumQueries(0):
+            html = TaskForm().as_p() + TaskFilter().form.as_p()
+        self.assertIn(self.status2.name, html)
+        self.assertIn(self.label2.name, html)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            label = Label.objects.create(name='Fresh label')
+        self.assertIn(label.name, TaskFilter().form.as_p())
+
+    def test_task_filter_labels(self):
+        """Тест TaskFilter по меткам в обоих режимах."""
+        labels = [self.label1.pk, self.label2.pk]
+        any_of = TaskFilter({'labels': labels}, queryset=Task.objects.all())
+        all_of = TaskFilter(
+            {'labels': labels, 'label_match': 'all'},
+            queryset=Task.objects.all()
+        )
+
+        self.assertEqual(any_of.qs.count(), 3)
+        self.assertCountEqual(
+            all_of.qs.values_list('id', flat=True), [self.task3.pk]
+        )
+
     def test_combined_filters(self):
         """Тест комбинации фильтров (статус и исполнитель)."""
         self.client.login(username='user1', password='password123')
@@ -147,4 +220,1249 @@ class TaskTests(TestCase):
         # Ожидаем только task3 (у нее Status1 и исполнитель user1)
         self.assertCountEqual(
             self._get_task_ids_from_response(response), [self.task3.pk]
-        )
\ No newline at end of file
+        )
+
+
+class TaskListQueryCountTests(TestCase):
+    # сессия, пользователь, COUNT, задачи, метки (prefetch), счетчики
+    # задач и три выпадающих списка фильтра, пока они не попали в кеш
+    LIST_QUERIES = 9
+    CACHED_LIST_QUERIES = 6
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='owner', password='password123'
+        )
+        self.status = Status.objects.create(name='Status')
+        self.label = Label.objects.create(name='Label')
+
+    def _add_tasks(self, count):
+        """Добавляет задачи с отдельными исполнителями и метками."""
+        start = Task.objects.count()
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(start, start + count):
+                executor = User.objects.create_user(
+                    username=f'executor{i}', first_name='Исполнитель'
+                )
+                task = Task.objects.create(
+                    name=f'Task {i}',
+                    description='Description',
+                    author=self.user,
+                    executor=executor,
+                    status=Status.objects.create(name=f'Status {i}'),
+                )
+                task.labels.add(
+                    self.label, Label.objects.create(name=f'Label {i}')
+                )
+
+    def _assert_list_queries(self, expected=LIST_QUERIES):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(expected):
+            response = self.client.get(reverse('tasks:list'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_query_count_does_not_grow_with_data(self):
+        self._add_tasks(2)
+        self._assert_list_queries()
+
+        self._add_tasks(8)
+        self._assert_list_queries()
+
+    def test_filter_choices_are_served_from_cache(self):
+        self._add_tasks(2)
+        self._assert_list_queries()
+        self._assert_list_queries(self.CACHED_LIST_QUERIES)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Status.objects.create(name='New status')
+        self._assert_list_queries(self.CACHED_LIST_QUERIES + 1)
+
+    def test_detail_loads_related_objects_in_bulk(self):
+        self._add_tasks(1)
+        task = Task.objects.get()
+        self.client.force_login(self.user)
+        # сессия, пользователь, задача с FK, метки и история
+        with self.assertNumQueries(5):
+            response = self.client.get(
+                reverse('tasks:detail', kwargs={'pk': task.pk})
+            )
+        self.assertContains(response, 'Label 0')
+
+
+class TaskCursorPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='owner', password='password123'
+        )
+        self.status = Status.objects.create(name='Status')
+        self.other_status = Status.objects.create(name='Other')
+        self.tasks = [
+            Task.objects.create(
+                name=f'Task {i}',
+                description='Description',
+                author=self.user,
+                status=self.status,
+            )
+            for i in range(12)
+        ]
+        Task.objects.create(
+            name='Other task',
+            description='Description',
+            author=self.user,
+            status=self.other_status,
+        )
+        self.client.force_login(self.user)
+
+    def _ids(self, response):
+        return [task.pk for task in response.context['tasks']]
+
+    def test_cursor_pages_cover_filtered_tasks_once(self):
+        params = {'status': self.status.pk, 'cursor': ''}
+        response = self.client.get(reverse('tasks:list'), params)
+        first_page = self._ids(response)
+        self.assertEqual(len(first_page), 10)
+        self.assertTrue(response.context['next_page_query'])
+
+        response = self.client.get(
+            reverse('tasks:list') + '?' + response.context['next_page_query']
+        )
+        second_page = self._ids(response)
+        self.assertEqual(len(second_page), 2)
+        self.assertEqual(response.context['next_page_query'], '')
+        self.assertCountEqual(
+            first_page + second_page, [task.pk for task in self.tasks]
+        )
+
+    def test_cursor_mode_skips_count_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('tasks:list'), {'cursor': ''})
+        self.assertFalse(
+            any('COUNT(' in query['sql'] for query in queries)
+        )
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse('tasks:list'), {'cursor': 'x!'})
+        self.assertEqual(response.status_code, 404)
+
+
+class ExplainTaskQueriesCommandTests(TestCase):
+    def test_list_queries_use_indexes(self):
+        out = StringIO()
+        call_command('explain_task_queries', stdout=out)
+
+        output = out.getvalue()
+        for name in ('list', 'status', 'executor', 'author', 'label'):
+            self.assertIn(f'== {name}: index', output)
+
+
+class TaskAsyncViewsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='owner', password='password123'
+        )
+        self.status = Status.objects.create(name='Status')
+        self.label = Label.objects.create(name='Async label')
+        self.task = Task.objects.create(
+            name='Async task',
+            description='Description',
+            author=self.user,
+            status=self.status,
+        )
+        self.task.labels.add(self.label)
+        Task.objects.create(
+            name='Other task',
+            description='Description',
+            author=self.user,
+            status=Status.objects.create(name='Other'),
+        )
+
+    async def test_async_list_applies_filters(self):
+        response = await self.async_client.get(
+            reverse('tasks:list_async'), {'label': self.label.pk}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [task.pk for task in response.context['tasks']], [self.task.pk]
+        )
+        self.assertContains(response, 'Async task')
+
+    async def _async_pages(self, params):
+        url = reverse('tasks:list_async')
+        response = await self.async_client.get(url, params)
+        pages = [[task.pk for task in response.context['tasks']]]
+        while query := response.context['next_page_query']:
+            response = await self.async_client.get(f'{url}?{query}')
+            pages.append([task.pk for task in response.context['tasks']])
+        return pages
+
+    async def test_async_list_page_size_and_next_page(self):
+        pages = await self._async_pages({'page_size': 1})
+        self.assertEqual(len(pages), 2)
+        self.assertCountEqual(
+            sum(pages, []), [task.pk async for task in Task.objects.all()]
+        )
+
+    async def test_async_list_cursor_pages(self):
+        pages = await self._async_pages({'page_size': 1, 'cursor': ''})
+        self.assertEqual(
+            pages,
+            [[task.pk] async for task in Task.objects.order_by('-id')],
+        )
+
+    async def test_async_list_invalid_cursor(self):
+        response = await self.async_client.get(
+            reverse('tasks:list_async'), {'cursor': 'x!'}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_async_list_rejects_missing_page(self):
+        response = await self.async_client.get(
+            reverse('tasks:list_async'), {'page': 5}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_async_detail_requires_login(self):
+        url = reverse('tasks:detail_async', kwargs={'pk': self.task.pk})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 302)
+
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(url)
+        self.assertContains(response, 'Async label')
+
+
+class TaskApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='owner', password='password123'
+        )
+        self.other = User.objects.create_user(
+            username='other', password='password123'
+        )
+        self.status = Status.objects.create(name='Status')
+        self.label1 = Label.objects.create(name='Label 1')
+        self.label2 = Label.objects.create(name='Label 2')
+        self.task = Task.objects.create(
+            name='Task', description='Description',
+            author=self.user, status=self.status,
+        )
+        self.task.labels.add(self.label1)
+        self.client.force_login(self.user)
+
+    def _send(self, method, data):
+        return getattr(self.client, method)(
+            reverse('api_tasks:bulk'),
+            data=json.dumps(data),
+            content_type='application/json',
+        )
+
+    def test_api_requires_login(self):
+        self.client.logout()
+        response = self.client.get(reverse('api_tasks:list'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_list_with_sparse_fields_and_filters(self):
+        response = self.client.get(reverse('api_tasks:list'), {
+            'fields': 'id,labels', 'labels': self.label1.pk,
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'results': [{'id': self.task.pk, 'labels': [self.label1.pk]}],
+            'next_cursor': None,
+        })
+
+    def test_list_rejects_unknown_fields(self):
+        response = self.client.get(
+            reverse('api_tasks:list'), {'fields': 'password'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_cursor_pagination(self):
+        for i in range(2):
+            Task.objects.create(
+                name=f'Extra {i}', description='Description',
+                author=self.user, status=self.status,
+            )
+        url = reverse('api_tasks:list')
+        first = self.client.get(url, {'page_size': 2, 'fields': 'id'}).json()
+        second = self.client.get(url, {
+            'page_size': 2, 'fields': 'id', 'cursor': first['next_cursor'],
+        }).json()
+
+        self.assertEqual(len(first['results']), 2)
+        self.assertEqual(len(second['results']), 1)
+        self.assertIsNone(second['next_cursor'])
+
+    def test_detail(self):
+        response = self.client.get(
+            reverse('api_tasks:detail', kwargs={'pk': self.task.pk}),
+            {'fields': 'name,status'},
+        )
+        self.assertEqual(
+            response.json(), {'name': 'Task', 'status': self.status.pk}
+        )
+
+    def test_bulk_create_uses_constant_number_of_queries(self):
+        items = [
+            {
+                'name': f'Imported {i}',
+                'description': 'Description',
+                'status': self.status.pk,
+                'executor': self.other.pk,
+                'labels': [self.label1.pk, self.label2.pk],
+            }
+            for i in range(50)
+        ]
+        # сессия, пользователь, проверка статусов, пользователей и меток,
+        # вставка задач, меток, счетчиков, истории и журнала живого
+        # обновления внутри транзакции
+        with self.assertNumQueries(13):
+            response = self._send('post', items)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()['created']), 50)
+        self.assertEqual(
+            Task.objects.filter(
+                author=self.user, labels=self.label2
+            ).count(),
+            50,
+        )
+        self.assertCountEqual(
+            LiveEvent.objects.exclude(task_id=self.task.pk)
+            .values_list('kind', 'task_id'),
+            [(live.CREATED, pk) for pk in response.json()['created']],
+        )
+        event = TaskEvent.objects.get(task_id=response.json()['created'][0])
+        self.assertEqual(event.action, TaskEvent.CREATED)
+        self.assertEqual(event.user, self.user)
+        self.assertEqual(event.changes, {
+            'name': 'Imported 0',
+            'description': 'Description',
+            'status': self.status.pk,
+            'executor': self.other.pk,
+            'labels': {'+': [self.label1.pk, self.label2.pk]},
+        })
+
+    def test_bulk_create_is_atomic_on_validation_error(self):
+        response = self._send('post', [
+            {'name': 'Ok', 'description': 'd', 'status': self.status.pk},
+            {'name': 'Bad', 'description': 'd', 'status': 999},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('status', response.json()['errors']['1'])
+        self.assertFalse(Task.objects.filter(name='Ok').exists())
+
+    def test_bulk_update(self):
+        LiveEvent.objects.all().delete()
+        response = self._send('patch', [{
+            'id': self.task.pk,
+            'name': 'Renamed',
+            'labels': [self.label2.pk],
+        }])
+
+        self.assertEqual(response.status_code, 200)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.name, 'Renamed')
+        self.assertEqual(
+            list(self.task.labels.values_list('pk', flat=True)),
+            [self.label2.pk],
+        )
+        event = TaskEvent.objects.get(task=self.task)
+        self.assertEqual(event.action, TaskEvent.UPDATED)
+        self.assertEqual(event.user, self.user)
+        self.assertEqual(event.changes, {
+            'name': 'Renamed',
+            'labels': {'+': [self.label2.pk], '-': [self.label1.pk]},
+        })
+        self.assertEqual(
+            list(LiveEvent.objects.values_list('kind', 'task_id')),
+            [(live.UPDATED, self.task.pk)],
+        )
+
+    def test_bulk_update_without_changes_writes_no_history(self):
+        response = self._send('patch', [{
+            'id': self.task.pk,
+            'status': self.status.pk,
+            'labels': [self.label1.pk],
+        }])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(TaskEvent.objects.exists())
+
+    def test_bulk_delete_only_own_tasks(self):
+        foreign = Task.objects.create(
+            name='Foreign', description='Description',
+            author=self.other, status=self.status,
+        )
+        response = self._send('delete', {'ids': [self.task.pk, foreign.pk]})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Task.objects.count(), 2)
+
+        response = self._send('delete', {'ids': [self.task.pk]})
+        self.assertEqual(response.json(), {'deleted': 1})
+        self.assertFalse(Task.objects.filter(pk=self.task.pk).exists())
+
+
+class TaskExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='owner', password='password123'
+        )
+        self.status = Status.objects.create(name='Status')
+        self.label1 = Label.objects.create(name='Label 1')
+        self.label2 = Label.objects.create(name='Label 2')
+        self.task = Task.objects.create(
+            name='Exported', description='Description',
+            author=self.user, executor=self.user, status=self.status,
+        )
+        self.task.labels.add(self.label1, self.label2)
+        Task.objects.create(
+            name='Skipped', description='Description',
+            author=self.user, status=Status.objects.create(name='Other'),
+        )
+        self.client.force_login(self.user)
+
+    def _export(self, **params):
+        response = self.client.get(reverse('tasks:export'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export_applies_filters(self):
+        content = self._export(status=self.status.pk)
+
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['name'], 'Exported')
+        self.assertEqual(rows[0]['executor'], 'owner')
+        self.assertEqual(rows[0]['labels'], 'Label 1|Label 2')
+
+    def test_ndjson_export(self):
+        content = self._export(export_format='ndjson', label=self.label1.pk)
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['labels'], ['Label 1', 'Label 2'])
+        self.assertEqual(rows[0]['status'], 'Status')
+
+    async def test_asgi_export_streams_asynchronously(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(
+            reverse('tasks:export'), {'status': self.status.pk}
+        )
+
+        self.assertTrue(response.is_async)
+        content = ''.join([
+            chunk.decode() async for chunk in response.streaming_content
+        ])
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual([row['name'] for row in rows], ['Exported'])
+
+    def test_export_reads_labels_once_per_chunk(self):
+        rows = iter_task_rows(Task.objects.all(), chunk_size=1)
+        # по запросу на задачи и по запросу меток на каждую порцию
+        with self.assertNumQueries(3):
+            self.assertEqual(len(list(rows)), 2)
+
+    def test_unknown_format(self):
+        response = self.client.get(
+            reverse('tasks:export'), {'export_format': 'xml'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ImportTasksCommandTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+        self.executor = User.objects.create_user(username='executor')
+        self.status = Status.objects.create(name='новый')
+        self.label1 = Label.objects.create(name='bug')
+        self.label2 = Label.objects.create(name='feature')
+
+    def _import(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command(
+            'import_tasks', path, '--author', 'author', *args,
+            stdout=out, stderr=err,
+        )
+        return out.getvalue(), err.getvalue()
+
+    def _write(self, content, suffix):
+        with NamedTemporaryFile(
+            'w', suffix=suffix, delete=False, encoding='utf-8'
+        ) as file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        return file.name
+
+    def test_import_csv_in_batches(self):
+        path = self._write(
+            'name,description,status,executor,labels\n'
+            'First,Desc,новый,executor,bug|feature\n'
+            'Second,Desc,новый,,\n'
+            'Broken,Desc,missing,,\n',
+            '.csv',
+        )
+        out, err = self._import(path, '--batch-size', '1')
+
+        self.assertIn('Загружено: 2, с ошибками: 1', out)
+        self.assertIn('Запись 3', err)
+        first = Task.objects.get(name='First')
+        self.assertEqual(first.author, self.author)
+        self.assertEqual(first.executor, self.executor)
+        self.assertCountEqual(
+            first.labels.values_list('name', flat=True), ['bug', 'feature']
+        )
+        self.assertIsNone(Task.objects.get(name='Second').executor)
+        # импорт пишет историю создания, как и форма
+        self.assertEqual(
+            TaskEvent.objects.filter(
+                action=TaskEvent.CREATED, user=self.author
+            ).count(),
+            2,
+        )
+
+    def test_import_ndjson_dry_run(self):
+        path = self._write(
+            json.dumps({
+                'name': 'Task', 'description': 'Desc', 'status': 'новый',
+                'executor': None, 'labels': ['bug'],
+            }) + '\n',
+            '.ndjson',
+        )
+        out, _ = self._import(path, '--format', 'ndjson', '--dry-run')
+
+        self.assertIn('Проверено: 1, с ошибками: 0', out)
+        self.assertFalse(Task.objects.exists())
+
+    def test_ndjson_line_that_is_not_an_object(self):
+        path = self._write(
+            '[1, 2]\n' + json.dumps({
+                'name': 'Task', 'description': 'Desc', 'status': 'новый',
+                'labels': 'bug',
+            }) + '\n',
+            '.ndjson',
+        )
+        out, err = self._import(path, '--format', 'ndjson')
+
+        self.assertIn('Загружено: 0, с ошибками: 2', out)
+        self.assertIn('Запись 1', err)
+        self.assertIn('Ожидался список меток', err)
+
+    def test_missing_file(self):
+        with self.assertRaisesMessage(CommandError, 'Не удалось открыть'):
+            self._import('/nonexistent/tasks.csv')
+
+    def test_export_can_be_imported_back(self):
+        task = Task.objects.create(
+            name='Round trip', description='Desc', author=self.author,
+            executor=self.executor, status=self.status,
+        )
+        task.labels.add(self.label1)
+        exported = ''.join(stream_csv(iter_task_rows(Task.objects.all())))
+        task.delete()
+
+        self._import(self._write(exported, '.csv'))
+        imported = Task.objects.get(name='Round trip')
+        self.assertEqual(imported.executor, self.executor)
+        self.assertEqual(list(imported.labels.all()), [self.label1])
+
+
+class SeedPerfTests(TestCase):
+    def _snapshot(self):
+        return [
+            (
+                task.name,
+                task.author.username,
+                task.status.name,
+                task.created_at,
+                sorted(label.name for label in task.labels.all()),
+            )
+            for task in Task.objects.with_related().order_by('name')
+        ]
+
+    def test_seed_is_deterministic(self):
+        args = ('--users', '5', '--statuses', '2', '--labels', '4',
+                '--tasks', '30', '--batch-size', '7')
+        call_command('seed_perf', *args, stdout=StringIO())
+        first = self._snapshot()
+        TaskEvent.objects.create(
+            task=Task.objects.first(), action=TaskEvent.UPDATED
+        )
+        # задачи удаляются без загрузки в память и сигналов на каждую
+        deleted = mock.Mock()
+        pre_delete.connect(deleted, sender=Task)
+        self.addCleanup(pre_delete.disconnect, deleted, sender=Task)
+        call_command('seed_perf', *args, '--clear', stdout=StringIO())
+        deleted.assert_not_called()
+
+        self.assertEqual(len(first), 30)
+        self.assertEqual(self._snapshot(), first)
+        self.assertEqual(User.objects.count(), 5)
+        self.assertFalse(TaskEvent.objects.exists())
+        self.assertEqual(
+            Task.labels.through.objects.count(),
+            sum(len(labels) for *_, labels in first),
+        )
+
+    def test_seed_invalidates_choices(self):
+        cache.clear()
+        self.assertEqual(choices.get_statuses(), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                'seed_perf', '--users', '2', '--statuses', '1',
+                '--labels', '1', '--tasks', '1', stdout=StringIO(),
+            )
+        self.assertEqual(len(choices.get_statuses()), 1)
+        self.assertEqual(len(choices.get_executors()), 2)
+        self.assertEqual(len(choices.get_labels()), 1)
+
+    def test_bench_pages_writes_json_report(self):
+        call_command(
+            'seed_perf', '--users', '3', '--tasks', '5', stdout=StringIO()
+        )
+        out = StringIO()
+        call_command('bench_pages', '--repeat', '1', stdout=out,
+                     stderr=StringIO())
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['dataset']['tasks'], 5)
+        results = {result['name']: result for result in report['results']}
+        self.assertEqual(results['tasks:list']['status_code'], 200)
+        self.assertIn('queries', results['tasks:detail'])
+        # проверки удаления не удаляют используемые объекты
+        self.assertEqual(Task.objects.count(), 5)
+
+
+class BenchCommandsTests(TestCase):
+    def test_bench_render_keeps_shared_cache(self):
+        cache.set('shared', 'value')
+        call_command(
+            'bench_render', '--rows', '3', '--repeat', '1', stdout=StringIO()
+        )
+        self.assertEqual(cache.get('shared'), 'value')
+        self.assertFalse(Task.objects.exists())
+
+    def test_bench_session_keeps_shared_cache(self):
+        cache.set('shared', 'value')
+        out = StringIO()
+        call_command('bench_session', '--repeat', '1', stdout=out)
+        self.assertEqual(cache.get('shared'), 'value')
+        self.assertIn('signed_cookies', out.getvalue())
+        self.assertFalse(User.objects.exists())
+
+
+class TaskSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner')
+        self.status = Status.objects.create(name='Status')
+        self.in_name = self._task('Починить принтер', 'Сломался лоток')
+        self.in_description = self._task('Офис', 'Заказать бумагу в принтер')
+        self.other = self._task('Отчет', 'Квартальный отчет')
+
+    def _task(self, name, description):
+        return Task.objects.create(
+            name=name,
+            description=description,
+            author=self.user,
+            status=self.status,
+        )
+
+    def test_ranks_name_matches_first(self):
+        found = list(Task.objects.search('принтер'))
+        self.assertEqual(found, [self.in_name, self.in_description])
+
+    def test_prefix_and_all_terms(self):
+        self.assertEqual(list(Task.objects.search('прин лот')), [self.in_name])
+        self.assertEqual(list(Task.objects.search('квартал')), [self.other])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.other.name = 'Принтер в переговорной'
+        self.other.save()
+        self.in_name.delete()
+        found = set(Task.objects.search('принтер'))
+        self.assertEqual(found, {self.other, self.in_description})
+        self.assertFalse(Task.objects.search('лоток').exists())
+
+    def test_operators_are_not_interpreted(self):
+        self.assertEqual(
+            list(Task.objects.search('"принтер* OR (NEAR')), []
+        )
+        self.assertEqual(Task.objects.search('  ?! ').count(), 3)
+
+    def test_list_view_search(self):
+        response = self.client.get(
+            reverse('tasks:list'), {'q': 'принтер', 'cursor': ''}
+        )
+        self.assertEqual(
+            list(response.context['tasks']),
+            [self.in_name, self.in_description],
+        )
+        self.assertEqual(response.context['search_query'], 'принтер')
+
+    def test_filter_search(self):
+        task_filter = TaskFilter({'q': 'бумагу'}, queryset=Task.objects.all())
+        self.assertEqual(list(task_filter.qs), [self.in_description])
+
+
+class TaskCounterTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+        self.executor = User.objects.create_user(username='executor')
+        self.status = Status.objects.create(name='Status')
+        self.other_status = Status.objects.create(name='Other')
+        self.label = Label.objects.create(name='Label')
+        self.other_label = Label.objects.create(name='Other label')
+
+    def _counts(self):
+        return {
+            (counter.kind, counter.object_id): counter.value
+            for counter in TaskCounter.objects.exclude(value=0)
+        }
+
+    def _task(self, **kwargs):
+        return Task.objects.create(
+            name='Task',
+            description='Description',
+            author=self.author,
+            status=self.status,
+            **kwargs,
+        )
+
+    def test_create_update_delete(self):
+        task = self._task(executor=self.executor)
+        task.labels.add(self.label, self.other_label)
+        self.assertEqual(self._counts(), {
+            ('status', self.status.pk): 1,
+            ('author', self.author.pk): 1,
+            ('executor', self.executor.pk): 1,
+            ('label', self.label.pk): 1,
+            ('label', self.other_label.pk): 1,
+        })
+
+        task = Task.objects.get(pk=task.pk)
+        task.status = self.other_status
+        task.executor = None
+        task.save()
+        task.labels.remove(self.other_label)
+        self.assertEqual(self._counts(), {
+            ('status', self.other_status.pk): 1,
+            ('author', self.author.pk): 1,
+            ('label', self.label.pk): 1,
+        })
+
+        task.delete()
+        self.assertEqual(self._counts(), {})
+
+    def test_clear_and_reverse_relations(self):
+        first, second = self._task(), self._task()
+        self.label.task_set.add(first, second)
+        first.labels.add(self.other_label)
+        self.assertEqual(self._counts()[('label', self.label.pk)], 2)
+
+        first.labels.clear()
+        self.label.task_set.remove(second)
+        self.assertNotIn(('label', self.label.pk), self._counts())
+        self.assertNotIn(('label', self.other_label.pk), self._counts())
+
+    def test_removing_unattached_label_keeps_counters(self):
+        task = self._task()
+        task.labels.add(self.label)
+        task.labels.remove(self.label, self.other_label)
+        self.other_label.task_set.remove(task)
+        self.assertNotIn(('label', self.label.pk), self._counts())
+        self.assertFalse(
+            TaskCounter.objects.filter(value__lt=0).exists()
+        )
+
+    def test_bulk_helpers_keep_counters(self):
+        cleaned = bulk.clean_items([
+            {
+                'name': f'Bulk {i}',
+                'description': 'Description',
+                'status': self.status.pk,
+                'labels': [self.label.pk],
+            }
+            for i in range(3)
+        ])
+        tasks = bulk.create_tasks(cleaned, self.author)
+        bulk.update_tasks(bulk.clean_items([{
+            'id': tasks[0].pk,
+            'status': self.other_status.pk,
+            'labels': [self.other_label.pk],
+        }], partial=True))
+        self.assertEqual(self._counts(), {
+            ('status', self.status.pk): 2,
+            ('status', self.other_status.pk): 1,
+            ('author', self.author.pk): 3,
+            ('label', self.label.pk): 2,
+            ('label', self.other_label.pk): 1,
+        })
+
+        bulk.delete_tasks([task.pk for task in tasks], self.author)
+        self.assertEqual(self._counts(), {})
+
+    def test_recount_repairs_drift(self):
+        self._task().labels.add(self.label)
+        expected = self._counts()
+        TaskCounter.objects.filter(kind='status').update(value=5)
+        TaskCounter.objects.filter(kind='label').delete()
+
+        out = StringIO()
+        call_command('recount', stdout=out)
+        self.assertIn('Исправлено счетчиков: 2', out.getvalue())
+        self.assertEqual(self._counts(), expected)
+
+    def test_concurrent_updates_read_previous_row(self):
+        task = self._task()
+        first = Task.objects.get(pk=task.pk)
+        second = Task.objects.get(pk=task.pk)
+        first.status = self.other_status
+        first.save()
+        # второй экземпляр загружен до первого сохранения
+        second.executor = self.executor
+        second.save()
+        self.assertEqual(self._counts(), {
+            ('author', self.author.pk): 1,
+            ('executor', self.executor.pk): 1,
+            ('status', self.status.pk): 1,
+        })
+
+    def test_update_fields_count_only_saved_fields(self):
+        task = self._task()
+        task.status = self.other_status
+        task.save(update_fields=['name'])
+        self.assertEqual(self._counts()[('status', self.status.pk)], 1)
+
+    def test_delete_checks_tasks_not_counters(self):
+        task = self._task(executor=self.executor)
+        task.labels.add(self.label)
+        # счетчики отстали от данных
+        TaskCounter.objects.all().delete()
+        self.client.force_login(self.executor)
+
+        for url, model, pk in (
+            ('statuses:delete', Status, self.status.pk),
+            ('labels:delete', Label, self.label.pk),
+            ('users:delete', User, self.executor.pk),
+        ):
+            with self.subTest(url=url):
+                response = self.client.post(
+                    reverse(url, kwargs={'pk': pk}), follow=True
+                )
+                self.assertContains(response, 'используется')
+                self.assertTrue(model.objects.filter(pk=pk).exists())
+        self.assertEqual(list(task.labels.all()), [self.label])
+
+    def test_delete_race_with_new_task(self):
+        self._task()
+        self.client.force_login(self.author)
+        # задачу создали между проверкой и удалением
+        with mock.patch.object(QuerySet, 'exists', return_value=False):
+            response = self.client.post(
+                reverse('statuses:delete', kwargs={'pk': self.status.pk}),
+                follow=True,
+            )
+        self.assertContains(response, 'используется')
+        self.assertTrue(Status.objects.filter(pk=self.status.pk).exists())
+
+
+class TaskRowCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='owner')
+        self.status = Status.objects.create(name='Новый')
+        self.task = Task.objects.create(
+            name='Task',
+            description='Description',
+            author=self.user,
+            status=self.status,
+        )
+
+    def _list(self):
+        return self.client.get(reverse('tasks:list')).content.decode()
+
+    def test_rows_are_cached(self):
+        self._list()
+        # update() обходит сигналы и updated_at: строка берется из кеша
+        Task.objects.filter(pk=self.task.pk).update(name='Changed')
+        self.assertIn('>Task</a>', self._list())
+
+    def test_task_save_invalidates_row(self):
+        self._list()
+        self.task.name = 'Changed'
+        self.task.save()
+        self.assertIn('>Changed</a>', self._list())
+
+    def test_status_rename_invalidates_row(self):
+        self._list()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.status.name = 'В работе'
+            self.status.save()
+        self.assertIn('<td data-field="status">В работе</td>', self._list())
+
+    def test_auth_state_is_part_of_key(self):
+        self._list()
+        self.client.force_login(self.user)
+        self.assertIn(
+            reverse('tasks:update', kwargs={'pk': self.task.pk}),
+            self._list(),
+        )
+
+
+class TaskListPartialTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='owner')
+        self.status = Status.objects.create(name='Status')
+        Task.objects.bulk_create(
+            Task(
+                name=f'Task {i}',
+                description='Description',
+                author=self.user,
+                status=self.status,
+            )
+            for i in range(15)
+        )
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(reverse('tasks:list'), {'page_size': 12})
+        self.assertEqual(len(response.context['tasks']), 12)
+
+        with mock.patch.object(TaskListView, 'max_page_size', 5):
+            response = self.client.get(
+                reverse('tasks:list'), {'page_size': 1000}
+            )
+        self.assertEqual(len(response.context['tasks']), 5)
+
+    def test_invalid_page_size(self):
+        for value in ('0', '-1', 'ten'):
+            response = self.client.get(
+                reverse('tasks:list'), {'page_size': value}
+            )
+            self.assertEqual(response.status_code, 404)
+
+    def test_rows_partial_skips_layout_and_dropdowns(self):
+        # COUNT, задачи и метки: без справочников и счетчиков фильтра
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse('tasks:list'), {'partial': 'rows'}
+            )
+        content = response.content.decode()
+        self.assertTrue(content.lstrip().startswith('<tr data-task-id='))
+        self.assertNotIn('<nav', content)
+        self.assertNotIn('<select', content)
+        self.assertEqual(response['X-Next-Page-Query'], 'page=2')
+
+        response = self.client.get(
+            reverse('tasks:list'), {'partial': 'rows', 'page': 2}
+        )
+        row = '<tr data-task-id='
+        self.assertEqual(content.count(row), 10)
+        self.assertEqual(response.content.decode().count(row), 5)
+        self.assertEqual(response['X-Next-Page-Query'], '')
+
+    def test_json_partial_with_cursor(self):
+        response = self.client.get(
+            reverse('tasks:list'),
+            {'partial': 'json', 'cursor': '', 'page_size': 10},
+        )
+        data = response.json()
+        self.assertEqual(len(data['results']), 10)
+        self.assertEqual(data['results'][0]['status'], 'Status')
+
+        response = self.client.get(
+            reverse('tasks:list') + '?partial=json&' + data['next_page_query']
+        )
+        data = response.json()
+        self.assertEqual(len(data['results']), 5)
+        self.assertEqual(data['next_page_query'], '')
+
+
+class TaskHistoryTests(TestCase):
+    def setUp(self):
+        # Имена в истории берутся из кеша справочников
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='author', first_name='Anna', last_name='Author'
+        )
+        self.status = Status.objects.create(name='New')
+        self.other_status = Status.objects.create(name='Done')
+        self.label = Label.objects.create(name='Bug')
+        self.other_label = Label.objects.create(name='Docs')
+        self.client.force_login(self.user)
+
+    def _post(self, url, **fields):
+        data = {
+            'name': 'Task',
+            'description': 'Description',
+            'status': self.status.pk,
+            'executor': '',
+            'labels': [self.label.pk],
+            **fields,
+        }
+        return self.client.post(url, data)
+
+    def _create(self):
+        self._post(reverse('tasks:create'))
+        return Task.objects.get()
+
+    def _update(self, task, **fields):
+        return self._post(
+            reverse('tasks:update', kwargs={'pk': task.pk}), **fields
+        )
+
+    def test_create_and_update_store_only_changes(self):
+        task = self._create()
+        created = task.events.get()
+        self.assertEqual(created.action, TaskEvent.CREATED)
+        self.assertEqual(created.user, self.user)
+        self.assertEqual(created.changes, {
+            'name': 'Task',
+            'description': 'Description',
+            'status': self.status.pk,
+            'labels': {'+': [self.label.pk]},
+        })
+
+        self._update(
+            task,
+            status=self.other_status.pk,
+            labels=[self.other_label.pk],
+        )
+        updated = task.events.first()
+        self.assertEqual(updated.action, TaskEvent.UPDATED)
+        self.assertEqual(updated.changes, {
+            'status': self.other_status.pk,
+            'labels': {'+': [self.other_label.pk], '-': [self.label.pk]},
+        })
+
+        # Сохранение без изменений не попадает в историю
+        self._update(
+            task,
+            status=self.other_status.pk,
+            labels=[self.other_label.pk],
+        )
+        self.assertEqual(task.events.count(), 2)
+
+    def test_event_is_written_in_update_transaction(self):
+        task = self._create()
+        with mock.patch(
+            'task_manager.tasks.history.record', side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                self._update(task, name='Renamed')
+        task.refresh_from_db()
+        self.assertEqual(task.name, 'Task')
+
+    def test_detail_shows_history(self):
+        task = self._create()
+        self._update(task, status=self.other_status.pk, labels=[])
+
+        response = self.client.get(
+            reverse('tasks:detail', kwargs={'pk': task.pk})
+        )
+        self.assertContains(response, 'Статус: New → Done')
+        self.assertContains(response, 'Метки: -Bug')
+        self.assertContains(response, 'Anna Author')
+
+    async def test_async_detail_shows_history(self):
+        task = await sync_to_async(self._create)()
+        await sync_to_async(self._update)(task, status=self.other_status.pk)
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(
+            reverse('tasks:detail_async', kwargs={'pk': task.pk})
+        )
+        self.assertContains(response, 'Статус: New → Done')
+
+    def test_merge_drops_labels_that_cancel_out(self):
+        self.assertEqual(
+            history.merge({'labels': {'+': [1]}}, {'labels': {'-': [1]}}),
+            {},
+        )
+        self.assertEqual(
+            history.merge({'labels': {'-': [2]}}, {'labels': {'+': [2]}}),
+            {},
+        )
+        self.assertEqual(
+            history.merge(
+                {'status': 1, 'labels': {'+': [1, 3], '-': [2]}},
+                {'labels': {'+': [2, 4], '-': [1, 5]}},
+            ),
+            {'status': 1, 'labels': {'+': [3, 4], '-': [5]}},
+        )
+
+    def test_events_are_append_only(self):
+        event = self._create().events.get()
+        event.action = TaskEvent.UPDATED
+        with self.assertRaises(ValueError):
+            event.save()
+
+    def test_compact_folds_old_events(self):
+        task = self._create()
+        self._update(task, status=self.other_status.pk)
+        self._update(task, labels=[self.other_label.pk])
+        self._update(task, name='Recent', labels=[self.other_label.pk])
+        old = timezone.now() - timedelta(days=100)
+        TaskEvent.objects.exclude(pk=task.events.first().pk).update(
+            created_at=old
+        )
+
+        out = StringIO()
+        call_command('compact_task_history', stdout=out)
+        self.assertIn('Удалено событий истории: 2', out.getvalue())
+
+        compacted, recent = task.events.order_by('created_at')
+        self.assertEqual(compacted.action, TaskEvent.CREATED)
+        self.assertEqual(compacted.changes, {
+            'name': 'Task',
+            'description': 'Description',
+            'status': self.status.pk,
+            'labels': {'+': [self.other_label.pk]},
+        })
+        self.assertEqual(recent.changes, {'name': 'Recent'})
+
+        call_command('compact_task_history', '--drop', stdout=StringIO())
+        self.assertEqual(list(task.events.all()), [recent])
+
+
+class TaskLiveUpdatesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='author', first_name='Anna', last_name='Author'
+        )
+        self.status = Status.objects.create(name='Status')
+        self.task = Task.objects.create(
+            name='Live task',
+            description='Description',
+            author=self.user,
+            status=self.status,
+        )
+        for name, value in (('hub', live.Hub()), ('feed', live.Feed())):
+            patcher = mock.patch.object(live, name, value)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def _rename(self, name):
+        self.task.name = name
+        self.task.save()
+
+    @override_settings(LIVE_UPDATES={**settings.LIVE_UPDATES,
+                                     'POLL_INTERVAL': 0.01})
+    async def test_stream_delivers_journal_events(self):
+        response = await self.async_client.get(reverse('tasks:events'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b'retry: 3000\n\n')
+        self.assertTrue(self.hub.has_subscribers())
+        self.assertTrue(self.feed.running())
+
+        # Изменение из синхронного представления, возможно, в другом
+        # процессе: событие приходит через журнал
+        await sync_to_async(self._rename)('Renamed')
+        chunk = (await asyncio.wait_for(anext(chunks), 5)).decode()
+        self.assertIn('event: updated\n', chunk)
+        data = json.loads(chunk.split('data: ')[1])
+        self.assertEqual(data['name'], 'Renamed')
+        self.assertEqual(data['author'], 'Anna Author')
+
+        # Отключение клиента отменяет ожидание и останавливает опрос
+        waiting = asyncio.ensure_future(anext(chunks))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        self.assertFalse(self.hub.has_subscribers())
+        self.assertFalse(self.feed.running())
+
+    async def test_stream_replays_events_after_last_event_id(self):
+        last_id = await sync_to_async(live.latest_id)()
+        await sync_to_async(self._rename)('Missed')
+        response = await self.async_client.get(
+            reverse('tasks:events'), headers={'Last-Event-ID': str(last_id)}
+        )
+        chunks = aiter(response.streaming_content)
+        await anext(chunks)
+        chunk = (await anext(chunks)).decode()
+        self.assertIn(f'id: {last_id + 1}\n', chunk)
+        self.assertIn('"Missed"', chunk)
+        await response.streaming_content.aclose()
+
+    def test_wsgi_returns_events_after_last_event_id(self):
+        response = self.client.get(reverse('tasks:events'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        last_id = live.latest_id()
+        self.assertEqual(
+            response.content.decode(), f'retry: 3000\n\nid: {last_id}\n\n'
+        )
+
+        self._rename('Renamed')
+        self.task.delete()
+        response = self.client.get(
+            reverse('tasks:events'), HTTP_LAST_EVENT_ID=str(last_id)
+        )
+        body = response.content.decode()
+        # Удаленная задача приходит только событием deleted
+        self.assertNotIn('event: updated', body)
+        self.assertIn(f'id: {last_id + 2}\nevent: deleted\n', body)
+
+    def test_journal_is_written_in_task_transaction(self):
+        self._rename('Renamed')
+        pk = self.task.pk
+        self.task.delete()
+        self.assertEqual(
+            list(LiveEvent.objects.values_list('kind', 'task_id')),
+            [(live.CREATED, pk), (live.UPDATED, pk), (live.DELETED, pk)],
+        )
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Task.objects.create(
+                name='Rolled back',
+                description='Description',
+                author=self.user,
+                status=self.status,
+            )
+            raise RuntimeError
+        self.assertEqual(LiveEvent.objects.count(), 3)
+
+    def test_feed_reads_events_of_other_processes(self):
+        self.feed.last_id = live.latest_id()
+        first = LiveEvent.objects.create(kind=live.DELETED, task_id=1)
+        late = LiveEvent.objects.create(kind=live.DELETED, task_id=2).pk
+        last = LiveEvent.objects.create(kind=live.DELETED, task_id=3)
+        # Транзакция со вторым событием еще не зафиксирована
+        LiveEvent.objects.filter(pk=late).delete()
+
+        self.assertEqual(
+            [event_id for event_id, _, _ in self.feed.poll()],
+            [first.pk, last.pk],
+        )
+        self.assertEqual(self.feed.poll(), [])
+
+        LiveEvent.objects.create(pk=late, kind=live.DELETED, task_id=2)
+        self.assertEqual(self.feed.poll(), [(late, live.DELETED, {'id': 2})])
+
+    def test_prune_keeps_recent_events(self):
+        LiveEvent.objects.create(
+            kind=live.DELETED,
+            task_id=1,
+            created_at=timezone.now() - timedelta(days=1),
+        )
+        live.prune()
+        self.assertEqual(
+            list(LiveEvent.objects.values_list('kind', flat=True)),
+            [live.CREATED],
+        )
+
+    async def test_slow_subscriber_is_dropped(self):
+        hub = live.Hub(queue_size=1)
+        queue = hub.subscribe()
+        hub.publish((1, live.DELETED, {'id': 1}))
+        hub.publish((2, live.DELETED, {'id': 2}))
+        await asyncio.sleep(0)
+
+        self.assertIs(await queue.get(), live.DROPPED)
+        self.assertFalse(hub.has_subscribers())
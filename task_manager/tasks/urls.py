@@ -6,8 +6,16 @@ app_name = 'tasks'
 
 urlpatterns = [
     path('', views.TaskListView.as_view(), name='list'),
+    path('async/', views.TaskListAsyncView.as_view(), name='list_async'),
+    path('export/', views.TaskExportView.as_view(), name='export'),
+    path('events/', views.TaskEventStreamView.as_view(), name='events'),
     path('create/', views.TaskCreateView.as_view(), name='create'),
     path('<int:pk>/', views.TaskDetailView.as_view(), name='detail'),
+    path(
+        '<int:pk>/async/',
+        views.TaskDetailAsyncView.as_view(),
+        name='detail_async',
+    ),
     path('<int:pk>/update/', views.TaskUpdateView.as_view(), name='update'),
     path('<int:pk>/delete/', views.TaskDeleteView.as_view(), name='delete'),
 ]
\ No newline at end of file
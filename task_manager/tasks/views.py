@@ -1,6 +1,17 @@
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.contrib.auth.models import User
+from django.contrib.auth.views import redirect_to_login
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import render
 from django.urls import reverse_lazy
 from django.views.generic import (
     CreateView,
@@ -8,69 +19,390 @@ from django.views.generic import (
     DetailView,
     ListView,
     UpdateView,
+    View,
 )
 
-from task_manager.labels.models import Label
-from task_manager.statuses.models import Status
+from task_manager import routers, versions
+from task_manager.conditional import (
+    LABELS,
+    STATUSES,
+    TASKS,
+    USERS,
+    ConditionalGetMixin,
+)
 
+from . import choices, counters, history, live
+from .export import EXPORT_FORMATS, aiter_chunks, iter_task_rows
 from .forms import TaskForm
-from .models import Task
+from .models import Task, TaskEvent
+from .pagination import (
+    InvalidCursor,
+    after_cursor,
+    cursor_page,
+    paginate_by_cursor,
+)
 
 TASK_LIST_URL = 'tasks:list'
+ROW_CACHE_TIMEOUT = 60 * 60
+# Строка с реплики могла быть прочитана до переименования статуса или
+# пользователя, но закеширована под новой версией: храним ее недолго
+REPLICA_ROW_CACHE_TIMEOUT = 60
+
+
+def filter_tasks(queryset, params, user):
+    """Применяет фильтры списка задач из параметров запроса."""
+    # Фильтрация по статусу
+    status_id = params.get('status')
+    if status_id:
+        queryset = queryset.filter(status_id=status_id)
+
+    # Фильтрация по исполнителю
+    executor_id = params.get('executor')
+    if executor_id:
+        queryset = queryset.filter(executor_id=executor_id)
+
+    # Фильтрация по меткам: любая из выбранных или все сразу
+    label_ids = [
+        label_id for label_id in params.getlist('label')
+        if label_id.isdigit()
+    ]
+    queryset = queryset.with_labels(
+        label_ids,
+        match_all=params.get('label_match') == 'all',
+    )
+
+    # Фильтрация по собственным задачам
+    if params.get('self_tasks') == 'on' and user.is_authenticated:
+        queryset = queryset.filter(author=user)
+
+    # Полнотекстовый поиск: результаты сортируются по релевантности
+    query = params.get('q', '').strip()
+    if query:
+        queryset = queryset.search(query)
+
+    return queryset
+
+
+def get_filter_context(params):
+    """Значения фильтров и справочники для формы фильтрации."""
+    # Справочники берутся из кеша, а не из базы на каждый запрос
+    cached = choices.get_choices(
+        choices.STATUSES, choices.EXECUTORS, choices.LABELS
+    )
+    # Число задач у каждого варианта - один запрос к счетчикам
+    counts = counters.get_all(
+        counters.STATUS, counters.EXECUTOR, counters.LABEL
+    )
+    return {
+        'status_filter': params.get('status', ''),
+        'executor_filter': params.get('executor', ''),
+        'label_filter': params.get('label', ''),
+        'is_self_tasks': params.get('self_tasks') == 'on',
+        'search_query': params.get('q', ''),
+        'statuses': cached[choices.STATUSES],
+        'executors': cached[choices.EXECUTORS],
+        'labels': cached[choices.LABELS],
+        'status_options': with_counts(
+            cached[choices.STATUSES], counts[counters.STATUS]
+        ),
+        'executor_options': with_counts(
+            cached[choices.EXECUTORS], counts[counters.EXECUTOR]
+        ),
+        'label_options': with_counts(
+            cached[choices.LABELS], counts[counters.LABEL]
+        ),
+    }
+
+
+def get_row_cache_context():
+    """
+    Параметры кеша строк списка задач. Строка зависит от самой задачи
+    (ключ по id и updated_at) и от имен статусов и пользователей.
+    """
+    if not versions.enabled():
+        return {'cache_rows': False}
+    current = versions.get_versions(STATUSES, USERS)
+    return {
+        'cache_rows': True,
+        'row_cache_timeout': (
+            REPLICA_ROW_CACHE_TIMEOUT if routers.is_reading_replica()
+            else ROW_CACHE_TIMEOUT
+        ),
+        'row_version': f'{current[STATUSES]}-{current[USERS]}',
+    }
+
 
+def with_counts(objects, counts):
+    return [(obj, counts.get(obj.pk, 0)) for obj in objects]
 
-class TaskListView(ListView):
+
+class TaskPagingMixin:
+    """
+    Параметры постраничного вывода списка задач, общие для обычного
+    и асинхронного представлений.
+    """
+    paginate_by = 10
+    max_page_size = 100
+    page_kwarg = 'page'
+    page_size_param = 'page_size'
+    partial_param = 'partial'
+    # Параметр запроса, включающий постраничный вывод по курсору
+    cursor_param = 'cursor'
+
+    def get_paginate_by(self, queryset=None):
+        """Размер страницы из ?page_size=, не больше max_page_size."""
+        value = self.request.GET.get(self.page_size_param)
+        if not value:
+            return self.paginate_by
+        if not value.isdigit() or int(value) < 1:
+            raise Http404("Некорректный размер страницы")
+        return min(int(value), self.max_page_size)
+
+    def is_cursor_mode(self):
+        # Результаты поиска упорядочены по релевантности, а не по дате,
+        # поэтому листаются обычными страницами
+        params = self.request.GET
+        return self.cursor_param in params and not params.get('q')
+
+    def get_page_query(self, param, value):
+        """Параметры запроса следующей страницы или '', если ее нет."""
+        if value is None:
+            return ''
+        query = self.request.GET.copy()
+        # Клиент сам решает, загружать ли следующую страницу целиком
+        query.pop(self.partial_param, None)
+        query[param] = value
+        return query.urlencode()
+
+
+class TaskListView(TaskPagingMixin, ConditionalGetMixin, ListView):
     model = Task
     template_name = 'tasks/list.html'
+    # Только строки таблицы для подгрузки при прокрутке (?partial=rows)
+    rows_template_name = 'tasks/_rows.html'
     context_object_name = 'tasks'
-    paginate_by = 10
-    
+    partial_formats = ('rows', 'json')
+    version_names = (TASKS, STATUSES, USERS, LABELS)
+    # Страница только читает данные: запросы идут на реплику, если она
+    # настроена (task_manager/routers.py)
+    read_replica = True
+
     # НОВЫЙ МЕТОД: Фильтрация queryset'а
     def get_queryset(self):
-        queryset = super().get_queryset()
+        return filter_tasks(
+            super().get_queryset().with_related(),
+            self.request.GET,
+            self.request.user,
+        )
 
-        # Фильтрация по статусу
-        status_id = self.request.GET.get('status')
-        if status_id:
-            queryset = queryset.filter(status_id=status_id)
+    def get_partial(self):
+        partial = self.request.GET.get(self.partial_param)
+        return partial if partial in self.partial_formats else None
 
-        # Фильтрация по исполнителю
-        executor_id = self.request.GET.get('executor')
-        if executor_id:
-            queryset = queryset.filter(executor_id=executor_id)
+    def paginate_queryset(self, queryset, page_size):
+        """
+        В режиме курсора страница выбирается по (created_at, id)
+        без OFFSET и без запроса COUNT.
+        """
+        if not self.is_cursor_mode():
+            return super().paginate_queryset(queryset, page_size)
 
-        # Фильтрация по метке
-        label_id = self.request.GET.get('label')
-        if label_id:
-            queryset = queryset.filter(labels__id=label_id)
+        try:
+            page = paginate_by_cursor(
+                queryset, self.request.GET[self.cursor_param], page_size
+            )
+        except InvalidCursor:
+            raise Http404("Некорректный курсор")
+        return None, page, page.object_list, page.has_next
 
-        # Фильтрация по собственным задачам
-        if self.request.GET.get('self_tasks') == 'on':
-            if self.request.user.is_authenticated:
-                queryset = queryset.filter(author=self.request.user)
+    def get_next_page_query(self, page):
+        if self.is_cursor_mode():
+            return self.get_page_query(self.cursor_param, page.next_cursor)
+        return self.get_page_query(
+            self.page_kwarg,
+            page.next_page_number() if page.has_next() else None,
+        )
 
-        return queryset.distinct()
+    def get_template_names(self):
+        if self.get_partial() == 'rows':
+            return [self.rows_template_name]
+        return super().get_template_names()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context['next_page_query'] = self.get_next_page_query(
+            context['page_obj']
+        )
+        context.update(get_row_cache_context())
 
-        context['status_filter'] = self.request.GET.get('status', '')
-        context['executor_filter'] = self.request.GET.get('executor', '')
-        context['label_filter'] = self.request.GET.get('label', '')
-        context['is_self_tasks'] = self.request.GET.get('self_tasks') == 'on'
-
-        context['statuses'] = Status.objects.all()
-        context['executors'] = User.objects.all()
-        context['labels'] = Label.objects.all()
+        # Строкам не нужны форма фильтров и ее выпадающие списки
+        if not self.get_partial():
+            context.update(get_filter_context(self.request.GET))
 
         return context
 
+    def render_to_response(self, context, **response_kwargs):
+        partial = self.get_partial()
+        if partial == 'json':
+            return JsonResponse({
+                'results': [
+                    live.serialize_row(task) for task in context['tasks']
+                ],
+                'next_page_query': context['next_page_query'],
+            })
+        response = super().render_to_response(context, **response_kwargs)
+        if partial:
+            response['X-Next-Page-Query'] = context['next_page_query']
+        return response
+
 
-class TaskDetailView(LoginRequiredMixin, DetailView):
+class TaskDetailView(LoginRequiredMixin, ConditionalGetMixin, DetailView):
     model = Task
+    queryset = Task.objects.with_related()
+    version_names = (TASKS, STATUSES, USERS, LABELS)
+    read_replica = True
     template_name = 'tasks/detail.html'
     context_object_name = 'task'
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['history'] = history.timeline(self.object)
+        return context
+
+
+class TaskListAsyncView(TaskPagingMixin, View):
+    """
+    Асинхронный вариант списка задач для запуска под ASGI: запросы
+    идут через асинхронный ORM без переключения в пул потоков на
+    каждый запрос. Размер страницы, курсор и ссылка на следующую
+    страницу - как у TaskListView.
+    """
+    template_name = TaskListView.template_name
+
+    async def get(self, request, *args, **kwargs):
+        # Пользователь нужен шаблону, загружаем его заранее
+        request.user = await request.auser()
+
+        queryset = filter_tasks(
+            Task.objects.with_related(), request.GET, request.user
+        )
+        page_size = self.get_paginate_by()
+        if self.is_cursor_mode():
+            tasks, next_page_query = await self.get_cursor_page(
+                queryset, page_size
+            )
+        else:
+            tasks, next_page_query = await self.get_numbered_page(
+                queryset, page_size
+            )
+        context = {
+            'tasks': tasks,
+            'next_page_query': next_page_query,
+            **await sync_to_async(get_filter_context)(request.GET),
+            **await sync_to_async(get_row_cache_context)(),
+        }
+        return render(request, self.template_name, context)
+
+    async def get_cursor_page(self, queryset, page_size):
+        try:
+            rows = after_cursor(
+                queryset, self.request.GET[self.cursor_param], page_size
+            )
+        except InvalidCursor:
+            raise Http404("Некорректный курсор")
+        page = cursor_page([task async for task in rows], page_size)
+        return page.object_list, self.get_page_query(
+            self.cursor_param, page.next_cursor
+        )
+
+    async def get_numbered_page(self, queryset, page_size):
+        try:
+            page_number = int(self.request.GET.get(self.page_kwarg, 1))
+        except ValueError:
+            raise Http404("Некорректный номер страницы")
+        if page_number < 1:
+            raise Http404("Некорректный номер страницы")
+
+        total = await queryset.acount()
+        offset = (page_number - 1) * page_size
+        if offset and offset >= total:
+            raise Http404("Страница не найдена")
+
+        page = queryset[offset:offset + page_size]
+        tasks = [task async for task in page.aiterator(chunk_size=page_size)]
+        has_next = offset + len(tasks) < total
+        return tasks, self.get_page_query(
+            self.page_kwarg, page_number + 1 if has_next else None
+        )
+
+
+class TaskDetailAsyncView(View):
+    template_name = TaskDetailView.template_name
+
+    async def get(self, request, pk, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+
+        try:
+            task = await Task.objects.with_related().aget(pk=pk)
+        except Task.DoesNotExist:
+            raise Http404("Задача не найдена")
+        return render(request, self.template_name, {
+            'task': task,
+            'history': await sync_to_async(history.timeline)(task),
+        })
+
+
+class TaskEventStreamView(View):
+    """
+    Поток изменений задач для списка (Server-Sent Events). Под ASGI
+    соединение держится открытым, под WSGI отдаются накопившиеся
+    события, и EventSource переподключается за следующими.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        last_event_id = live.parse_event_id(
+            request.headers.get('Last-Event-ID')
+        )
+        if isinstance(request, ASGIRequest):
+            response = StreamingHttpResponse(
+                live.stream(last_event_id), content_type='text/event-stream'
+            )
+        else:
+            # Открытый поток занял бы воркер WSGI целиком
+            response = HttpResponse(
+                await sync_to_async(live.replay)(last_event_id),
+                content_type='text/event-stream',
+            )
+        response['Cache-Control'] = 'no-cache'
+        # Отключает буферизацию ответа в nginx
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class TaskExportView(LoginRequiredMixin, View):
+    """
+    Выгружает все задачи, подходящие под фильтры списка, потоком
+    в CSV или NDJSON (?export_format=ndjson).
+    """
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest("Неизвестный формат выгрузки")
+
+        content_type, stream = EXPORT_FORMATS[export_format]
+        queryset = filter_tasks(Task.objects.all(), request.GET, request.user)
+        lines = stream(iter_task_rows(queryset))
+        if isinstance(request, ASGIRequest):
+            lines = aiter_chunks(lines)
+        response = StreamingHttpResponse(lines, content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="tasks.{export_format}"'
+        )
+        return response
+
 
 class TaskCreateView(LoginRequiredMixin, CreateView):
     model = Task
@@ -78,10 +410,19 @@ class TaskCreateView(LoginRequiredMixin, CreateView):
     template_name = 'tasks/create.html'
     success_url = reverse_lazy(TASK_LIST_URL)
 
+    @transaction.atomic
     def form_valid(self, form):
+        # Задача, ее метки, счетчики и запись в истории сохраняются вместе
         form.instance.author = self.request.user
         messages.success(self.request, "Задача успешно создана")
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        history.record(
+            self.object,
+            self.request.user,
+            history.form_changes(form),
+            action=TaskEvent.CREATED,
+        )
+        return response
 
 
 class TaskUpdateView(LoginRequiredMixin, UpdateView):
@@ -90,9 +431,15 @@ class TaskUpdateView(LoginRequiredMixin, UpdateView):
     template_name = 'tasks/update.html'
     success_url = reverse_lazy(TASK_LIST_URL)
 
+    @transaction.atomic
     def form_valid(self, form):
+        # Запись в истории сохраняется в той же транзакции
         messages.success(self.request, "Задача успешно изменена")
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        history.record(
+            self.object, self.request.user, history.form_changes(form)
+        )
+        return response
 
 
 class TaskDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
@@ -115,6 +462,7 @@ class TaskDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         # Перенаправляем на список задач вместо поднятия исключения
         return HttpResponseRedirect(reverse_lazy(TASK_LIST_URL))
     
+    @transaction.atomic
     def form_valid(self, form):
         messages.success(self.request, "Задача успешно удалена")
         return super().form_valid(form)
\ No newline at end of file
@@ -0,0 +1,637 @@
+# task_manager/tests.py
+import importlib
+import os
+import sqlite3
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import (
+    AsyncRequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from task_manager import cache_url, database, metrics, routers, versions
+from task_manager import settings as project_settings
+from task_manager.labels.models import Label
+from task_manager.middleware import (
+    QueryBudgetExceeded,
+    QueryProfilingMiddleware,
+    fingerprint,
+)
+from task_manager.redis_stub import RedisStub
+from task_manager.statuses.models import Status
+from task_manager.tasks import choices, dashboard
+from task_manager.tasks.models import Task
+
+PROFILING = {
+    'ENABLED': True,
+    'SAMPLE_RATE': 1,
+    'RAISE_ON_BUDGET': False,
+    'BUDGETS': {},
+}
+METRICS = {'ENABLED': True, 'DIR': '', 'FLUSH_INTERVAL': 5, 'TOKEN': ''}
+
+
+class QueryProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user')
+
+    def test_fingerprint_collapses_in_lists(self):
+        self.assertEqual(
+            fingerprint('SELECT 1 WHERE id IN (%s, %s, %s)'),
+            fingerprint('SELECT 1 WHERE id IN (%s, %s)'),
+        )
+
+    @override_settings(QUERY_PROFILING=PROFILING)
+    def test_records_queries_and_view_name(self):
+        with self.assertLogs('task_manager.profiling', 'INFO') as logs:
+            response = self.client.get(reverse('users:list'))
+
+        profile = response.wsgi_request.query_profile
+        self.assertGreater(profile.count, 0)
+        self.assertIn('view=users:list', logs.output[0])
+        self.assertIn(f'queries={profile.count}', logs.output[0])
+
+    @override_settings(QUERY_PROFILING=PROFILING)
+    async def test_async_chain_stays_in_event_loop(self):
+        async def view(request):
+            # ORM выполняет запрос в потоке sync_to_async
+            await User.objects.acount()
+            return HttpResponse()
+
+        middleware = QueryProfilingMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        request = AsyncRequestFactory().get('/')
+        with self.assertLogs('task_manager.profiling', 'INFO'):
+            await middleware(request)
+        self.assertEqual(request.query_profile.count, 1)
+
+    @override_settings(QUERY_PROFILING=PROFILING)
+    async def test_async_view_is_profiled(self):
+        with self.assertLogs('task_manager.profiling', 'INFO') as logs:
+            response = await self.async_client.get(
+                reverse('tasks:list_async')
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('view=tasks:list_async', logs.output[0])
+        self.assertGreater(response.asgi_request.query_profile.count, 0)
+
+    @override_settings(QUERY_PROFILING={**PROFILING, 'SAMPLE_RATE': 0})
+    def test_sampling_skips_requests(self):
+        response = self.client.get(reverse('users:list'))
+        self.assertFalse(hasattr(response.wsgi_request, 'query_profile'))
+
+    @override_settings(QUERY_PROFILING={
+        **PROFILING, 'BUDGETS': {'users:list': 0}
+    })
+    def test_budget_exceeded_is_logged(self):
+        with self.assertLogs('task_manager.profiling', 'WARNING') as logs:
+            self.client.get(reverse('users:list'))
+        self.assertIn('users:list', logs.output[0])
+
+    @override_settings(QUERY_PROFILING={
+        **PROFILING, 'BUDGETS': {'users:list': 0}, 'RAISE_ON_BUDGET': True
+    })
+    def test_budget_exceeded_can_raise(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('users:list'))
+
+
+@override_settings(METRICS={**METRICS, 'TOKEN': 'secret'})
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user')
+        self.client.force_login(self.user)
+        patcher = mock.patch.object(
+            metrics, 'registry', metrics.MetricsRegistry()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_metrics(self):
+        response = self.client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('users:list'))
+        names = [
+            entry.split(';')[0]
+            for entry in response['Server-Timing'].split(', ')
+        ]
+        self.assertEqual(names, ['db', 'template', 'total'])
+
+    def test_metrics_counts_requests_per_view(self):
+        self.client.get(reverse('users:list'))
+        self.client.get(reverse('users:list'))
+        self.client.get('/no-such-page/')
+
+        body = self.get_metrics()
+        self.assertIn(
+            'http_requests_total{view="users:list",method="GET",'
+            'status="200"} 2',
+            body,
+        )
+        self.assertIn('view="<unmatched>",method="GET",status="404"', body)
+        self.assertIn(
+            'http_request_duration_seconds_count{view="users:list"} 2', body
+        )
+
+    def test_metrics_aggregates_worker_files(self):
+        other_worker = metrics.MetricsRegistry()
+        for duration in (0.003, 0.3, 60):
+            other_worker.observe('users:list', 'GET', 200, duration)
+        with TemporaryDirectory() as directory:
+            metrics.write_snapshot(directory, '1-1', other_worker.snapshot())
+            with self.settings(METRICS={
+                **METRICS, 'TOKEN': 'secret', 'DIR': directory,
+            }):
+                self.client.get(reverse('users:list'))
+                body = self.get_metrics()
+
+        self.assertIn('method="GET",status="200"} 4', body)
+        prefix = 'http_request_duration_seconds_bucket{view="users:list",'
+        values = [
+            int(line.rsplit(' ', 1)[1])
+            for line in body.splitlines() if line.startswith(prefix)
+        ]
+        self.assertEqual(len(values), len(metrics.BUCKETS) + 1)
+        # Корзины Prometheus накопительные и не больше +Inf
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(values[-1], 4)
+        # 60 секунд не попадают ни в одну корзину, кроме +Inf
+        self.assertEqual(values[-2], 3)
+
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        response = self.client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong'
+        )
+        self.assertEqual(response.status_code, 403)
+        self.get_metrics()
+
+    @override_settings(METRICS={**METRICS, 'TOKEN': ''})
+    def test_metrics_closed_without_token(self):
+        response = self.client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer '
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_idle_worker_flushes_without_next_request(self):
+        with TemporaryDirectory() as directory:
+            with self.settings(METRICS={
+                **METRICS, 'DIR': directory, 'FLUSH_INTERVAL': 0.01,
+            }):
+                metrics.registry.observe('users:list', 'GET', 200, 0.1)
+                metrics.registry.timer.join(1)
+                snapshots = metrics.read_snapshots(directory)
+
+        self.assertEqual(snapshots[0]['requests'], [
+            ['users:list', 'GET', '200', 1],
+        ])
+
+    def test_worker_file_is_keyed_by_pid_and_start_time(self):
+        with TemporaryDirectory() as directory:
+            with self.settings(METRICS={**METRICS, 'DIR': directory}):
+                metrics.registry.observe('users:list', 'GET', 200, 0.1)
+                metrics.registry.flush()
+                # Новый процесс с тем же pid пишет в другой файл
+                metrics.registry.pid = None
+                metrics.registry.flush()
+                files = os.listdir(directory)
+
+        self.assertEqual(len(files), 2)
+        pid = str(os.getpid())
+        for name in files:
+            self.assertTrue(name.startswith(f'{metrics.FILE_PREFIX}{pid}-'))
+
+    async def test_async_request_is_measured(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('tasks:list_async'))
+        self.assertIn('Server-Timing', response)
+
+        response = await self.async_client.get(
+            reverse('metrics'), headers={'Authorization': 'Bearer secret'}
+        )
+        self.assertIn(
+            'view="tasks:list_async",method="GET",status="200"} 1',
+            response.content.decode(),
+        )
+
+
+class DashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='user', first_name='Иван', last_name='Иванов'
+        )
+        self.status = Status.objects.create(name='Новый')
+        self.label = Label.objects.create(name='Срочно')
+        for executor in (self.user, self.user, None):
+            task = Task.objects.create(
+                name='Task',
+                description='Description',
+                author=self.user,
+                executor=executor,
+                status=self.status,
+            )
+        task.labels.add(self.label)
+        self.client.force_login(self.user)
+
+    def test_aggregates(self):
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['total'], 3)
+        self.assertEqual(response.context['by_status'], [('Новый', 3)])
+        self.assertEqual(
+            response.context['by_executor'],
+            [('Иван Иванов', 2), ('Не назначен', 1)],
+        )
+        self.assertEqual(response.context['by_label'], [('Срочно', 1)])
+        self.assertEqual(
+            [total for _, total in response.context['by_day']], [3]
+        )
+
+    def test_cached_until_tasks_change(self):
+        self.client.get(reverse('dashboard'))
+        # только сессия и пользователь
+        with self.assertNumQueries(2):
+            self.client.get(reverse('dashboard'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.first().delete()
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['total'], 2)
+
+    def test_version_bumped_after_commit(self):
+        version = versions.get_version(dashboard.TASKS)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Task.objects.first().delete()
+        # до фиксации версия прежняя, иначе в кеш попали бы старые данные
+        self.assertEqual(versions.get_version(dashboard.TASKS), version)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(versions.get_version(dashboard.TASKS), version)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='user')
+        self.status = Status.objects.create(name='Новый')
+        self.client.force_login(self.user)
+
+    def _revalidate(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_not_modified_without_rendering(self):
+        url = reverse('statuses:list')
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+        # только сессия и пользователь, без запросов к статусам
+        # и счетчикам
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_pages_answer_not_modified(self):
+        task = Task.objects.create(
+            name='Task',
+            description='Description',
+            author=self.user,
+            status=self.status,
+        )
+        for url in (
+            reverse('tasks:list'),
+            reverse('tasks:detail', kwargs={'pk': task.pk}),
+            reverse('users:list'),
+            reverse('labels:list'),
+        ):
+            self.assertEqual(self._revalidate(url).status_code, 304, url)
+
+    def test_changes_invalidate_etag(self):
+        url = reverse('statuses:list')
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.status.name = 'Другой'
+            self.status.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Другой')
+
+    def test_etag_depends_on_user(self):
+        url = reverse('users:list')
+        etag = self.client.get(url)['ETag']
+        self.client.force_login(User.objects.create_user(username='other'))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_pending_messages_skip_conditional_get(self):
+        url = reverse('statuses:list')
+        etag = self.client.get(url)['ETag']
+        self.client.post(reverse('statuses:create'), {'name': 'Новый 2'})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+
+
+class SessionSettingsTests(SimpleTestCase):
+    """Сессии и пользователь в кеше только с кешем, общим для воркеров."""
+
+    def _load(self, **environ):
+        environ = {'SECRET_KEY': 'x', **environ}
+        self.addCleanup(importlib.reload, project_settings)
+        with mock.patch.dict(os.environ, environ, clear=True), \
+                mock.patch('dotenv.load_dotenv'):
+            return importlib.reload(project_settings)
+
+    def test_database_sessions_with_process_cache(self):
+        loaded = self._load(CACHE_URL='locmem://')
+        self.assertEqual(loaded.SESSION_BACKEND, 'db')
+        self.assertEqual(loaded.AUTHENTICATION_BACKENDS, [
+            'django.contrib.auth.backends.ModelBackend',
+        ])
+
+    def test_cached_sessions_with_shared_cache(self):
+        loaded = self._load(CACHE_URL='redis://localhost:6379/0')
+        self.assertEqual(loaded.SESSION_BACKEND, 'cached_db')
+        self.assertEqual(
+            loaded.AUTHENTICATION_BACKENDS[0],
+            'task_manager.users.backends.CachedModelBackend',
+        )
+
+    def test_cached_sessions_require_shared_cache(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self._load(CACHE_URL='locmem://', SESSION_BACKEND='cached_db')
+
+
+@override_settings(WEB_CONCURRENCY=4)
+class PerProcessCacheTests(TestCase):
+    """Несколько воркеров с locmem: сброс версий не виден другим."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='user')
+        self.status = Status.objects.create(name='Новый')
+        self.client.force_login(self.user)
+
+    def test_choices_read_from_database(self):
+        choices.get_statuses()
+        # изменение в другом воркере: версия здесь не сброшена
+        Status.objects.filter(pk=self.status.pk).update(name='Другой')
+        self.assertEqual(choices.get_statuses()[0].name, 'Другой')
+
+    def test_pages_without_etag(self):
+        response = self.client.get(reverse('statuses:list'))
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_rows_not_cached(self):
+        task = Task.objects.create(
+            name='Task',
+            description='Description',
+            author=self.user,
+            status=self.status,
+        )
+        self.client.get(reverse('tasks:list'))
+        Task.objects.filter(pk=task.pk).update(name='Changed')
+        self.assertContains(
+            self.client.get(reverse('tasks:list')), '>Changed</a>'
+        )
+
+
+class CacheUrlTests(TestCase):
+    def test_redis(self):
+        config = cache_url.parse(
+            'redis://:secret@cache:6379/1?timeout=300&socket_timeout=2',
+            key_prefix='abc',
+        )
+        self.assertEqual(config, {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': 'redis://:secret@cache:6379/1?socket_timeout=2',
+            'KEY_PREFIX': 'abc',
+            'TIMEOUT': 300,
+        })
+
+    def test_file_and_locmem(self):
+        config = cache_url.parse('file:///var/tmp/cache?max_entries=500')
+        self.assertEqual(config['LOCATION'], '/var/tmp/cache')
+        self.assertEqual(config['OPTIONS'], {'MAX_ENTRIES': 500})
+        config = cache_url.parse('locmem://tasks?timeout=none')
+        self.assertEqual(config['LOCATION'], 'tasks')
+        self.assertIsNone(config['TIMEOUT'])
+
+    def test_unknown_scheme(self):
+        with self.assertRaises(ImproperlyConfigured):
+            cache_url.parse('memcached://cache:11211')
+
+
+class SharedCacheTests(TestCase):
+    """Общий кеш воркеров на сервере протокола Redis в памяти процесса."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = RedisStub().start()
+        cls.addClassCleanup(cls.server.stop)
+        cls.enterClassContext(override_settings(
+            CACHES={'default': cache_url.parse(cls.server.url)}
+        ))
+        super().setUpClass()
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='user')
+        self.status = Status.objects.create(name='Новый')
+
+    def _keys(self, part):
+        return [key for key in self.server.store.data if part in key]
+
+    def test_uses_redis_backend(self):
+        self.assertIsInstance(caches['default'], RedisCache)
+
+    @override_settings(WEB_CONCURRENCY=4)
+    def test_versions_trusted_with_several_workers(self):
+        self.assertTrue(versions.enabled())
+
+    def test_choices_shared_between_workers(self):
+        choices.get_statuses()
+        # другой воркер: своей копии в памяти нет, но кеш общий
+        choices._local.clear()
+        other = caches.create_connection('default')
+        with mock.patch.object(choices, 'cache', other):
+            with self.assertNumQueries(0):
+                self.assertEqual(choices.get_statuses(), [self.status])
+
+    def test_row_fragments_shared(self):
+        task = Task.objects.create(
+            name='Task',
+            description='Description',
+            author=self.user,
+            status=self.status,
+        )
+        self.client.get(reverse('tasks:list'))
+        self.assertTrue(self._keys(b'template.cache.task_row'))
+        Task.objects.filter(pk=task.pk).update(name='Changed')
+        self.assertContains(self.client.get(reverse('tasks:list')), '>Task</a>')
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cache')
+    def test_sessions_shared(self):
+        self.client.force_login(self.user)
+        self.assertTrue(self._keys(b'django.contrib.sessions.cache'))
+        response = self.client.get(reverse('users:list'))
+        self.assertEqual(response.wsgi_request.user, self.user)
+
+    def test_deploy_prefix_separates_keys(self):
+        old, new = (
+            RedisCache(config['LOCATION'], config)
+            for config in (
+                cache_url.parse(self.server.url, key_prefix='old'),
+                cache_url.parse(self.server.url, key_prefix='new'),
+            )
+        )
+        old.set('fragment', 'старая разметка')
+        self.assertIsNone(new.get('fragment'))
+        self.assertEqual(old.get('fragment'), 'старая разметка')
+
+
+class DatabaseConfigTests(TestCase):
+    def _config(self, **env):
+        with mock.patch.dict(os.environ, env):
+            os.environ.pop('DATABASE_URL', None)
+            return database.config(default='postgres://user@db:5432/tasks')
+
+    def test_persistent_connections(self):
+        config = self._config(CONN_MAX_AGE='60')
+        self.assertEqual(config['CONN_MAX_AGE'], 60)
+        self.assertTrue(config['CONN_HEALTH_CHECKS'])
+        self.assertIsNone(self._config(CONN_MAX_AGE='none')['CONN_MAX_AGE'])
+
+    def test_no_persistent_connections_under_asgi(self):
+        self.assertEqual(self._config(ASGI='True')['CONN_MAX_AGE'], 0)
+        config = self._config(ASGI='True', CONN_MAX_AGE='60')
+        self.assertEqual(config['CONN_MAX_AGE'], 60)
+
+    def test_pool(self):
+        config = self._config(DB_POOL='True', DB_POOL_MAX_SIZE='20')
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        self.assertEqual(
+            config['OPTIONS']['pool'],
+            {'min_size': 2, 'max_size': 20, 'timeout': 10.0},
+        )
+
+    def test_pool_requires_postgres(self):
+        with mock.patch.dict(os.environ, {
+            'DB_POOL': 'True', 'DATABASE_URL': 'sqlite:///db.sqlite3'
+        }):
+            with self.assertRaises(ImproperlyConfigured):
+                database.config(default='')
+
+
+class ReplicaRoutingTests(TestCase):
+    """Основная база и реплика - два файла SQLite."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='user')
+        self.status = Status.objects.create(name='Новый')
+        self._attach_replica()
+        # Реплика отстает: переименование в нее еще не попало
+        self.status.name = 'Переименован'
+        self.status.save()
+        self.client.force_login(self.user)
+
+    def _attach_replica(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / 'replica.sqlite3'
+        # Копия текущего состояния основной базы, включая данные еще не
+        # завершенной транзакции теста
+        connection.ensure_connection()
+        with sqlite3.connect(path) as target:
+            target.executescript(';\n'.join(connection.connection.iterdump()))
+        target.close()
+
+        # Реплика подключается на время теста, поэтому разрешаем ее
+        # в databases уже после настройки класса
+        alias = settings.REPLICA['ALIAS']
+        config = {**connections.settings['default'], 'NAME': str(path)}
+        for patcher in (
+            mock.patch.dict(settings.DATABASES, {alias: config}),
+            mock.patch.dict(connections.settings, {alias: config}),
+            mock.patch.object(
+                type(self), 'databases', self.databases | {alias}
+            ),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(connections.__delitem__, alias)
+        self.addCleanup(lambda: connections[alias].close())
+
+    def test_list_reads_replica(self):
+        response = self.client.get(reverse('statuses:list'))
+        self.assertContains(response, 'Новый')
+        self.assertNotContains(response, 'Переименован')
+
+    def test_replica_pages_have_no_etag(self):
+        response = self.client.get(reverse('statuses:list'))
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_forms_read_primary(self):
+        response = self.client.get(
+            reverse('statuses:update', kwargs={'pk': self.status.pk})
+        )
+        self.assertContains(response, 'Переименован')
+
+    def test_choices_are_cached_from_primary(self):
+        response = self.client.get(reverse('tasks:list'))
+        self.assertEqual(
+            [status.name for status in response.context['statuses']],
+            ['Переименован'],
+        )
+
+    def test_sticks_to_primary_after_write(self):
+        response = self.client.post(
+            reverse('statuses:create'), {'name': 'Еще один'}
+        )
+        cookie = response.cookies[settings.REPLICA['COOKIE']]
+        self.assertEqual(cookie['max-age'], settings.REPLICA['STICKY_SECONDS'])
+
+        response = self.client.get(reverse('statuses:list'))
+        self.assertContains(response, 'Переименован')
+        self.assertContains(response, 'Еще один')
+
+    async def test_async_chain_reads_replica(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('statuses:list'))
+        self.assertContains(response, 'Новый')
+        self.assertNotContains(response, 'Переименован')
+
+        response = await self.async_client.post(
+            reverse('statuses:create'), {'name': 'Еще один'}
+        )
+        self.assertIn(settings.REPLICA['COOKIE'], response.cookies)
+        self.assertFalse(routers.is_reading_replica())
+
+    def test_router_without_replica(self):
+        with mock.patch.dict(settings.REPLICA, {'ALIAS': 'missing'}):
+            with routers.replica():
+                self.assertFalse(routers.is_reading_replica())
+                self.assertIsNone(routers.ReplicaRouter().db_for_read(Status))
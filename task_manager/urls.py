@@ -17,13 +17,23 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
-from task_manager.views import CustomLoginView, CustomLogoutView, IndexView
+from task_manager.views import (
+    CustomLoginView,
+    CustomLogoutView,
+    DashboardView,
+    IndexView,
+    MetricsView,
+)
 
 urlpatterns = [
     path('', IndexView.as_view(), name='index'),
     path('admin/', admin.site.urls),
+    path('dashboard/', DashboardView.as_view(), name='dashboard'),
     path('users/', include('task_manager.users.urls', namespace='users')),
     path('tasks/', include('task_manager.tasks.urls', namespace='tasks')),
+    path('api/tasks/', include(
+        'task_manager.tasks.api_urls', namespace='api_tasks'
+    )),
     path('labels/', include('task_manager.labels.urls', namespace='labels')),
     path('statuses/', include(
         'task_manager.statuses.urls', namespace='statuses'
@@ -34,5 +44,6 @@ urlpatterns = [
         name='login'
     ),
     path('logout/', CustomLogoutView.as_view(), name='logout'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
     # path("logout/", CustomLogoutView.as_view(), name="logout"),
 ]
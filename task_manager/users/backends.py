@@ -0,0 +1,29 @@
+"""
+Бэкенд аутентификации, который берет пользователя сессии из кеша.
+Без него AuthenticationMiddleware читает auth_user на каждый запрос.
+Запись в кеше удаляют сигналы при любом изменении пользователя, в том
+числе смене пароля, поэтому проверка хеша сессии остается точной.
+Подключается только с кешем, общим для всех воркеров: сигнал чистит
+лишь кеш процесса, в котором пользователь изменен.
+"""
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+USER_KEY = 'auth_user:{}'
+USER_CACHE_TIMEOUT = 60 * 15
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        key = USER_KEY.format(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
+
+
+def invalidate(user_id):
+    cache.delete(USER_KEY.format(user_id))
@@ -1,7 +1,10 @@
 from django.contrib.auth.models import User
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
+from task_manager.users.backends import USER_KEY
+
 
 class UserCRUDTestCase(TestCase):
     fixtures = ['users.json']
@@ -209,3 +212,48 @@ class UserCRUDTestCase(TestCase):
         
         # Проверяем, что пользователь не удален
         self.assertTrue(User.objects.filter(pk=self.user.pk).exists())
+
+
+# Так настроен проект с общим кешем (CACHE_URL=redis://...)
+@override_settings(
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+    AUTHENTICATION_BACKENDS=[
+        'task_manager.users.backends.CachedModelBackend',
+        'django.contrib.auth.backends.ModelBackend',
+    ],
+)
+class SessionUserCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='user', password='password123'
+        )
+        self.client.force_login(self.user)
+        self.url = reverse('users:list')
+
+    def test_user_is_loaded_from_cache(self):
+        self.client.get(self.url)
+        self.assertIsNotNone(cache.get(USER_KEY.format(self.user.pk)))
+        response = self.client.get(self.url)
+        self.assertEqual(response.wsgi_request.user, self.user)
+
+    def test_password_change_ends_cached_session(self):
+        self.client.get(self.url)
+        self.user.set_password('another-password')
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    def test_deactivated_user_is_logged_out(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    def test_messages_do_not_touch_session(self):
+        response = self.client.post(
+            reverse('statuses:create'), {'name': 'Новый'}
+        )
+        self.assertIn('messages', response.cookies)
+        self.assertNotIn('sessionid', response.cookies)
@@ -2,10 +2,14 @@ from django.contrib import messages
 from django.contrib.auth import logout
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
+from django.db.models import ProtectedError
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, DeleteView, ListView, UpdateView
 
+from task_manager.conditional import TASKS, USERS, ConditionalGetMixin
+from task_manager.tasks import counters
+
 from .forms import UserRegistrationForm, UserUpdateForm
 
 LOGIN_REQUIRED_MESSAGE = "Вы не авторизованы. Пожалуйста, выполните вход."
@@ -21,11 +25,18 @@ class AuthRequiredMixin(LoginRequiredMixin):
         return redirect('login')
 
 
-class UserListView(ListView):
+class UserListView(ConditionalGetMixin, ListView):
     model = User
     template_name = 'users/list.html'
     context_object_name = 'users'
     ordering = ['username']
+    version_names = (USERS, TASKS)
+    read_replica = True
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        counters.attach(context['users'], counters.EXECUTOR)
+        return context
 
 
 class UserCreateView(CreateView):
@@ -106,22 +117,23 @@ class UserDeleteView(AuthRequiredMixin, DeleteView):
     def post(self, request, *args, **kwargs):
         user_to_delete = self.get_object()
 
-        # Проверяем, используется ли пользователь в задачах
-        from task_manager.tasks.models import Task
-
-        tasks_as_author = Task.objects.filter(author=user_to_delete).exists()
-        tasks_as_executor = Task.objects.filter(
-            executor=user_to_delete
-        ).exists()
-
-        if tasks_as_author or tasks_as_executor:
-            messages.error(
-                request,
-                "Невозможно удалить пользователя, потому что он используется"
-            )
-            return redirect(USERS_LIST_URL)
+        # Проверяем по задачам, а не по счетчикам: счетчик может отстать
+        if (user_to_delete.author_tasks.exists()
+                or user_to_delete.executor_tasks.exists()):
+            return self.refuse()
+        try:
+            super().post(request, *args, **kwargs)
+        except ProtectedError:
+            # Задачу с пользователем создали уже после проверки
+            return self.refuse()
 
         logout(self.request)
-        super().post(request, *args, **kwargs)
         messages.success(request, "Пользователь успешно удален")
+        return redirect(USERS_LIST_URL)
+
+    def refuse(self):
+        messages.error(
+            self.request,
+            "Невозможно удалить пользователя, потому что он используется"
+        )
         return redirect(USERS_LIST_URL)
\ No newline at end of file
@@ -0,0 +1,95 @@
+# task_manager/versions.py
+"""
+Счетчики версий в кеше Django. Версия меняется при каждом изменении
+данных, поэтому ключи, в которые она входит, устаревают сами собой.
+Рядом хранится время последнего изменения для заголовка Last-Modified.
+
+Версию сбрасывает процесс, обработавший изменение. Если кеш у каждого
+процесса свой (locmem) и процессов несколько, остальные о сбросе не
+узнают: тогда enabled() ложно, и кеши по версиям не используются.
+"""
+import time
+from datetime import UTC, datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from task_manager import cache_url
+
+VERSION_KEY = 'version:{}'
+MODIFIED_KEY = 'modified:{}'
+
+
+def enabled():
+    """Можно ли кешировать данные под версиями в этой конфигурации."""
+    return (
+        settings.WEB_CONCURRENCY <= 1
+        or cache_url.is_shared(settings.CACHES['default'])
+    )
+
+
+def _initial_version():
+    # Время в наносекундах не совпадет с версией, которая могла быть
+    # в кеше до его очистки
+    return time.time_ns()
+
+
+def get_version(name):
+    key = VERSION_KEY.format(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(*names):
+    """Возвращает версии нескольких имен одним обращением к кешу."""
+    keys = {VERSION_KEY.format(name): name for name in names}
+    found = cache.get_many(keys)
+    versions = {keys[key]: version for key, version in found.items()}
+    for name in names:
+        if name not in versions:
+            versions[name] = get_version(name)
+    return versions
+
+
+def bump_version(name):
+    key = VERSION_KEY.format(name)
+    cache.set(MODIFIED_KEY.format(name), time.time(), timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Ключа нет в кеше: начинаем с новой уникальной версии
+        version = _initial_version()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def bump_on_commit(name, callback=None):
+    """
+    Сбрасывает версию после фиксации текущей транзакции (вне транзакции
+    сразу). Иначе запрос между сбросом и фиксацией закешировал бы
+    старые данные под новой версией и новым ETag.
+    """
+    def bump():
+        bump_version(name)
+        if callback is not None:
+            callback()
+
+    transaction.on_commit(bump)
+
+
+def get_last_modified(*names):
+    """
+    Время последнего изменения любого из имен. Если время потеряно
+    вместе с кешем, считаем, что изменение было только что.
+    """
+    keys = [MODIFIED_KEY.format(name) for name in names]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, time.time(), timeout=None)
+            found[key] = cache.get(key)
+    return datetime.fromtimestamp(max(found.values()), tz=UTC)
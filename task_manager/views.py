@@ -1,16 +1,36 @@
 # task_manager/views.py
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.messages.views import SuccessMessageMixin
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
 from django.utils.translation import gettext_lazy as _
+from django.views import View
 from django.views.generic import TemplateView
 
+from task_manager import metrics
+from task_manager.tasks import dashboard
+
 
 # Этот View отвечает за статичную главную страницу (/)
 class IndexView(TemplateView):
     template_name = 'index.html'
 
 
+class DashboardView(LoginRequiredMixin, TemplateView):
+    """Сводка по задачам: статусы, исполнители, метки и динамика."""
+
+    template_name = 'dashboard.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(dashboard.get_dashboard())
+        context['days'] = dashboard.DAYS
+        return context
+
+
 class CustomLoginView(SuccessMessageMixin, LoginView):
     template_name = 'registration/login.html'
     success_message = _('Вы залогинены')
@@ -19,4 +39,23 @@ class CustomLoginView(SuccessMessageMixin, LoginView):
 class CustomLogoutView(SuccessMessageMixin, LogoutView):
     def dispatch(self, request, *args, **kwargs):
         messages.success(request, _('Вы разлогинены'))
-        return super().dispatch(request, *args, **kwargs)
\ No newline at end of file
+        return super().dispatch(request, *args, **kwargs)
+
+
+class MetricsView(View):
+    """
+    Метрики всех воркеров в текстовом формате Prometheus. Доступны
+    только по METRICS_TOKEN: без токена страница закрыта.
+    """
+
+    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def get(self, request, *args, **kwargs):
+        token = settings.METRICS['TOKEN']
+        authorization = request.headers.get('Authorization', '')
+        if not (
+            token and constant_time_compare(authorization, f'Bearer {token}')
+        ):
+            return HttpResponseForbidden()
+        body = metrics.render(metrics.registry.collect())
+        return HttpResponse(body, content_type=self.content_type)